@@ -9,10 +9,7 @@ db = SQLAlchemy()
 jwt = JWTManager()
 migrate = Migrate()
 
-# Blacklist para tokens (em produção use Redis ou database)
-token_blacklist = set()
-
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
 
     # Configuração TOTALMENTE por variáveis de ambiente
@@ -49,6 +46,35 @@ def create_app():
     app.config['JWT_BLACKLIST_ENABLED'] = True
     app.config['JWT_BLACKLIST_TOKEN_CHECKS'] = ['access']
 
+    # Revogação de tokens: 'banco' (compartilhado entre workers) ou 'chave_valor' (local)
+    app.config['REVOGACAO_BACKEND'] = os.getenv('REVOGACAO_BACKEND', 'banco')
+    app.config['REVOGACAO_CACHE_TTL'] = int(os.getenv('REVOGACAO_CACHE_TTL', '30'))
+
+    # Custo do bcrypt e tamanho do pool de hashing de senhas
+    app.config['BCRYPT_ROUNDS'] = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    app.config['BCRYPT_WORKERS'] = int(os.getenv('BCRYPT_WORKERS', str(min(4, os.cpu_count() or 1))))
+    app.config['BCRYPT_FILA_MAXIMA'] = int(os.getenv('BCRYPT_FILA_MAXIMA', '32'))
+
+    # Tempo máximo (s) dos catálogos em cache, mesmo sem mudança de versão
+    app.config['CATALOGO_CACHE_TTL'] = int(os.getenv('CATALOGO_CACHE_TTL', '300'))
+
+    # Validade (s) dos relatórios em cache, que também são refeitos quando os dados mudam
+    app.config['RELATORIO_CACHE_TTL'] = int(os.getenv('RELATORIO_CACHE_TTL', '300'))
+
+    # Tarefas periódicas (expiração, limpeza de tokens) em uma thread por worker
+    app.config['AGENDADOR_HABILITADO'] = os.getenv('AGENDADOR_HABILITADO', '').lower() in ('1', 'true', 'sim')
+    app.config['AGENDADOR_INTERVALO'] = int(os.getenv('AGENDADOR_INTERVALO', '30'))
+    app.config['AGENDADOR_LEASE'] = int(os.getenv('AGENDADOR_LEASE', '600'))
+
+    # Stream de eventos (SSE): leitura de agendamento_eventos por worker e ping de keep-alive (s)
+    app.config['EVENTOS_INTERVALO'] = float(os.getenv('EVENTOS_INTERVALO', '1'))
+    app.config['EVENTOS_PING'] = float(os.getenv('EVENTOS_PING', '15'))
+    app.config['EVENTOS_TAMANHO_FILA'] = int(os.getenv('EVENTOS_TAMANHO_FILA', '1000'))
+
+    # Sobrescritas explícitas (usadas pelos testes)
+    if config:
+        app.config.update(config)
+
     # CORS para frontend
     CORS(app, origins=[
         "http://localhost:3000",
@@ -61,27 +87,22 @@ def create_app():
     jwt.init_app(app)
     migrate.init_app(app, db)
 
-    # Configurar user loader para JWT
-    from app.models import User, Administrador
-
-    @jwt.user_lookup_loader
-    def user_lookup_callback(_jwt_header, jwt_data):
-        identity = jwt_data["sub"]
-        
-        # Primeiro tenta encontrar como User
-        user = User.query.get(int(identity))
-        if user:
-            return user
-            
-        # Se não encontrou, tenta como Administrador
-        admin = Administrador.query.get(int(identity))
-        return admin
-
-    # Verificar se token está na blacklist
+    from app.utils.revogacao import revogacao
+    revogacao.init_app(app)
+
+    from app.utils.senhas import senhas
+    senhas.init_app(app)
+
+    from app.services.catalogo import catalogo
+    catalogo.init_app(app)
+
+    from app.utils.eventos import corretor
+    corretor.init_app(app)
+
+    # Verificar se token foi revogado (logout)
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
-        jti = jwt_payload["jti"]
-        return jti in token_blacklist
+        return revogacao.esta_revogado(jwt_payload)
 
     # Handlers de erro JWT
     @jwt.unauthorized_loader
@@ -119,6 +140,26 @@ def create_app():
     app.register_blueprint(admin_dashboard_bp, url_prefix='/api/admin/dashboard')
     app.register_blueprint(modelos_bp, url_prefix='/api/modelos-veiculo')
 
+    # Comandos de manutenção (flask expirar-agendamentos, ...)
+    from app.cli import registrar_comandos
+    registrar_comandos(app)
+
+    # Mantém estatisticas_diarias a cada flush de agendamentos
+    from app.services import estatisticas
+
+    # Mantém o índice de trigramas das placas a cada gravação de veículo
+    from app.services import placas
+
+    # Mantém o mapa de ocupação de cada dia a cada flush de agendamentos
+    from app.services import ocupacao
+
+    # Registra alterações de agendamentos em agendamento_eventos (stream SSE) a cada flush
+    from app.services import eventos
+
+    # Tarefas registradas em app.services.manutencao, app.services.estatisticas e app.services.eventos
+    from app.utils.agendador import agendador
+    agendador.init_app(app)
+
     # Rota health check
     @app.route('/')
     def health_check():
@@ -0,0 +1,45 @@
+import click
+from app.services.manutencao import expirar_agendamentos, TAMANHO_LOTE
+from app.services.estatisticas import recalcular_estatisticas
+from app.services.placas import reindexar_placas
+from app.services.ocupacao import reconstruir_ocupacao
+
+def registrar_comandos(app):
+    @app.cli.command('expirar-agendamentos')
+    @click.option('--lote', default=TAMANHO_LOTE, show_default=True, help='Agendamentos por transação')
+    def expirar_agendamentos_comando(lote):
+        """Marca como expirados os agendamentos de dias passados"""
+        resultado = expirar_agendamentos(tamanho_lote=lote)
+        click.echo(
+            f"{resultado['expirados']} agendamentos expirados em {resultado['lotes']} lotes "
+            f"({resultado['duracao_ms']} ms)"
+        )
+
+    @app.cli.command('recalcular-estatisticas')
+    @click.option('--inicio', type=click.DateTime(formats=['%Y-%m-%d']), help='Primeiro dia (YYYY-MM-DD)')
+    @click.option('--fim', type=click.DateTime(formats=['%Y-%m-%d']), help='Último dia (YYYY-MM-DD)')
+    def recalcular_estatisticas_comando(inicio, fim):
+        """Refaz estatisticas_diarias a partir dos agendamentos"""
+        resultado = recalcular_estatisticas(
+            inicio.date() if inicio else None,
+            fim.date() if fim else None
+        )
+        click.echo(f"{resultado['linhas']} linhas de estatísticas recalculadas")
+
+    @app.cli.command('indexar-placas')
+    @click.option('--lote', default=1000, show_default=True, help='Veículos por transação')
+    def indexar_placas_comando(lote):
+        """Refaz o índice de trigramas usado na busca por placa"""
+        resultado = reindexar_placas(tamanho_lote=lote)
+        click.echo(f"{resultado['veiculos']} veículos indexados")
+
+    @app.cli.command('reconstruir-ocupacao')
+    @click.option('--inicio', type=click.DateTime(formats=['%Y-%m-%d']), help='Primeiro dia (YYYY-MM-DD, padrão: hoje)')
+    @click.option('--fim', type=click.DateTime(formats=['%Y-%m-%d']), help='Último dia (YYYY-MM-DD)')
+    def reconstruir_ocupacao_comando(inicio, fim):
+        """Refaz os mapas de ocupação de ocupacao_dias a partir dos agendamentos"""
+        resultado = reconstruir_ocupacao(
+            inicio.date() if inicio else None,
+            fim.date() if fim else None
+        )
+        click.echo(f"{resultado['dias']} dias com mapa de ocupação reconstruído")
@@ -1,5 +1,6 @@
 from app import db
-import bcrypt
+from app.utils.senhas import senhas
+import json
 
 class Administrador(db.Model):
     __tablename__ = 'administradores'
@@ -11,10 +12,10 @@ class Administrador(db.Model):
     criado_em = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
 
     def set_password(self, password):
-        self.senha_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.senha_hash = senhas.gerar_hash(password)
 
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.senha_hash.encode('utf-8'))
+        return senhas.verificar(password, self.senha_hash)
 
     def to_dict(self):
         return {
@@ -36,10 +37,10 @@ class User(db.Model):
     atualizado_em = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
     def set_password(self, password):
-        self.senha_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.senha_hash = senhas.gerar_hash(password)
 
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.senha_hash.encode('utf-8'))
+        return senhas.verificar(password, self.senha_hash)
 
     def to_dict(self):
         return {
@@ -59,6 +60,9 @@ class Servico(db.Model):
     descricao = db.Column(db.Text)
     preco = db.Column(db.Numeric(10, 2), nullable=False)
     duracao_minutos = db.Column(db.Integer, default=60)
+    # Grade de horários e limpeza após o serviço; nulos usam os do dia
+    intervalo_minutos = db.Column(db.Integer)
+    limpeza_minutos = db.Column(db.Integer)
     ativo = db.Column(db.Boolean, default=True)
     criado_em = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
 
@@ -69,6 +73,8 @@ class Servico(db.Model):
             'descricao': self.descricao,
             'preco': float(self.preco) if self.preco else 0.0,
             'duracao_minutos': self.duracao_minutos,
+            'intervalo_minutos': self.intervalo_minutos,
+            'limpeza_minutos': self.limpeza_minutos,
             'ativo': self.ativo,
             'criado_em': self.criado_em.isoformat() if self.criado_em else None
         }
@@ -91,7 +97,7 @@ class Veiculo(db.Model):
     __tablename__ = 'veiculos'
 
     id = db.Column(db.Integer, primary_key=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=True, index=True)
     nome_proprietario = db.Column(db.String(100), nullable=False)
     placa = db.Column(db.String(10), unique=True, nullable=False)
     modelo_veiculo_id = db.Column(db.Integer, db.ForeignKey('modelos_veiculo.id'), nullable=True)
@@ -113,6 +119,13 @@ class Veiculo(db.Model):
             'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
         }
 
+class VeiculoTrigrama(db.Model):
+    __tablename__ = 'veiculo_trigramas'
+
+    # Cada trecho de 3 caracteres da placa, para busca por substring sem LIKE '%x%'
+    trigrama = db.Column(db.String(3), primary_key=True)
+    veiculo_id = db.Column(db.Integer, db.ForeignKey('veiculos.id'), primary_key=True, index=True)
+
 class HorarioFuncionamento(db.Model):
     __tablename__ = 'horarios_funcionamento'
 
@@ -121,6 +134,11 @@ class HorarioFuncionamento(db.Model):
     aberto = db.Column(db.Boolean, default=False)
     hora_abertura = db.Column(db.Time)
     hora_fechamento = db.Column(db.Time)
+    # Boxes de lavagem em funcionamento no dia (agendamentos simultâneos)
+    quantidade_boxes = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # Grade dos horários oferecidos e limpeza entre agendamentos, em minutos
+    intervalo_minutos = db.Column(db.Integer, nullable=False, default=30, server_default='30')
+    limpeza_minutos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     criado_em = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     atualizado_em = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
@@ -132,11 +150,24 @@ class HorarioFuncionamento(db.Model):
             'dia_nome': dias[self.dia_semana] if 0 <= self.dia_semana < 7 else 'Desconhecido',
             'aberto': self.aberto,
             'hora_abertura': self.hora_abertura.strftime('%H:%M') if self.hora_abertura else None,
-            'hora_fechamento': self.hora_fechamento.strftime('%H:%M') if self.hora_fechamento else None
+            'hora_fechamento': self.hora_fechamento.strftime('%H:%M') if self.hora_fechamento else None,
+            'quantidade_boxes': self.quantidade_boxes or 1,
+            'intervalo_minutos': self.intervalo_minutos or 30,
+            'limpeza_minutos': self.limpeza_minutos or 0
         }
 
 class Agendamento(db.Model):
     __tablename__ = 'agendamentos'
+    __table_args__ = (
+        # Disponibilidade e dashboard: dia + status
+        db.Index('ix_agendamentos_data_status', 'data_agendamento', 'status'),
+        # Histórico do cliente ordenado por data/horário
+        db.Index('ix_agendamentos_usuario_data_horario', 'user_id', 'data_agendamento', 'horario_agendamento'),
+        # Agendamentos futuros de um veículo
+        db.Index('ix_agendamentos_veiculo_data', 'veiculo_id', 'data_agendamento'),
+        # Listagens paginadas por (data, horário, id)
+        db.Index('ix_agendamentos_data_horario', 'data_agendamento', 'horario_agendamento', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     veiculo_id = db.Column(db.Integer, db.ForeignKey('veiculos.id'), nullable=False)
@@ -147,8 +178,13 @@ class Agendamento(db.Model):
     valor_total = db.Column(db.Numeric(10, 2), nullable=False)
     status = db.Column(db.Enum('pendente', 'confirmado', 'concluido', 'cancelado', 'expirado'), default='pendente')
     observacoes = db.Column(db.Text)
+    # Box (1..quantidade_boxes do dia) em que o serviço será feito
+    box = db.Column(db.Integer)
     criado_em = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     atualizado_em = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    servico = db.relationship('Servico')
+    veiculo = db.relationship('Veiculo')
+    usuario = db.relationship('User')
 
     def to_dict(self):
         return {
@@ -160,7 +196,108 @@ class Agendamento(db.Model):
             'horario_agendamento': self.horario_agendamento.strftime('%H:%M') if self.horario_agendamento else None,
             'valor_total': float(self.valor_total) if self.valor_total else 0.0,
             'status': self.status,
+            'box': self.box,
             'observacoes': self.observacoes,
             'criado_em': self.criado_em.isoformat() if self.criado_em else None,
             'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
-        }
\ No newline at end of file
+        }
+
+class OcupacaoDia(db.Model):
+    __tablename__ = 'ocupacao_dias'
+
+    # Uma linha por dia com agendamentos, usada como trava das reservas do dia
+    data = db.Column(db.Date, primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    # Bits de 5 em 5 minutos de cada box, refeitos a cada flush de agendamentos do dia
+    mapa = db.Column(db.LargeBinary)
+
+class TokenRevogado(db.Model):
+    __tablename__ = 'tokens_revogados'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    # Após a expiração do token o registro não é mais necessário
+    expira_em = db.Column(db.DateTime, nullable=False, index=True)
+
+class VersaoCatalogo(db.Model):
+    __tablename__ = 'versoes_catalogo'
+
+    # Um contador por catálogo em cache (servicos, modelos, horarios)
+    nome = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    atualizado_em = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
+
+class TarefaAgendada(db.Model):
+    __tablename__ = 'tarefas_agendadas'
+
+    nome = db.Column(db.String(100), primary_key=True)
+    # Worker que detém a execução até lease_ate (eleição pelo banco)
+    lider = db.Column(db.String(100))
+    lease_ate = db.Column(db.DateTime)
+    proxima_execucao = db.Column(db.DateTime, nullable=False)
+    ultima_execucao = db.Column(db.DateTime)
+    ultimo_sucesso = db.Column(db.DateTime)
+    ultima_duracao_ms = db.Column(db.Float)
+    ultimo_resultado = db.Column(db.Text)
+    ultimo_erro = db.Column(db.Text)
+    execucoes = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'nome': self.nome,
+            'lider': self.lider,
+            'lease_ate': self.lease_ate.isoformat() if self.lease_ate else None,
+            'proxima_execucao': self.proxima_execucao.isoformat() if self.proxima_execucao else None,
+            'ultima_execucao': self.ultima_execucao.isoformat() if self.ultima_execucao else None,
+            'ultimo_sucesso': self.ultimo_sucesso.isoformat() if self.ultimo_sucesso else None,
+            'ultima_duracao_ms': self.ultima_duracao_ms,
+            'ultimo_resultado': json.loads(self.ultimo_resultado) if self.ultimo_resultado else None,
+            'ultimo_erro': self.ultimo_erro,
+            'execucoes': self.execucoes
+        }
+
+class EstatisticaDiaria(db.Model):
+    __tablename__ = 'estatisticas_diarias'
+
+    # Totais de agendamentos por dia e status, mantidos a cada flush
+    data = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    receita = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+class AgendamentoEvento(db.Model):
+    __tablename__ = 'agendamento_eventos'
+    __table_args__ = (
+        # Sincronização do cliente: só os seus eventos, em ordem de sequência
+        db.Index('ix_agendamento_eventos_user_id', 'user_id', 'id'),
+        # Sequência nunca reutilizada, mesmo após a limpeza das linhas mais recentes no SQLite
+        {'sqlite_autoincrement': True}
+    )
+
+    # Registro de alterações de agendamentos, lido em ordem de id. O id vem da
+    # sequência agendamento_eventos, tirada no commit: segue a ordem dos commits
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(20), nullable=False)
+    agendamento_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer)
+    status = db.Column(db.String(20))
+    data_agendamento = db.Column(db.Date)
+    horario_agendamento = db.Column(db.Time)
+    criado_em = db.Column(db.DateTime, nullable=False, index=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'agendamento_id': self.agendamento_id,
+            'status': self.status,
+            'data_agendamento': self.data_agendamento.isoformat() if self.data_agendamento else None,
+            'horario_agendamento': self.horario_agendamento.strftime('%H:%M') if self.horario_agendamento else None,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None
+        }
+
+class Sequencia(db.Model):
+    __tablename__ = 'sequencias'
+
+    # Último valor usado de cada sequência; a linha fica travada do uso até o commit
+    nome = db.Column(db.String(50), primary_key=True)
+    valor = db.Column(db.Integer, nullable=False, default=0)
@@ -1,35 +1,32 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import HorarioFuncionamento, User, Administrador
-from app.utils.security import error_response
+from app.models import HorarioFuncionamento
+from app.utils.security import error_response, admin_required
+from app.services.listagem import consulta_agendamentos, agendamento_completo, ler_paginacao, paginar
+from app.utils.senhas import senhas
+from app.services.catalogo import catalogo, horarios_funcionamento
+from app.utils.http import resposta_condicional, gerar_etag, CACHE_PRIVADO_REVALIDAR
+from app.utils.agendador import agendador
+from app.services.placas import filtro_placa, buscar_veiculos, normalizar_placa, MODOS_BUSCA, TAMANHO_TRIGRAMA
+from app.services.disponibilidade import ler_regras_grade
+from app.services.ocupacao import reconstruir_futuros
 from datetime import time
 
 admin_bp = Blueprint('admin', __name__)
 
-def is_admin(user_id):
-    """Verifica se o usuário é admin"""
-    # Primeiro tenta encontrar como User (se tiver campo is_admin)
-    user = User.query.get(user_id)
-    if user and hasattr(user, 'is_admin') and user.is_admin:
-        return True
-    
-    # Se não, verifica se é Administrador
-    admin = Administrador.query.get(user_id)
-    return admin is not None
-
 @admin_bp.route('/horarios-funcionamento', methods=['GET', 'PUT'])
-@jwt_required()
+@admin_required()
 def gerenciar_horarios_funcionamento():
     try:
-        current_user_id = get_jwt_identity()
-        
-        if not is_admin(current_user_id):
-            return error_response('Acesso não autorizado', 403)
-
         if request.method == 'GET':
-            horarios = HorarioFuncionamento.query.order_by(HorarioFuncionamento.dia_semana.asc()).all()
-            return jsonify({'horarios': [h.to_dict() for h in horarios]}), 200
+            # Sempre revalida: o admin precisa ver a última configuração salva
+            versao, atualizado_em = catalogo.versao('horarios')
+            return resposta_condicional(
+                gerar_etag('horarios', versao, atualizado_em),
+                atualizado_em,
+                lambda: (jsonify({'horarios': [h for _, h in sorted(horarios_funcionamento().items())]}), 200),
+                CACHE_PRIVADO_REVALIDAR
+            )
 
         elif request.method == 'PUT':
             data = request.get_json()
@@ -37,6 +34,7 @@ def gerenciar_horarios_funcionamento():
             if not isinstance(data, list):
                 return error_response('Dados devem ser uma lista de horários')
 
+            limpeza_alterada = False
             for dia_data in data:
                 horario = HorarioFuncionamento.query.filter_by(dia_semana=dia_data['dia_semana']).first()
 
@@ -45,6 +43,21 @@ def gerenciar_horarios_funcionamento():
                     db.session.add(horario)
 
                 horario.aberto = dia_data.get('aberto', False)
+
+                if 'quantidade_boxes' in dia_data:
+                    quantidade_boxes = dia_data['quantidade_boxes']
+                    if type(quantidade_boxes) is not int or quantidade_boxes < 1:
+                        return error_response(f'quantidade_boxes deve ser um inteiro maior que zero no dia {dia_data["dia_semana"]}')
+                    horario.quantidade_boxes = quantidade_boxes
+
+                try:
+                    regras = ler_regras_grade(dia_data)
+                except ValueError as e:
+                    return error_response(f'{str(e)} no dia {dia_data["dia_semana"]}')
+                if 'limpeza_minutos' in regras and regras['limpeza_minutos'] != horario.limpeza_minutos:
+                    limpeza_alterada = True
+                for campo, valor in regras.items():
+                    setattr(horario, campo, valor)
                 
                 if horario.aberto:
                     if not dia_data.get('hora_abertura') or not dia_data.get('hora_fechamento'):
@@ -62,6 +75,12 @@ def gerenciar_horarios_funcionamento():
                     horario.hora_abertura = None
                     horario.hora_fechamento = None
 
+            catalogo.invalidar('horarios')
+
+            # A limpeza do dia muda o trecho ocupado pelos agendamentos já feitos
+            if limpeza_alterada:
+                reconstruir_futuros()
+
             db.session.commit()
             
             # Retornar horários atualizados
@@ -75,50 +94,84 @@ def gerenciar_horarios_funcionamento():
         db.session.rollback()
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
+def _ler_busca_placa(args):
+    """Termo normalizado e modo da busca por placa. Lança ValueError se inválidos"""
+    placa = normalizar_placa(args.get('placa'))
+    modo = args.get('modo', 'substring')
+
+    if modo not in MODOS_BUSCA:
+        raise ValueError(f'Modo de busca inválido. Use: {", ".join(MODOS_BUSCA)}')
+
+    if len(placa) < TAMANHO_TRIGRAMA:
+        raise ValueError(f'Informe pelo menos {TAMANHO_TRIGRAMA} caracteres da placa')
+
+    return placa, modo
+
 @admin_bp.route('/agendamentos/buscar', methods=['GET'])
-@jwt_required()
+@admin_required()
 def buscar_agendamentos_placa():
     try:
-        current_user_id = get_jwt_identity()
-        
-        if not is_admin(current_user_id):
-            return error_response('Acesso não autorizado', 403)
+        try:
+            placa, modo = _ler_busca_placa(request.args)
+            cursor, limite = ler_paginacao(request.args)
+        except ValueError as e:
+            return error_response(str(e))
 
-        placa = request.args.get('placa', '').upper().replace('-', '').replace(' ', '')
+        from app.models import Agendamento
 
-        if not placa or len(placa) < 3:
-            return error_response('Informe pelo menos 3 caracteres da placa')
+        # Placa resolvida pelo índice (exato/prefixo) ou pelos trigramas (substring)
+        query = consulta_agendamentos().join(Agendamento.veiculo).filter(filtro_placa(placa, modo))
+        agendamentos, proximo_cursor = paginar(query, cursor, limite)
 
-        from app.models import Agendamento, Veiculo, Servico, User, ModeloVeiculo
+        agendamentos_enriquecidos = [agendamento_completo(ag, incluir_cliente=True) for ag in agendamentos]
 
-        agendamentos = Agendamento.query.join(Veiculo).filter(
-            Veiculo.placa.like(f'%{placa}%')
-        ).order_by(Agendamento.data_agendamento.desc(), Agendamento.horario_agendamento.desc()).limit(50).all()
+        return jsonify({
+            'agendamentos': agendamentos_enriquecidos,
+            'total_encontrado': len(agendamentos_enriquecidos),
+            'next_cursor': proximo_cursor
+        }), 200
 
-        agendamentos_enriquecidos = []
-        for ag in agendamentos:
-            ag_dict = ag.to_dict()
-            veiculo = Veiculo.query.get(ag.veiculo_id)
-            servico = Servico.query.get(ag.servico_id)
-            usuario = User.query.get(ag.user_id)
-            
-            # CORREÇÃO: Buscar modelo separadamente
-            modelo_veiculo = ModeloVeiculo.query.get(veiculo.modelo_veiculo_id) if veiculo else None
-
-            ag_dict.update({
-                'cliente_nome': usuario.nome if usuario else 'N/A',
-                'cliente_telefone': usuario.telefone if usuario else 'N/A',
-                'veiculo_placa': veiculo.placa if veiculo else 'N/A',
-                'modelo_veiculo_nome': modelo_veiculo.nome if modelo_veiculo else 'N/A',  # CORREÇÃO
-                'nome_proprietario': veiculo.nome_proprietario if veiculo else 'N/A',
-                'servico_nome': servico.nome if servico else 'N/A'
-            })
-            agendamentos_enriquecidos.append(ag_dict)
+    except Exception as e:
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
+
+@admin_bp.route('/veiculos/buscar', methods=['GET'])
+@admin_required()
+def buscar_veiculos_placa():
+    try:
+        try:
+            placa, modo = _ler_busca_placa(request.args)
+            _, limite = ler_paginacao(request.args, limite_padrao=20)
+        except ValueError as e:
+            return error_response(str(e))
+
+        # Placa igual primeiro, depois as que começam pelo termo, depois as que o contêm
+        veiculos = buscar_veiculos(placa, modo, limite)
 
         return jsonify({
-            'agendamentos': agendamentos_enriquecidos,
-            'total_encontrado': len(agendamentos_enriquecidos)
+            'veiculos': veiculos,
+            'total_encontrado': len(veiculos),
+            'modo': modo
         }), 200
 
     except Exception as e:
-        return error_response(f'Erro interno do servidor: {str(e)}', 500)
\ No newline at end of file
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
+
+@admin_bp.route('/metricas', methods=['GET'])
+@admin_required()
+def metricas():
+    try:
+        # Latência do bcrypt e profundidade da fila de hashing deste processo
+        return jsonify({'senhas': senhas.metricas()}), 200
+
+    except Exception as e:
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
+
+@admin_bp.route('/tarefas', methods=['GET'])
+@admin_required()
+def status_tarefas():
+    try:
+        # Última execução, duração e último sucesso de cada tarefa periódica
+        return jsonify(agendador.status()), 200
+
+    except Exception as e:
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
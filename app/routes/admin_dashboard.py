@@ -1,67 +1,44 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from app import db
-from app.models import Agendamento, User, Veiculo, Servico, Administrador
+from app.models import Agendamento, User
 from datetime import datetime, date, timedelta
-from app.utils.security import error_response
-from app.models import ModeloVeiculo
+from app.utils.security import error_response, admin_required
+from app.services.listagem import consulta_agendamentos, agendamento_completo, ler_paginacao, paginar, STATUS_VALIDOS
+from app.services.estatisticas import estatisticas_periodo
+from app.services.relatorios import gerar_relatorio, MAX_DIAS_RELATORIO
+from app.services.exportacao import consulta_exportacao, gerar_csv, gerar_ndjson, FORMATOS
 
 admin_dashboard_bp = Blueprint('admin_dashboard', __name__)
 
-def is_admin(user_id):
-    """Verifica se o usuário é admin"""
-    user = User.query.get(user_id)
-    if user and hasattr(user, 'is_admin') and user.is_admin:
-        return True
-    admin = Administrador.query.get(user_id)
-    return admin is not None
-
 @admin_dashboard_bp.route('/agendamentos-hoje', methods=['GET'])
-@jwt_required()
+@admin_required()
 def agendamentos_hoje():
     try:
-        current_user_id = get_jwt_identity()
-        if not is_admin(current_user_id):
-            return error_response('Acesso não autorizado', 403)
+        try:
+            cursor, limite = ler_paginacao(request.args)
+        except ValueError as e:
+            return error_response(str(e))
 
         hoje = date.today()
-        agendamentos = Agendamento.query.filter(
+        query = consulta_agendamentos().filter(
             Agendamento.data_agendamento == hoje
-        ).order_by(Agendamento.horario_agendamento.asc()).all()
-
-        agendamentos_enriquecidos = []
-        for ag in agendamentos:
-            ag_dict = ag.to_dict()
-            usuario = User.query.get(ag.user_id)
-            veiculo = Veiculo.query.get(ag.veiculo_id)
-            servico = Servico.query.get(ag.servico_id)
-
-            ag_dict.update({
-                'cliente_nome': usuario.nome if usuario else 'N/A',
-                'cliente_telefone': usuario.telefone if usuario else 'N/A',
-                'cliente_email': usuario.email if usuario else 'N/A',
-                'veiculo_placa': veiculo.placa if veiculo else 'N/A',
-                'modelo_veiculo_nome': veiculo.modelo.nome if veiculo and veiculo.modelo else 'N/A',
-                'nome_proprietario': veiculo.nome_proprietario if veiculo else 'N/A',
-                'telefone_veiculo': veiculo.telefone if veiculo else 'N/A',
-                'servico_nome': servico.nome if servico else 'N/A',
-                'servico_duracao': servico.duracao_minutos if servico else 0
-            })
-            agendamentos_enriquecidos.append(ag_dict)
-
-        return jsonify({'agendamentos': agendamentos_enriquecidos}), 200
+        )
+        agendamentos, proximo_cursor = paginar(query, cursor, limite, crescente=True)
+
+        agendamentos_enriquecidos = [agendamento_completo(ag, incluir_cliente=True) for ag in agendamentos]
+
+        return jsonify({
+            'agendamentos': agendamentos_enriquecidos,
+            'next_cursor': proximo_cursor
+        }), 200
 
     except Exception as e:
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
 @admin_dashboard_bp.route('/agendamentos/<int:agendamento_id>/concluir', methods=['PUT'])
-@jwt_required()
+@admin_required()
 def concluir_agendamento(agendamento_id):
     try:
-        current_user_id = get_jwt_identity()
-        if not is_admin(current_user_id):
-            return error_response('Acesso não autorizado', 403)
-
         agendamento = Agendamento.query.get_or_404(agendamento_id)
 
         if agendamento.status == 'concluido':
@@ -80,43 +57,25 @@ def concluir_agendamento(agendamento_id):
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
 @admin_dashboard_bp.route('/estatisticas', methods=['GET'])
-@jwt_required()
+@admin_required()
 def estatisticas_admin():
     try:
-        current_user_id = get_jwt_identity()
-        if not is_admin(current_user_id):
-            return error_response('Acesso não autorizado', 403)
-
         hoje = date.today()
+        inicio_semana = hoje - timedelta(days=hoje.weekday())
 
-        # Estatísticas
-        agendamentos_hoje = Agendamento.query.filter(
-            Agendamento.data_agendamento == hoje
-        ).count()
-
-        agendamentos_confirmados = Agendamento.query.filter(
-            Agendamento.status == 'confirmado',
-            Agendamento.data_agendamento >= hoje
-        ).count()
+        # Totais por dia/status já agregados, da semana em diante
+        totais = estatisticas_periodo(inicio_semana)
 
-        total_clientes = User.query.count()
+        def somar(condicao):
+            return sum(quantidade for (dia, status), (quantidade, _) in totais.items() if condicao(dia, status))
 
-        receita_hoje = db.session.query(db.func.sum(Agendamento.valor_total)).filter(
-            Agendamento.data_agendamento == hoje,
-            Agendamento.status == 'concluido'
-        ).scalar() or 0
+        agendamentos_hoje = somar(lambda dia, status: dia == hoje)
+        agendamentos_confirmados = somar(lambda dia, status: status == 'confirmado' and dia >= hoje)
+        agendamentos_semana = somar(lambda dia, status: status in ('confirmado', 'concluido'))
 
-        concluidos_hoje = Agendamento.query.filter(
-            Agendamento.data_agendamento == hoje,
-            Agendamento.status == 'concluido'
-        ).count()
+        concluidos_hoje, receita_hoje = totais.get((hoje, 'concluido'), (0, 0))
 
-        # Agendamentos da semana
-        inicio_semana = hoje - timedelta(days=hoje.weekday())
-        agendamentos_semana = Agendamento.query.filter(
-            Agendamento.data_agendamento >= inicio_semana,
-            Agendamento.status.in_(['confirmado', 'concluido'])
-        ).count()
+        total_clientes = User.query.count()
 
         return jsonify({
             'agendamentos_hoje': agendamentos_hoje,
@@ -132,18 +91,19 @@ def estatisticas_admin():
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
 @admin_dashboard_bp.route('/agendamentos', methods=['GET'])
-@jwt_required()
+@admin_required()
 def listar_todos_agendamentos():
     try:
-        current_user_id = get_jwt_identity()
-        if not is_admin(current_user_id):
-            return error_response('Acesso não autorizado', 403)
+        try:
+            cursor, limite = ler_paginacao(request.args, limite_padrao=100)
+        except ValueError as e:
+            return error_response(str(e))
 
         # Filtros opcionais
         status = request.args.get('status')
         data = request.args.get('data')
 
-        query = Agendamento.query
+        query = consulta_agendamentos()
 
         if status:
             query = query.filter(Agendamento.status == status)
@@ -155,37 +115,78 @@ def listar_todos_agendamentos():
             except ValueError:
                 return error_response('Formato de data inválido')
 
-        agendamentos = query.order_by(
-            Agendamento.data_agendamento.desc(),
-            Agendamento.horario_agendamento.desc()
-        ).limit(100).all()
-
-        agendamentos_enriquecidos = []
-        for ag in agendamentos:
-            ag_dict = ag.to_dict()
-            usuario = User.query.get(ag.user_id)
-            veiculo = Veiculo.query.get(ag.veiculo_id)
-            servico = Servico.query.get(ag.servico_id)
-            
-            # CORREÇÃO: Buscar modelo separadamente
-            modelo_veiculo = ModeloVeiculo.query.get(veiculo.modelo_veiculo_id) if veiculo else None
-
-            ag_dict.update({
-                'cliente_nome': usuario.nome if usuario else 'N/A',
-                'cliente_telefone': usuario.telefone if usuario else 'N/A',
-                'cliente_email': usuario.email if usuario else 'N/A',
-                'veiculo_placa': veiculo.placa if veiculo else 'N/A',
-                'modelo_veiculo_nome': modelo_veiculo.nome if modelo_veiculo else 'N/A',
-                'nome_proprietario': veiculo.nome_proprietario if veiculo else 'N/A',
-                'telefone_veiculo': veiculo.telefone if veiculo else 'N/A',
-                'servico_nome': servico.nome if servico else 'N/A'
-            })
-            agendamentos_enriquecidos.append(ag_dict)
+        agendamentos, proximo_cursor = paginar(query, cursor, limite)
+
+        agendamentos_enriquecidos = [agendamento_completo(ag, incluir_cliente=True) for ag in agendamentos]
 
         return jsonify({
             'agendamentos': agendamentos_enriquecidos,
-            'total': len(agendamentos_enriquecidos)
+            'total': len(agendamentos_enriquecidos),
+            'next_cursor': proximo_cursor
         }), 200
 
     except Exception as e:
-        return error_response(f'Erro interno do servidor: {str(e)}', 500)
\ No newline at end of file
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
+
+@admin_dashboard_bp.route('/relatorio', methods=['GET'])
+@admin_required()
+def relatorio():
+    try:
+        inicio_str = request.args.get('inicio')
+        fim_str = request.args.get('fim')
+
+        if not inicio_str or not fim_str:
+            return error_response('Parâmetros inicio e fim são obrigatórios')
+
+        try:
+            inicio = datetime.strptime(inicio_str, '%Y-%m-%d').date()
+            fim = datetime.strptime(fim_str, '%Y-%m-%d').date()
+        except ValueError:
+            return error_response('Formato de data inválido. Use YYYY-MM-DD')
+
+        if fim < inicio:
+            return error_response('Data final deve ser igual ou posterior à inicial')
+
+        if (fim - inicio).days + 1 > MAX_DIAS_RELATORIO:
+            return error_response(f'Período máximo de {MAX_DIAS_RELATORIO} dias')
+
+        return jsonify(gerar_relatorio(inicio, fim, current_app.config['RELATORIO_CACHE_TTL'])), 200
+
+    except Exception as e:
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
+
+@admin_dashboard_bp.route('/exportacao', methods=['GET'])
+@admin_required()
+def exportar_agendamentos():
+    try:
+        formato = request.args.get('formato', 'csv')
+        if formato not in FORMATOS:
+            return error_response(f'Formato inválido. Use: {", ".join(FORMATOS)}')
+
+        try:
+            inicio = datetime.strptime(request.args['inicio'], '%Y-%m-%d').date() if request.args.get('inicio') else None
+            fim = datetime.strptime(request.args['fim'], '%Y-%m-%d').date() if request.args.get('fim') else None
+        except ValueError:
+            return error_response('Formato de data inválido. Use YYYY-MM-DD')
+
+        status = [s for s in request.args.get('status', '').split(',') if s]
+        invalidos = [s for s in status if s not in STATUS_VALIDOS]
+        if invalidos:
+            return error_response(f'Status inválido: {", ".join(invalidos)}')
+
+        query = consulta_exportacao(inicio, fim, status)
+
+        # Linhas enviadas conforme são lidas do banco, sem montar a lista inteira
+        if formato == 'csv':
+            corpo, mimetype = gerar_csv(query), 'text/csv'
+        else:
+            corpo, mimetype = gerar_ndjson(query), 'application/x-ndjson'
+
+        return Response(
+            stream_with_context(corpo),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=agendamentos.{formato}'}
+        )
+
+    except Exception as e:
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
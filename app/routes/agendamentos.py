@@ -1,52 +1,25 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Agendamento, Servico, Veiculo, User, HorarioFuncionamento, ModeloVeiculo
+from app.models import Agendamento, Veiculo
 from datetime import datetime, timedelta, date, timezone
-from app.utils.security import error_response, validate_placa
+from app.utils.security import error_response, validate_placa, admin_required, token_admin
+from app.services.listagem import (
+    consulta_agendamentos, agendamento_completo, ler_paginacao, paginar, ler_filtros, filtrar, resumo_status
+)
+from app.services.catalogo import obter_servico
+from app.services.manutencao import expirar_agendamentos
+from app.services.lote import reservar_lote, MAX_ITENS_LOTE
+from app.services.eventos import (
+    eventos_desde, ultimo_evento_id, gerar_stream, alteracoes_desde, historico_expirado, MAX_HISTORICO
+)
+from app.utils.eventos import corretor
+from app.services.disponibilidade import (
+    reservar_horario, listar_horarios_livres, calcular_disponibilidade_periodo, MAX_DIAS_PERIODO
+)
 
 agendamentos_bp = Blueprint('agendamentos', __name__)
 
-def verificar_disponibilidade(data_agendamento, horario_agendamento, duracao_minutos):
-    data_hora_agendamento = datetime.combine(data_agendamento, horario_agendamento)
-
-    dia_semana = data_agendamento.weekday()
-
-    horario_func = HorarioFuncionamento.query.filter_by(dia_semana=dia_semana).first()
-
-    if not horario_func or not horario_func.aberto:
-        return False
-
-    # Verificar se está dentro do horário de funcionamento
-    if horario_agendamento < horario_func.hora_abertura:
-        return False
-
-    hora_fim_servico = (datetime.combine(datetime.today(), horario_agendamento) + 
-                       timedelta(minutes=duracao_minutos)).time()
-
-    if hora_fim_servico > horario_func.hora_fechamento:
-        return False
-
-    # Verificar conflitos com outros agendamentos
-    fim_agendamento = data_hora_agendamento + timedelta(minutes=duracao_minutos)
-
-    agendamentos_do_dia = Agendamento.query.filter(
-        Agendamento.data_agendamento == data_agendamento,
-        Agendamento.status.in_(['pendente', 'confirmado'])
-    ).all()
-
-    for agendamento in agendamentos_do_dia:
-        servico_existente = Servico.query.get(agendamento.servico_id)
-        if servico_existente:
-            inicio_existente = datetime.combine(data_agendamento, agendamento.horario_agendamento)
-            fim_existente = inicio_existente + timedelta(minutes=servico_existente.duracao_minutos)
-
-            # Verificar sobreposição
-            if (data_hora_agendamento < fim_existente and fim_agendamento > inicio_existente):
-                return False
-
-    return True
-
 @agendamentos_bp.route('', methods=['POST'])
 @jwt_required()
 def criar_agendamento():
@@ -64,7 +37,7 @@ def criar_agendamento():
         if not is_valid:
             return error_response(message)
 
-        servico = Servico.query.get(data['servico_id'])
+        servico = obter_servico(data['servico_id'])
         if not servico:
             return error_response('Serviço não encontrado', 404)
 
@@ -102,8 +75,10 @@ def criar_agendamento():
                     400
                 )
 
-        # Verificar disponibilidade
-        if not verificar_disponibilidade(data_agendamento_obj, horario_agendamento_obj, servico.duracao_minutos):
+        # Verificar disponibilidade com o dia travado até o commit e reservar um box
+        box = reservar_horario(data_agendamento_obj, horario_agendamento_obj, servico)
+        if box is None:
+            db.session.rollback()
             return error_response('Horário indisponível', 409)
 
         # Resto do código permanece igual...
@@ -121,17 +96,16 @@ def criar_agendamento():
             db.session.add(veiculo)
             db.session.flush()
 
-        modelo_veiculo = ModeloVeiculo.query.get(veiculo.modelo_veiculo_id)
-
         novo_agendamento = Agendamento(
             data_agendamento=data_agendamento_obj,
             horario_agendamento=horario_agendamento_obj,
-            valor_total=float(servico.preco),
+            valor_total=float(servico['preco']),
             user_id=current_user_id,
             veiculo_id=veiculo.id,
-            servico_id=servico.id,
+            servico_id=servico['id'],
             observacoes=data.get('observacoes'),
-            status='confirmado'
+            status='confirmado',
+            box=box
         )
 
         db.session.add(novo_agendamento)
@@ -140,9 +114,9 @@ def criar_agendamento():
         # Retornar dados completos
         agendamento_dict = novo_agendamento.to_dict()
         agendamento_dict.update({
-            'servico_nome': servico.nome,
+            'servico_nome': servico['nome'],
             'veiculo_placa': veiculo.placa,
-            'modelo_veiculo_nome': modelo_veiculo.nome if modelo_veiculo else 'N/A',
+            'modelo_veiculo_nome': veiculo.modelo.nome if veiculo.modelo else 'N/A',
             'nome_proprietario': veiculo.nome_proprietario
         })
 
@@ -155,6 +129,41 @@ def criar_agendamento():
         db.session.rollback()
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
+@agendamentos_bp.route('/lote', methods=['POST'])
+@jwt_required()
+def criar_agendamentos_lote():
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json()
+
+        if not data or not isinstance(data.get('itens'), list) or not data['itens']:
+            return error_response('Informe a lista de itens do lote')
+
+        if len(data['itens']) > MAX_ITENS_LOTE:
+            return error_response(f'Máximo de {MAX_ITENS_LOTE} itens por lote')
+
+        # data_agendamento no corpo vale para os itens que não informarem a sua
+        resultados = reservar_lote(data['itens'], int(current_user_id), data.get('data_agendamento'))
+
+        criados = sum(1 for r in resultados if r['sucesso'])
+        if criados == len(resultados):
+            status_code = 201
+        elif criados:
+            status_code = 207
+        else:
+            status_code = 409
+
+        return jsonify({
+            'message': f'{criados} de {len(resultados)} agendamentos criados',
+            'criados': criados,
+            'falhas': len(resultados) - criados,
+            'resultados': resultados
+        }), status_code
+
+    except Exception as e:
+        db.session.rollback()
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
+
 @agendamentos_bp.route('', methods=['GET'])
 @jwt_required()
 def listar_agendamentos():
@@ -162,49 +171,34 @@ def listar_agendamentos():
         current_user_id = get_jwt_identity()
         
         # Verificar se é admin
-        current_user = User.query.get(current_user_id)
-        is_admin = current_user and hasattr(current_user, 'is_admin') and current_user.is_admin
-
-        if is_admin:
-            agendamentos = Agendamento.query.order_by(
-                Agendamento.data_agendamento.desc(), 
-                Agendamento.horario_agendamento.desc()
-            ).all()
-        else:
+        is_admin = token_admin()
+
+        try:
+            cursor, limite = ler_paginacao(request.args)
+            filtros = ler_filtros(request.args)
+        except ValueError as e:
+            return error_response(str(e))
+
+        query = filtrar(consulta_agendamentos(), filtros)
+        if not is_admin:
             # Filtrar por user_id do usuário logado
-            agendamentos = Agendamento.query.filter_by(user_id=current_user_id).order_by(
-                Agendamento.data_agendamento.desc(),
-                Agendamento.horario_agendamento.desc()
-            ).all()
-
-        agendamentos_completos = []
-        for ag in agendamentos:
-            ag_dict = ag.to_dict()
-            servico = Servico.query.get(ag.servico_id)
-            veiculo = Veiculo.query.get(ag.veiculo_id)
-            usuario = User.query.get(ag.user_id) if is_admin else None
-            
-            # Buscar modelo do veículo separadamente
-            modelo_veiculo = ModeloVeiculo.query.get(veiculo.modelo_veiculo_id) if veiculo else None
+            query = query.filter(Agendamento.user_id == current_user_id)
 
-            ag_dict.update({
-                'servico_nome': servico.nome if servico else 'N/A',
-                'veiculo_placa': veiculo.placa if veiculo else 'N/A',
-                'modelo_veiculo_nome': modelo_veiculo.nome if modelo_veiculo else 'N/A',
-                'nome_proprietario': veiculo.nome_proprietario if veiculo else 'N/A',
-                'telefone_veiculo': veiculo.telefone if veiculo else 'N/A'
-            })
+        # Próximos do mais cedo ao mais tarde; o restante do mais recente ao mais antigo
+        agendamentos, proximo_cursor = paginar(query, cursor, limite, crescente=filtros['periodo'] == 'proximos')
 
-            if is_admin and usuario:
-                ag_dict['cliente_nome'] = usuario.nome
-                ag_dict['cliente_telefone'] = usuario.telefone
-                ag_dict['cliente_email'] = usuario.email
+        agendamentos_completos = [agendamento_completo(ag, incluir_cliente=is_admin) for ag in agendamentos]
 
-            agendamentos_completos.append(ag_dict)
+        resposta = {
+            'agendamentos': agendamentos_completos,
+            'next_cursor': proximo_cursor
+        }
 
-        return jsonify({
-            'agendamentos': agendamentos_completos
-        }), 200
+        # Contadores das abas só na primeira página; as seguintes não mudam o total
+        if not cursor:
+            resposta['resumo'] = resumo_status(filtros, user_id=None if is_admin else int(current_user_id))
+
+        return jsonify(resposta), 200
 
     except Exception as e:
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
@@ -216,11 +210,8 @@ def cancelar_agendamento(agendamento_id):
         current_user_id = get_jwt_identity()
         agendamento = Agendamento.query.get_or_404(agendamento_id)
         
-        # CORREÇÃO: Verificação simplificada e funcional
-        from app.models import Administrador
-        
         # Verificar se é admin
-        is_admin = Administrador.query.get(current_user_id) is not None
+        is_admin = token_admin()
         
         # Se não é admin E não é dono do agendamento, bloqueia
         if not is_admin and agendamento.user_id != int(current_user_id):
@@ -245,21 +236,18 @@ def cancelar_agendamento(agendamento_id):
 def detalhes_agendamento(agendamento_id):
     try:
         current_user_id = get_jwt_identity()
-        agendamento = Agendamento.query.get_or_404(agendamento_id)
-        
-        # CORREÇÃO: Verificação simplificada e funcional
-        from app.models import Administrador
+        agendamento = consulta_agendamentos().filter(Agendamento.id == agendamento_id).first_or_404()
         
         # Verificar se é admin
-        is_admin = Administrador.query.get(current_user_id) is not None
+        is_admin = token_admin()
         
         # Se não é admin E não é dono do agendamento, bloqueia
         if not is_admin and agendamento.user_id != int(current_user_id):
             return error_response('Não autorizado', 403)
 
-        servico = Servico.query.get(agendamento.servico_id)
-        veiculo = Veiculo.query.get(agendamento.veiculo_id)
-        usuario = User.query.get(agendamento.user_id) if is_admin else None
+        servico = agendamento.servico
+        veiculo = agendamento.veiculo
+        usuario = agendamento.usuario if is_admin else None
 
         agendamento_dict = agendamento.to_dict()
         agendamento_dict.update({
@@ -299,64 +287,72 @@ def horarios_disponiveis():
         if data < datetime.now().date():
             return jsonify({'horarios_disponiveis': []})
 
-        servico = Servico.query.get(servico_id)
+        servico = obter_servico(servico_id)
         if not servico:
             return error_response('Serviço não encontrado')
 
-        dia_semana = data.weekday()
-        horario_func = HorarioFuncionamento.query.filter_by(dia_semana=dia_semana).first()
+        horarios_disponiveis = listar_horarios_livres(data, servico)
 
-        if not horario_func or not horario_func.aberto:
-            return jsonify({'horarios_disponiveis': []})
+        return jsonify({
+            'horarios_disponiveis': horarios_disponiveis
+        }), 200
+
+    except Exception as e:
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
+
+@agendamentos_bp.route('/disponibilidade', methods=['GET'])
+@jwt_required()
+def disponibilidade_periodo():
+    try:
+        inicio_str = request.args.get('inicio')
+        fim_str = request.args.get('fim')
+        servico_id = request.args.get('servico_id')
 
-        intervalo = 30
-        horarios_disponiveis = []
+        if not inicio_str or not fim_str or not servico_id:
+            return error_response('Parâmetros inicio, fim e servico_id são obrigatórios')
 
-        hora_atual = horario_func.hora_abertura
-        while hora_atual < horario_func.hora_fechamento:
-            if verificar_disponibilidade(data, hora_atual, servico.duracao_minutos):
-                horarios_disponiveis.append(hora_atual.strftime('%H:%M'))
+        try:
+            inicio = datetime.strptime(inicio_str, '%Y-%m-%d').date()
+            fim = datetime.strptime(fim_str, '%Y-%m-%d').date()
+        except ValueError:
+            return error_response('Formato de data inválido. Use YYYY-MM-DD')
+
+        if fim < inicio:
+            return error_response('Data final deve ser igual ou posterior à inicial')
 
-            # Avançar para o próximo horário
-            hora_atual = (datetime.combine(datetime.today(), hora_atual) + 
-                         timedelta(minutes=intervalo)).time()
+        if (fim - inicio).days + 1 > MAX_DIAS_PERIODO:
+            return error_response(f'Período máximo de {MAX_DIAS_PERIODO} dias')
+
+        servico = obter_servico(servico_id)
+        if not servico:
+            return error_response('Serviço não encontrado')
+
+        # Dias passados não têm horários disponíveis
+        inicio = max(inicio, datetime.now().date())
+        if fim < inicio:
+            return jsonify({'dias': []}), 200
+
+        dias = calcular_disponibilidade_periodo(inicio, fim, servico)
 
         return jsonify({
-            'horarios_disponiveis': horarios_disponiveis
+            'dias': dias
         }), 200
 
     except Exception as e:
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
 @agendamentos_bp.route('/expirados', methods=['DELETE'])
-@jwt_required()
+@admin_required()
 def remover_agendamentos_expirados():
     try:
-        current_user_id = get_jwt_identity()
-        
-        # CORREÇÃO: Verificação de admin correta
-        from app.models import Administrador
-        is_admin = Administrador.query.get(current_user_id) is not None
-        
-        if not is_admin:
-            return error_response('Acesso não autorizado', 403)
-
-        hoje = date.today()
-        
-        # Marcar agendamentos passados como expirados
-        agendamentos_expirados = Agendamento.query.filter(
-            Agendamento.data_agendamento < hoje,
-            Agendamento.status.in_(['pendente', 'confirmado'])
-        ).all()
-
-        for agendamento in agendamentos_expirados:
-            agendamento.status = 'expirado'
-
-        db.session.commit()
+        # Mesmo job do comando flask expirar-agendamentos
+        resultado = expirar_agendamentos()
 
         return jsonify({
-            'message': f'{len(agendamentos_expirados)} agendamentos marcados como expirados',
-            'expirados_count': len(agendamentos_expirados)
+            'message': f'{resultado["expirados"]} agendamentos marcados como expirados',
+            'expirados_count': resultado['expirados'],
+            'lotes': resultado['lotes'],
+            'duracao_ms': resultado['duracao_ms']
         }), 200
 
     except Exception as e:
@@ -364,18 +360,10 @@ def remover_agendamentos_expirados():
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
 @agendamentos_bp.route('/<int:agendamento_id>/status', methods=['PUT'])
-@jwt_required()
+@admin_required()
 def atualizar_status_agendamento(agendamento_id):
     try:
-        current_user_id = get_jwt_identity()
         agendamento = Agendamento.query.get_or_404(agendamento_id)
-        
-        # CORREÇÃO: Verificação de admin correta
-        from app.models import Administrador
-        is_admin = Administrador.query.get(current_user_id) is not None
-        
-        if not is_admin:
-            return error_response('Acesso não autorizado', 403)
 
         data = request.get_json()
         novo_status = data.get('status')
@@ -395,49 +383,104 @@ def atualizar_status_agendamento(agendamento_id):
         db.session.rollback()
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
-@agendamentos_bp.route('/hoje', methods=['GET'])
+@agendamentos_bp.route('/eventos', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def eventos_agendamentos():
+    # EventSource não envia cabeçalhos: o token também é aceito em ?jwt=
+    assinatura = None
+    try:
+        # Admin recebe os eventos de todos os clientes; o cliente, só os seus
+        user_id = None if token_admin() else int(get_jwt_identity())
+
+        ultimo_id = request.headers.get('Last-Event-ID') or request.args.get('desde')
+        try:
+            ultimo_id = int(ultimo_id) if ultimo_id else None
+        except ValueError:
+            return error_response('Last-Event-ID deve ser um número')
+
+        recarregar = ultimo_id is not None and historico_expirado(ultimo_id)
+        if ultimo_id is None or recarregar:
+            ultimo_id = ultimo_evento_id()
+
+        # Assina antes de ler o histórico: nada fica entre os dois
+        assinatura = corretor.assinar(user_id, ultimo_id)
+        historico = [dict(e.to_dict(), user_id=e.user_id) for e in eventos_desde(ultimo_id, user_id)]
+
+        if recarregar:
+            # Eventos após o Last-Event-ID já foram removidos: o app recarrega a lista
+            # e o id do aviso passa a ser o Last-Event-ID das próximas reconexões
+            historico.insert(0, {'id': ultimo_id, 'tipo': 'recarregar'})
+
+    except Exception as e:
+        if assinatura is not None:
+            corretor.cancelar(assinatura)
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
+
+    return Response(
+        gerar_stream(assinatura, ultimo_id, historico, len(historico) < MAX_HISTORICO, current_app.config.get('EVENTOS_PING', 15)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@agendamentos_bp.route('/changes', methods=['GET'])
 @jwt_required()
+def alteracoes_agendamentos():
+    # Sincronização incremental: alterações após a sequência `since` (sem since, só a sequência atual)
+    try:
+        user_id = None if token_admin() else int(get_jwt_identity())
+
+        try:
+            desde = request.args.get('since')
+            desde = int(desde) if desde is not None else None
+            limite = int(request.args.get('limit', 100))
+        except ValueError:
+            return error_response('Parâmetros since e limit devem ser números')
+
+        if desde is not None and desde < 0:
+            return error_response('Parâmetro since deve ser maior ou igual a zero')
+        if limite < 1 or limite > MAX_HISTORICO:
+            return error_response(f'Parâmetro limit deve estar entre 1 e {MAX_HISTORICO}')
+
+        if desde is None:
+            # Ponto de partida: buscar antes da carga completa de /api/agendamentos
+            return jsonify({'alteracoes': [], 'next_since': ultimo_evento_id(), 'has_more': False}), 200
+
+        if historico_expirado(desde):
+            return error_response('Alterações anteriores já foram removidas; recarregue os agendamentos', 410)
+
+        alteracoes, proximo, mais = alteracoes_desde(desde, user_id, limite)
+
+        return jsonify({
+            'alteracoes': alteracoes,
+            'next_since': proximo,
+            'has_more': mais
+        }), 200
+
+    except Exception as e:
+        return error_response(f'Erro interno do servidor: {str(e)}', 500)
+
+@agendamentos_bp.route('/hoje', methods=['GET'])
+@admin_required()
 def agendamentos_hoje():
     try:
-        current_user_id = get_jwt_identity()
-        
-        # Apenas admin pode ver agendamentos do dia
-        current_user = User.query.get(current_user_id)
-        if not current_user or not hasattr(current_user, 'is_admin') or not current_user.is_admin:
-            return error_response('Acesso não autorizado', 403)
+        try:
+            cursor, limite = ler_paginacao(request.args)
+        except ValueError as e:
+            return error_response(str(e))
 
         hoje = date.today()
 
-        agendamentos = Agendamento.query.filter(
+        query = consulta_agendamentos().filter(
             Agendamento.data_agendamento == hoje,
             Agendamento.status.in_(['confirmado', 'pendente'])
-        ).order_by(Agendamento.horario_agendamento.asc()).all()
-
-        agendamentos_completos = []
-        for ag in agendamentos:
-            ag_dict = ag.to_dict()
-            servico = Servico.query.get(ag.servico_id)
-            veiculo = Veiculo.query.get(ag.veiculo_id)
-            usuario = User.query.get(ag.user_id)
-            
-            # Buscar modelo do veículo separadamente
-            modelo_veiculo = ModeloVeiculo.query.get(veiculo.modelo_veiculo_id) if veiculo else None
-
-            ag_dict.update({
-                'servico_nome': servico.nome if servico else 'N/A',
-                'veiculo_placa': veiculo.placa if veiculo else 'N/A',
-                'modelo_veiculo_nome': modelo_veiculo.nome if modelo_veiculo else 'N/A',
-                'nome_proprietario': veiculo.nome_proprietario if veiculo else 'N/A',
-                'telefone_veiculo': veiculo.telefone if veiculo else 'N/A',
-                'cliente_nome': usuario.nome if usuario else 'N/A',
-                'cliente_telefone': usuario.telefone if usuario else 'N/A',
-                'cliente_email': usuario.email if usuario else 'N/A'
-            })
-
-            agendamentos_completos.append(ag_dict)
+        )
+        agendamentos, proximo_cursor = paginar(query, cursor, limite, crescente=True)
+
+        agendamentos_completos = [agendamento_completo(ag, incluir_cliente=True) for ag in agendamentos]
 
         return jsonify({
-            'agendamentos': agendamentos_completos
+            'agendamentos': agendamentos_completos,
+            'next_cursor': proximo_cursor
         }), 200
 
     except Exception as e:
@@ -1,13 +1,33 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt, JWTManager
+from flask_jwt_extended import create_access_token, decode_token, jwt_required, get_jwt, JWTManager
 from app import db
 from app.models import User, Administrador
 from app.utils.security import validate_email, validate_password_strength, validate_name, error_response
+from app.utils.revogacao import revogacao
+from app.utils.senhas import senhas, SenhasOcupadas
+from sqlalchemy import literal, union_all
 
 auth_bp = Blueprint('auth', __name__)
 
-# Adicione uma blacklist para tokens (em produção use Redis ou database)
-token_blacklist = set()
+def gerar_token(identidade, tipo):
+    access_token = create_access_token(identity=str(identidade), additional_claims={'tipo': tipo})
+    revogacao.registrar_emissao(decode_token(access_token))
+    return access_token
+
+def buscar_contas(email):
+    """Cliente e/ou administrador com o email, em uma única consulta pelos índices únicos"""
+    consulta = union_all(
+        db.select(literal('cliente').label('tipo'), User.id, User.senha_hash).where(User.email == email),
+        db.select(literal('admin').label('tipo'), Administrador.id, Administrador.senha_hash).where(Administrador.email == email)
+    )
+    # Cliente tem precedência, como na busca anterior tabela por tabela
+    return sorted(db.session.execute(consulta).all(), key=lambda conta: conta.tipo != 'cliente')
+
+def atualizar_custo_hash(conta, senha):
+    # Refaz o hash com o BCRYPT_ROUNDS atual no primeiro login após a mudança
+    if senhas.precisa_rehash(conta.senha_hash):
+        conta.set_password(senha)
+        db.session.commit()
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -27,22 +47,24 @@ def login():
         if not is_valid:
             return error_response(message)
 
-        # Primeiro tenta encontrar como usuário normal
-        user = User.query.filter_by(email=email.lower().strip()).first()
-
-        if user and user.check_password(senha):
-            access_token = create_access_token(identity=str(user.id))
-            return jsonify({
-                'message': 'Login realizado com sucesso',
-                'access_token': access_token,
-                'user': user.to_dict(),
-                'tipo': 'cliente'
-            }), 200
-
-        # Se não encontrou usuário, tenta como admin
-        admin = Administrador.query.filter_by(email=email.lower().strip()).first()
-        if admin and admin.check_password(senha):
-            access_token = create_access_token(identity=str(admin.id))
+        for conta in buscar_contas(email.lower().strip()):
+            if not senhas.verificar(senha, conta.senha_hash):
+                continue
+
+            if conta.tipo == 'cliente':
+                user = db.session.get(User, conta.id)
+                atualizar_custo_hash(user, senha)
+                access_token = gerar_token(user.id, 'cliente')
+                return jsonify({
+                    'message': 'Login realizado com sucesso',
+                    'access_token': access_token,
+                    'user': user.to_dict(),
+                    'tipo': 'cliente'
+                }), 200
+
+            admin = db.session.get(Administrador, conta.id)
+            atualizar_custo_hash(admin, senha)
+            access_token = gerar_token(admin.id, 'admin')
             return jsonify({
                 'message': 'Login administrativo realizado com sucesso',
                 'access_token': access_token,
@@ -52,6 +74,8 @@ def login():
 
         return error_response('Email ou senha incorretos', 401)
 
+    except SenhasOcupadas as e:
+        return error_response(str(e), 503)
     except Exception as e:
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
@@ -97,7 +121,7 @@ def register():
         db.session.add(new_user)
         db.session.commit()
 
-        access_token = create_access_token(identity=str(new_user.id))
+        access_token = gerar_token(new_user.id, 'cliente')
 
         return jsonify({
             'message': 'Usuário criado com sucesso',
@@ -106,6 +130,9 @@ def register():
             'tipo': 'cliente'
         }), 201
 
+    except SenhasOcupadas as e:
+        db.session.rollback()
+        return error_response(str(e), 503)
     except Exception as e:
         db.session.rollback()
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
@@ -129,7 +156,8 @@ def admin_login():
         if not admin or not admin.check_password(senha):
             return error_response('Credenciais administrativas incorretas', 401)
 
-        access_token = create_access_token(identity=str(admin.id))
+        atualizar_custo_hash(admin, senha)
+        access_token = gerar_token(admin.id, 'admin')
 
         return jsonify({
             'message': 'Login administrativo realizado com sucesso',
@@ -138,6 +166,8 @@ def admin_login():
             'tipo': 'admin'
         }), 200
 
+    except SenhasOcupadas as e:
+        return error_response(str(e), 503)
     except Exception as e:
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
@@ -146,9 +176,8 @@ def admin_login():
 @jwt_required()
 def logout():
     try:
-        # Adiciona o token à blacklist
-        jti = get_jwt()["jti"]
-        token_blacklist.add(jti)
+        # Revoga o token até a sua expiração
+        revogacao.revogar(get_jwt())
         
         return jsonify({
             'message': 'Logout realizado com sucesso'
@@ -161,9 +190,8 @@ def logout():
 @jwt_required()
 def admin_logout():
     try:
-        # Adiciona o token à blacklist
-        jti = get_jwt()["jti"]
-        token_blacklist.add(jti)
+        # Revoga o token até a sua expiração
+        revogacao.revogar(get_jwt())
         
         return jsonify({
             'message': 'Logout administrativo realizado com sucesso'
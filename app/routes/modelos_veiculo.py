@@ -1,14 +1,19 @@
 from flask import Blueprint, jsonify
-from app.models import ModeloVeiculo
+from app.services.catalogo import catalogo, modelos_veiculo
+from app.utils.http import resposta_condicional, gerar_etag, CACHE_PUBLICO_LONGO
 
 modelos_bp = Blueprint('modelos', __name__)
 
 @modelos_bp.route('', methods=['GET'])
 def listar_modelos():
     try:
-        modelos = ModeloVeiculo.query.all()
-        return jsonify({
-            'modelos': [modelo.to_dict() for modelo in modelos]
-        }), 200
+        # Modelos só mudam pelo init-db
+        versao, atualizado_em = catalogo.versao('modelos')
+        return resposta_condicional(
+            gerar_etag('modelos', versao, atualizado_em),
+            atualizado_em,
+            lambda: (jsonify({'modelos': modelos_veiculo()}), 200),
+            CACHE_PUBLICO_LONGO
+        )
     except Exception as e:
         return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
\ No newline at end of file
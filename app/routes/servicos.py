@@ -1,45 +1,44 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Servico, User, Administrador
-from app.utils.security import error_response
+from app.models import Servico
+from app.utils.security import error_response, admin_required
+from app.services.catalogo import catalogo, servicos_ativos
+from app.services.disponibilidade import ler_regras_grade
+from app.services.ocupacao import reconstruir_futuros
+from app.utils.http import resposta_condicional, gerar_etag, CACHE_PUBLICO_CURTO
 
 servicos_bp = Blueprint('servicos', __name__)
 
-def is_admin(user_id):
-    # Verifica se o usuário é admin
-    user = User.query.get(user_id)
-    if user and hasattr(user, 'is_admin') and user.is_admin:
-        return True
-    admin = Administrador.query.get(user_id)
-    return admin is not None
-
 # Listar serviços (acesso público)
 @servicos_bp.route('', methods=['GET'])
 def listar_servicos():
     try:
-        servicos = Servico.query.filter_by(ativo=True).all()
-        return jsonify({
-            'servicos': [s.to_dict() for s in servicos]
-        }), 200
+        versao, atualizado_em = catalogo.versao('servicos')
+        return resposta_condicional(
+            gerar_etag('servicos', versao, atualizado_em),
+            atualizado_em,
+            lambda: (jsonify({'servicos': servicos_ativos()}), 200),
+            CACHE_PUBLICO_CURTO
+        )
     except Exception as e:
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
 
 # Criar serviço (apenas admin)
 @servicos_bp.route('', methods=['POST'])
-@jwt_required()
+@admin_required('Acesso negado. Apenas administradores.')
 def criar_servico():
     try:
-        current_user_id = get_jwt_identity()
-        if not is_admin(current_user_id):
-            return error_response('Acesso negado. Apenas administradores.', 403)
-
         data = request.get_json()
         required_fields = ['nome', 'descricao', 'preco', 'duracao_minutos']
         for field in required_fields:
             if not data.get(field):
                 return error_response(f'Campo {field} é obrigatório')
 
+        try:
+            regras = ler_regras_grade(data, opcional=True)
+        except ValueError as e:
+            return error_response(str(e))
+
         if Servico.query.filter_by(nome=data['nome']).first():
             return error_response('Serviço com este nome já existe', 409)
 
@@ -47,10 +46,12 @@ def criar_servico():
             nome=data['nome'],
             descricao=data['descricao'],
             preco=float(data['preco']),
-            duracao_minutos=int(data['duracao_minutos'])
+            duracao_minutos=int(data['duracao_minutos']),
+            **regras
         )
 
         db.session.add(novo_servico)
+        catalogo.invalidar('servicos')
         db.session.commit()
 
         return jsonify({
@@ -64,16 +65,17 @@ def criar_servico():
 
 # Atualizar serviço (apenas admin)
 @servicos_bp.route('/<int:servico_id>', methods=['PUT'])
-@jwt_required()
+@admin_required('Acesso negado. Apenas administradores.')
 def atualizar_servico(servico_id):
     try:
-        current_user_id = get_jwt_identity()
-        if not is_admin(current_user_id):
-            return error_response('Acesso negado. Apenas administradores.', 403)
-
         servico = Servico.query.get_or_404(servico_id)
         data = request.get_json()
 
+        try:
+            regras = ler_regras_grade(data, opcional=True)
+        except ValueError as e:
+            return error_response(str(e))
+
         if 'nome' in data:
             servico.nome = data['nome']
         if 'descricao' in data:
@@ -84,6 +86,14 @@ def atualizar_servico(servico_id):
             servico.duracao_minutos = int(data['duracao_minutos'])
         if 'ativo' in data:
             servico.ativo = bool(data['ativo'])
+        for campo, valor in regras.items():
+            setattr(servico, campo, valor)
+
+        catalogo.invalidar('servicos')
+
+        # Duração e limpeza mudam o trecho ocupado pelos agendamentos já feitos
+        if 'duracao_minutos' in data or 'limpeza_minutos' in regras:
+            reconstruir_futuros()
 
         db.session.commit()
 
@@ -98,16 +108,13 @@ def atualizar_servico(servico_id):
 
 # Deletar serviço (apenas admin - soft delete)
 @servicos_bp.route('/<int:servico_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required('Acesso negado. Apenas administradores.')
 def deletar_servico(servico_id):
     try:
-        current_user_id = get_jwt_identity()
-        if not is_admin(current_user_id):
-            return error_response('Acesso negado. Apenas administradores.', 403)
-
         servico = Servico.query.get_or_404(servico_id)
         servico.ativo = False
 
+        catalogo.invalidar('servicos')
         db.session.commit()
 
         return jsonify({
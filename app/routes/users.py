@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
 from app.models import User
+from app.utils.senhas import SenhasOcupadas
 from app.utils.security import (
     validate_email, validate_password_strength, validate_phone, 
-    validate_name, error_response
+    validate_name, error_response, token_admin, usuario_atual
 )
 
 users_bp = Blueprint('users', __name__)
@@ -61,6 +62,9 @@ def create_user():
             'user': new_user.to_dict()
         }), 201
 
+    except SenhasOcupadas as e:
+        db.session.rollback()
+        return error_response(str(e), 503)
     except Exception as e:
         db.session.rollback()
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
@@ -69,14 +73,15 @@ def create_user():
 @jwt_required()
 def get_current_user():
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
-        if not current_user:
+        # Rotas de perfil são exclusivas de clientes
+        if token_admin():
             return error_response('Usuário não encontrado', 404)
+        usuario = usuario_atual()
+        if usuario is None:
+            return error_response('Usuário do token não encontrado', 401)
 
         return jsonify({
-            'user': current_user.to_dict()
+            'user': usuario.to_dict()
         }), 200
     except Exception as e:
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
@@ -85,11 +90,12 @@ def get_current_user():
 @jwt_required()
 def update_current_user():
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
-        if not current_user:
+        # Rotas de perfil são exclusivas de clientes
+        if token_admin():
             return error_response('Usuário não encontrado', 404)
+        usuario = usuario_atual()
+        if usuario is None:
+            return error_response('Usuário do token não encontrado', 401)
             
         data = request.get_json()
 
@@ -97,19 +103,19 @@ def update_current_user():
             is_valid, message = validate_name(data['nome'])
             if not is_valid:
                 return error_response(message)
-            current_user.nome = data['nome'].strip()
+            usuario.nome = data['nome'].strip()
 
         if 'telefone' in data:
             is_valid, message = validate_phone(data['telefone'])
             if not is_valid:
                 return error_response(message)
-            current_user.telefone = data['telefone']
+            usuario.telefone = data['telefone']
 
         db.session.commit()
 
         return jsonify({
             'message': 'Dados atualizados com sucesso',
-            'user': current_user.to_dict()
+            'user': usuario.to_dict()
         }), 200
 
     except Exception as e:
@@ -120,11 +126,12 @@ def update_current_user():
 @jwt_required()
 def update_password():
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
-        if not current_user:
+        # Rotas de perfil são exclusivas de clientes
+        if token_admin():
             return error_response('Usuário não encontrado', 404)
+        usuario = usuario_atual()
+        if usuario is None:
+            return error_response('Usuário do token não encontrado', 401)
 
         data = request.get_json()
 
@@ -133,7 +140,7 @@ def update_password():
             if not data.get(field):
                 return error_response(f'Campo {field} é obrigatório')
 
-        if not current_user.check_password(data['senha_atual']):
+        if not usuario.check_password(data['senha_atual']):
             return error_response('Senha atual incorreta')
 
         if data['nova_senha'] != data['confirmar_senha']:
@@ -143,13 +150,16 @@ def update_password():
         if not is_valid:
             return error_response(message)
 
-        current_user.set_password(data['nova_senha'])
+        usuario.set_password(data['nova_senha'])
         db.session.commit()
 
         return jsonify({
             'message': 'Senha atualizada com sucesso'
         }), 200
 
+    except SenhasOcupadas as e:
+        db.session.rollback()
+        return error_response(str(e), 503)
     except Exception as e:
         db.session.rollback()
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
\ No newline at end of file
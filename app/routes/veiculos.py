@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import Veiculo, ModeloVeiculo, Agendamento
 from app.utils.security import validate_placa, error_response
+from app.utils.http import resposta_condicional, gerar_etag, CACHE_PRIVADO_REVALIDAR
+from app.services.catalogo import catalogo
 from datetime import datetime
 
 veiculos_bp = Blueprint('veiculos', __name__)
@@ -12,18 +14,32 @@ veiculos_bp = Blueprint('veiculos', __name__)
 def listar_veiculos():
     try:
         current_user_id = get_jwt_identity()
-        veiculos = Veiculo.query.filter_by(usuario_id=current_user_id).all()
 
-        veiculos_completos = []
-        for veiculo in veiculos:
-            veiculo_dict = veiculo.to_dict()
-            modelo = ModeloVeiculo.query.get(veiculo.modelo_veiculo_id)
-            veiculo_dict['modelo_nome'] = modelo.nome if modelo else 'N/A'
-            veiculos_completos.append(veiculo_dict)
+        # Resumo pelo índice de usuario_id: muda com inclusão, remoção ou edição
+        total, ultima_alteracao, soma_ids = db.session.query(
+            db.func.count(Veiculo.id),
+            db.func.max(Veiculo.atualizado_em),
+            db.func.sum(Veiculo.id)
+        ).filter(Veiculo.usuario_id == current_user_id).one()
+        etag = gerar_etag('veiculos', current_user_id, total, ultima_alteracao, soma_ids, catalogo.versao('modelos')[0])
 
-        return jsonify({
-            'veiculos': veiculos_completos
-        }), 200
+        def gerar():
+            veiculos = Veiculo.query.filter_by(usuario_id=current_user_id).all()
+
+            veiculos_completos = []
+            for veiculo in veiculos:
+                veiculo_dict = veiculo.to_dict()
+                # Modelo já carregado junto (lazy='joined')
+                veiculo_dict['modelo_nome'] = veiculo.modelo.nome if veiculo.modelo else 'N/A'
+                veiculos_completos.append(veiculo_dict)
+
+            return jsonify({
+                'veiculos': veiculos_completos
+            }), 200
+
+        # Sem Last-Modified: max(atualizado_em) não muda quando um veículo é removido,
+        # e If-Modified-Since devolveria 304 com a lista antiga. Só o ETag valida.
+        return resposta_condicional(etag, None, gerar, CACHE_PRIVADO_REVALIDAR)
 
     except Exception as e:
         return error_response(f'Erro interno do servidor: {str(e)}', 500)
@@ -95,7 +111,7 @@ def atualizar_veiculo(veiculo_id):
         current_user_id = get_jwt_identity()
         veiculo = Veiculo.query.get_or_404(veiculo_id)
 
-        if veiculo.usuario_id != current_user_id:
+        if veiculo.usuario_id != int(current_user_id):
             return error_response('Acesso negado', 403)
 
         data = request.get_json()
@@ -133,7 +149,7 @@ def deletar_veiculo(veiculo_id):
         current_user_id = get_jwt_identity()
         veiculo = Veiculo.query.get_or_404(veiculo_id)
 
-        if veiculo.usuario_id != current_user_id:
+        if veiculo.usuario_id != int(current_user_id):
             return error_response('Acesso negado', 403)
 
         # Verificar se existem agendamentos futuros para este veículo
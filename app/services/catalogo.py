@@ -0,0 +1,90 @@
+from flask import g, has_request_context
+from app import db
+from app.models import Servico, ModeloVeiculo, HorarioFuncionamento, VersaoCatalogo
+from app.utils.cache import CacheTTL
+
+# Carga completa de cada catálogo, já no formato das respostas
+CATALOGOS = {
+    'servicos': lambda: {s.id: s.to_dict() for s in Servico.query.order_by(Servico.id).all()},
+    'modelos': lambda: [m.to_dict() for m in ModeloVeiculo.query.order_by(ModeloVeiculo.id).all()],
+    'horarios': lambda: {h.dia_semana: h.to_dict() for h in HorarioFuncionamento.query.all()}
+}
+
+class CacheCatalogos:
+    """Cache em memória das tabelas de referência, invalidado por versão.
+
+    Cada catálogo tem um contador em versoes_catalogo que é incrementado na
+    mesma transação da escrita. Leitores consultam só os contadores (uma vez
+    por requisição) e recarregam o catálogo quando a versão mudou ou o TTL
+    venceu, então um worker enxerga a alteração feita por outro.
+    """
+
+    def __init__(self):
+        self.cache = CacheTTL()
+        self.ttl = 300
+
+    def init_app(self, app):
+        self.ttl = int(app.config.get('CATALOGO_CACHE_TTL', 300))
+        self.cache.limpar()
+
+    def versoes(self):
+        if has_request_context() and '_versoes_catalogo' in g:
+            return g._versoes_catalogo
+
+        versoes = {nome: (versao, atualizado_em) for nome, versao, atualizado_em in db.session.execute(
+            db.select(VersaoCatalogo.nome, VersaoCatalogo.versao, VersaoCatalogo.atualizado_em)
+        )}
+
+        if has_request_context():
+            g._versoes_catalogo = versoes
+        return versoes
+
+    def versao(self, nome):
+        """(versao, atualizado_em) do catálogo; (0, None) se nunca foi alterado"""
+        return self.versoes().get(nome, (0, None))
+
+    def obter(self, nome):
+        versao = self.versao(nome)[0]
+
+        item = self.cache.obter(nome)
+        if item is not None and item[0] == versao:
+            return item[1]
+
+        # A versão é lida antes dos dados: uma escrita no meio só causa uma recarga extra
+        dados = CATALOGOS[nome]()
+        self.cache.definir(nome, (versao, dados), self.ttl)
+        return dados
+
+    def invalidar(self, nome):
+        """Incrementa a versão na transação atual; vale para todos os workers após o commit"""
+        resultado = db.session.execute(
+            db.update(VersaoCatalogo)
+            .where(VersaoCatalogo.nome == nome)
+            .values(versao=VersaoCatalogo.versao + 1, atualizado_em=db.func.current_timestamp())
+            .execution_options(synchronize_session=False)
+        )
+        if resultado.rowcount == 0:
+            db.session.add(VersaoCatalogo(nome=nome, versao=1))
+
+        self.cache.remover(nome)
+        if has_request_context():
+            g.pop('_versoes_catalogo', None)
+
+catalogo = CacheCatalogos()
+
+def servicos_ativos():
+    return [s for s in catalogo.obter('servicos').values() if s['ativo']]
+
+def obter_servico(servico_id):
+    """Serviço (ativo ou não) pelo ID, como dicionário, ou None"""
+    try:
+        return catalogo.obter('servicos').get(int(servico_id))
+    except (TypeError, ValueError):
+        return None
+
+def modelos_veiculo():
+    return catalogo.obter('modelos')
+
+def horarios_funcionamento():
+    """Horários por dia da semana (domingo=0)"""
+    return catalogo.obter('horarios')
@@ -0,0 +1,457 @@
+from app import db
+from app.models import Agendamento, Servico, OcupacaoDia
+from app.services.catalogo import horarios_funcionamento
+from sqlalchemy.exc import IntegrityError
+from datetime import time, timedelta
+import heapq
+
+# Status que ocupam o horário de um agendamento
+STATUS_OCUPANTES = ('pendente', 'confirmado')
+
+# Grade de horários e limpeza entre agendamentos quando nem o serviço nem o dia definem
+INTERVALO_PADRAO = 30
+LIMPEZA_PADRAO = 0
+
+# Limite (em minutos) da grade e da limpeza configuráveis
+MAX_MINUTOS_REGRA = 240
+
+# Limite de dias por consulta de período
+MAX_DIAS_PERIODO = 62
+
+# Mapa de ocupação: um bit por trecho de 5 minutos do dia, para cada box
+MINUTOS_POR_BIT = 5
+BITS_DIA = 24 * 60 // MINUTOS_POR_BIT
+BYTES_POR_BOX = BITS_DIA // 8
+
+def dia_semana(data):
+    """Converte date.weekday() (segunda=0) para o padrão da tabela (domingo=0)"""
+    return (data.weekday() + 1) % 7
+
+def minutos(horario):
+    return horario.hour * 60 + horario.minute
+
+def horario_de_minutos(total):
+    return time(total // 60, total % 60)
+
+def expediente(horario_func):
+    """(abertura, fechamento, boxes, intervalo, limpeza) do dia, em minutos, ou None se fechado"""
+    if not horario_func or not horario_func['aberto']:
+        return None
+    if not horario_func['hora_abertura'] or not horario_func['hora_fechamento']:
+        return None
+    return (
+        minutos(time.fromisoformat(horario_func['hora_abertura'])),
+        minutos(time.fromisoformat(horario_func['hora_fechamento'])),
+        max(horario_func.get('quantidade_boxes') or 1, 1),
+        horario_func.get('intervalo_minutos') or INTERVALO_PADRAO,
+        horario_func.get('limpeza_minutos') or LIMPEZA_PADRAO
+    )
+
+def ler_regras_grade(dados, opcional=False):
+    """intervalo_minutos e limpeza_minutos presentes em dados, validados.
+
+    A grade precisa ser múltipla da resolução do mapa de ocupação. Com
+    opcional=True (serviços), null remove a regra e vale a do dia. Lança
+    ValueError se algum valor for inválido.
+    """
+    regras = {}
+
+    if 'intervalo_minutos' in dados:
+        intervalo = dados['intervalo_minutos']
+        if not (intervalo is None and opcional):
+            if type(intervalo) is not int or not MINUTOS_POR_BIT <= intervalo <= MAX_MINUTOS_REGRA or intervalo % MINUTOS_POR_BIT:
+                raise ValueError(f'intervalo_minutos deve ser múltiplo de {MINUTOS_POR_BIT} entre {MINUTOS_POR_BIT} e {MAX_MINUTOS_REGRA}')
+        regras['intervalo_minutos'] = intervalo
+
+    if 'limpeza_minutos' in dados:
+        limpeza = dados['limpeza_minutos']
+        if not (limpeza is None and opcional):
+            if type(limpeza) is not int or not 0 <= limpeza <= MAX_MINUTOS_REGRA:
+                raise ValueError(f'limpeza_minutos deve ser um inteiro entre 0 e {MAX_MINUTOS_REGRA}')
+        regras['limpeza_minutos'] = limpeza
+
+    return regras
+
+def mascara(inicio, fim):
+    """Bits dos trechos de 5 minutos tocados por [inicio, fim).
+
+    Horários fora da grade de 5 minutos ocupam o trecho inteiro, então o mapa
+    nunca libera um horário que os intervalos exatos bloqueariam.
+    """
+    primeiro = max(inicio, 0) // MINUTOS_POR_BIT
+    ultimo = min(-(-fim // MINUTOS_POR_BIT), BITS_DIA)
+    if ultimo <= primeiro:
+        return 0
+    return ((1 << (ultimo - primeiro)) - 1) << primeiro
+
+def decodificar_mapa(mapa):
+    """bytes de ocupacao_dias.mapa -> um inteiro por box (posição 0 = box 1)"""
+    mapa = mapa or b''
+    return [int.from_bytes(mapa[i:i + BYTES_POR_BOX], 'big') for i in range(0, len(mapa), BYTES_POR_BOX)]
+
+def codificar_mapa(mapas):
+    return b''.join(bits.to_bytes(BYTES_POR_BOX, 'big') for bits in mapas)
+
+def montar_mapa(ocupados):
+    """Bits de cada box a partir dos intervalos (inicio, fim, box, chave) do dia"""
+    if any(o[2] is None for o in ocupados):
+        # Agendamentos sem box (anteriores aos boxes): distribuídos só para o mapa
+        ocupados = particionar_boxes(ocupados)
+
+    mapas = []
+    for inicio, fim, box, _ in ocupados:
+        while len(mapas) < box:
+            mapas.append(0)
+        mapas[box - 1] |= mascara(inicio, fim)
+    return mapas
+
+def ler_mapas(inicio, fim, bloquear=False):
+    """Mapas de ocupação por dia entre inicio e fim, lidos só de ocupacao_dias.
+
+    Dias sem linha (ou sem mapa) não têm agendamentos ocupando horário.
+    """
+    query = db.session.query(OcupacaoDia.data, OcupacaoDia.mapa)
+
+    if inicio == fim:
+        query = query.filter(OcupacaoDia.data == inicio)
+    else:
+        query = query.filter(OcupacaoDia.data.between(inicio, fim))
+
+    if bloquear:
+        query = query.with_for_update(read=True)
+
+    return {data: decodificar_mapa(mapa) for data, mapa in query.all() if mapa}
+
+def vaos_livres(lotado):
+    """Trechos livres [inicio, fim) em minutos de um mapa de bits, em ordem.
+
+    Cada trecho sai de duas operações sobre o inteiro (bit mais baixo e o
+    "vai um" da soma até o fim da sequência de uns), então o custo depende do
+    número de trechos e não do tamanho da grade. fim é None quando o trecho
+    vai até o fim do dia.
+    """
+    livre = ~lotado & ((1 << BITS_DIA) - 1)
+    vaos = []
+    while livre:
+        primeiro = (livre & -livre).bit_length() - 1
+        ultimo = ((livre + (1 << primeiro)) & ~livre).bit_length() - 1
+        vaos.append((primeiro * MINUTOS_POR_BIT, ultimo * MINUTOS_POR_BIT if ultimo < BITS_DIA else None))
+        livre &= ~((1 << ultimo) - 1)
+    return vaos
+
+def horarios_nos_vaos(vaos, abertura, fechamento, duracao_minutos, intervalo=INTERVALO_PADRAO, limpeza=0, a_partir_de=None):
+    """Horários da grade (contada a partir da abertura) em que serviço e limpeza cabem em um vão livre.
+
+    Em cada vão o primeiro e o último início possíveis são calculados direto,
+    então uma grade de 5 minutos custa o mesmo que uma de 30.
+    """
+    livres = []
+    minimo = abertura if a_partir_de is None else max(abertura, a_partir_de)
+    ultimo_inicio = fechamento - duracao_minutos
+
+    for vao_inicio, vao_fim in vaos:
+        inicio = max(vao_inicio, minimo)
+        if inicio > ultimo_inicio:
+            break
+
+        # Próximo horário da grade a partir do início do vão
+        inicio = abertura + -(-(inicio - abertura) // intervalo) * intervalo
+        fim = ultimo_inicio if vao_fim is None else min(ultimo_inicio, vao_fim - duracao_minutos - limpeza)
+        livres.extend(range(inicio, fim + 1, intervalo))
+
+    return livres
+
+class OcupacaoDoDia:
+    """Expediente e mapa de bits de um dia, com as reservas feitas na transação.
+
+    Testar um horário é um AND entre máscaras: o horário (serviço mais
+    limpeza) cabe se em nenhum trecho dele todos os boxes estão ocupados, e vai
+    para o primeiro box cujo mapa está livre no intervalo inteiro.
+    """
+
+    def __init__(self, data, horario, mapas):
+        self.data = data
+        self.abertura, self.fechamento, self.capacidade, self.intervalo, self.limpeza = horario
+        self.mapas = list(mapas) + [0] * max(self.capacidade - len(mapas), 0)
+        self.reservas = {}
+
+    def lotado(self):
+        """Bits dos trechos com todos os boxes ocupados"""
+        bits = (1 << BITS_DIA) - 1
+        for mapa in self.mapas[:self.capacidade]:
+            bits &= mapa
+        return bits
+
+    def regras(self, servico):
+        """Duração, grade e limpeza do serviço neste dia (as do serviço valem sobre as do dia)"""
+        limpeza = servico.get('limpeza_minutos')
+        return (
+            servico['duracao_minutos'],
+            servico.get('intervalo_minutos') or self.intervalo,
+            self.limpeza if limpeza is None else limpeza
+        )
+
+    def cabe(self, inicio, servico):
+        """Se o serviço começando em inicio termina no expediente e, com a limpeza, tem box livre"""
+        duracao, _, limpeza = self.regras(servico)
+        if inicio < self.abertura or inicio + duracao > self.fechamento:
+            return False
+        return not self.lotado() & mascara(inicio, inicio + duracao + limpeza)
+
+    def livres(self, servico, a_partir_de=None):
+        """Horários da grade (em minutos) em que o serviço cabe, a partir dos vãos livres do dia"""
+        duracao, intervalo, limpeza = self.regras(servico)
+        return horarios_nos_vaos(
+            vaos_livres(self.lotado()), self.abertura, self.fechamento, duracao, intervalo, limpeza, a_partir_de
+        )
+
+    def reservar(self, inicio, servico, chave):
+        """Marca serviço e limpeza no primeiro box livre e retorna o box, ou None se não couber"""
+        if not self.cabe(inicio, servico):
+            return None
+
+        duracao, _, limpeza = self.regras(servico)
+        fim = inicio + duracao + limpeza
+        bits = mascara(inicio, fim)
+        for indice, mapa in enumerate(self.mapas[:self.capacidade]):
+            if not mapa & bits:
+                self.mapas[indice] |= bits
+                self.reservas[chave] = (inicio, fim, indice + 1)
+                return indice + 1
+
+        return self._redistribuir(inicio, fim, chave)
+
+    def _redistribuir(self, inicio, fim, chave):
+        # Há capacidade, mas nenhum box está livre o tempo todo: refaz a
+        # distribuição a partir dos intervalos do dia (caso raro, lê agendamentos)
+        ocupados = consultar_ocupados(self.data, self.data, bloquear=True).get(self.data, [])
+        ocupados += [(i, f, box, c) for c, (i, f, box) in self.reservas.items()]
+
+        boxes_anteriores = {o[3]: o[2] for o in ocupados}
+        box = alocar_box(ocupados, inicio, fim, self.capacidade, chave)
+        if box is None:
+            return None
+
+        gravar_boxes(boxes_anteriores, ocupados)
+        self.reservas = {o[3]: (o[0], o[1], o[2]) for o in ocupados if not isinstance(o[3], int)}
+        mapas = montar_mapa(ocupados)
+        self.mapas = mapas + [0] * max(self.capacidade - len(mapas), 0)
+        return box
+
+    def box(self, chave):
+        """Box final de uma reserva (uma redistribuição posterior pode tê-lo mudado)"""
+        return self.reservas[chave][2]
+
+def carregar_ocupacao(data, bloquear=False):
+    """Ocupação do dia a partir do cache de horários e de ocupacao_dias, ou None se fechado"""
+    horario = expediente(horarios_funcionamento().get(dia_semana(data)))
+
+    if not horario:
+        return None
+
+    return OcupacaoDoDia(data, horario, ler_mapas(data, data, bloquear).get(data, []))
+
+def consultar_ocupados(inicio, fim, bloquear=False):
+    """Intervalos ocupados por dia entre inicio e fim, em uma única consulta.
+
+    Cada intervalo é (inicio, fim, box, agendamento_id), com horários em minutos;
+    fim inclui a limpeza do serviço (ou a do dia, se o serviço não define).
+    """
+    query = db.session.query(
+        Agendamento.data_agendamento,
+        Agendamento.horario_agendamento,
+        Servico.duracao_minutos,
+        Servico.limpeza_minutos,
+        Agendamento.box,
+        Agendamento.id
+    ).join(Servico, Servico.id == Agendamento.servico_id).filter(
+        Agendamento.status.in_(STATUS_OCUPANTES)
+    )
+
+    # Igualdade no caso de um dia só aproveita as duas colunas de ix_agendamentos_data_status
+    if inicio == fim:
+        query = query.filter(Agendamento.data_agendamento == inicio)
+    else:
+        query = query.filter(Agendamento.data_agendamento.between(inicio, fim))
+
+    # Leitura com trava enxerga a última versão confirmada no MySQL,
+    # mesmo que a transação já tenha lido algo antes
+    if bloquear:
+        query = query.with_for_update(read=True)
+
+    horarios = horarios_funcionamento()
+    ocupados = {}
+    for data, horario, duracao, limpeza, box, agendamento_id in query.all():
+        if limpeza is None:
+            limpeza = (horarios.get(dia_semana(data)) or {}).get('limpeza_minutos') or LIMPEZA_PADRAO
+        ocupados.setdefault(data, []).append((minutos(horario), minutos(horario) + duracao + limpeza, box, agendamento_id))
+    return ocupados
+
+def intervalos_lotados(ocupados, capacidade=1):
+    """Trechos em que os agendamentos simultâneos ocupam todos os boxes.
+
+    Varredura de eventos ordenados (+1 no início, -1 no fim de cada
+    agendamento), O(N log N). No mesmo minuto o fim vem antes do início, então
+    agendamentos encostados não contam como simultâneos. Os trechos saem
+    ordenados e disjuntos.
+    """
+    eventos = sorted([(o[0], 1) for o in ocupados] + [(o[1], -1) for o in ocupados])
+
+    lotados = []
+    simultaneos = 0
+    for minuto, passo in eventos:
+        anterior = simultaneos
+        simultaneos += passo
+        if anterior < capacidade <= simultaneos:
+            if lotados and lotados[-1][1] == minuto:
+                # Encostado no trecho anterior: continua o mesmo
+                lotados[-1][1] = None
+            else:
+                lotados.append([minuto, None])
+        elif simultaneos < capacidade <= anterior:
+            lotados[-1][1] = minuto
+    return lotados
+
+def cabe_no_dia(ocupados, inicio, fim, capacidade=1):
+    """Se [inicio, fim) não cruza nenhum trecho com todos os boxes ocupados"""
+    return not any(inicio < lotado_fim and fim > lotado_inicio for lotado_inicio, lotado_fim in intervalos_lotados(ocupados, capacidade))
+
+def particionar_boxes(ocupados):
+    """Redistribui os intervalos do dia pelos boxes (particionamento guloso).
+
+    Em ordem de início, cada agendamento vai para o box de menor número já
+    liberado, ou abre o próximo box. Usa o mínimo de boxes possível (o maior
+    número de agendamentos simultâneos), em O(N log N).
+    """
+    em_uso = []
+    liberados = []
+    proximo_box = 1
+    resultado = []
+
+    for inicio, fim, _, chave in sorted(ocupados, key=lambda o: (o[0], o[1])):
+        while em_uso and em_uso[0][0] <= inicio:
+            heapq.heappush(liberados, heapq.heappop(em_uso)[1])
+
+        if liberados:
+            box = heapq.heappop(liberados)
+        else:
+            box = proximo_box
+            proximo_box += 1
+
+        heapq.heappush(em_uso, (fim, box))
+        resultado.append((inicio, fim, box, chave))
+
+    return resultado
+
+def alocar_box(ocupados, inicio, fim, capacidade, chave):
+    """Inclui [inicio, fim) em ocupados e retorna o box atribuído, ou None se lotado.
+
+    Usa um box livre durante todo o intervalo sem mexer nos demais. Se ainda
+    há capacidade mas os boxes estão fragmentados (nenhum livre o tempo todo),
+    redistribui o dia com particionar_boxes; ocupados é alterada no lugar e o
+    chamador grava os boxes que mudaram (ver gravar_boxes).
+    """
+    if not cabe_no_dia(ocupados, inicio, fim, capacidade):
+        return None
+
+    em_uso = {o[2] for o in ocupados if o[0] < fim and o[1] > inicio}
+    livres = [box for box in range(1, capacidade + 1) if box not in em_uso]
+
+    if livres and None not in em_uso:
+        ocupados.append((inicio, fim, livres[0], chave))
+        return livres[0]
+
+    ocupados[:] = particionar_boxes(ocupados + [(inicio, fim, None, chave)])
+    return next(o[2] for o in ocupados if o[3] == chave)
+
+def gravar_boxes(boxes_anteriores, ocupados):
+    """Atualiza os agendamentos já gravados cujo box mudou na redistribuição"""
+    for _, _, box, chave in ocupados:
+        if isinstance(chave, int) and boxes_anteriores.get(chave) != box:
+            db.session.execute(
+                db.update(Agendamento).where(Agendamento.id == chave).values(box=box)
+                .execution_options(synchronize_session=False)
+            )
+
+def listar_horarios_livres(data, servico):
+    """Retorna os horários livres do dia para o serviço no formato HH:MM"""
+    dia = carregar_ocupacao(data)
+
+    if not dia:
+        return []
+
+    return [horario_de_minutos(m).strftime('%H:%M') for m in dia.livres(servico)]
+
+def calcular_disponibilidade_periodo(inicio, fim, servico):
+    """Horários livres de cada dia do período.
+
+    Usa os horários de funcionamento do cache e os mapas de ocupação do
+    período, lidos em uma consulta a ocupacao_dias.
+    """
+    horarios_func = horarios_funcionamento()
+    mapas = ler_mapas(inicio, fim)
+
+    dias = []
+    data = inicio
+    while data <= fim:
+        horario = expediente(horarios_func.get(dia_semana(data)))
+        aberto = horario is not None
+
+        livres = []
+        if aberto:
+            livres = OcupacaoDoDia(data, horario, mapas.get(data, [])).livres(servico)
+
+        dias.append({
+            'data': data.isoformat(),
+            'aberto': aberto,
+            'horarios_disponiveis': [horario_de_minutos(m).strftime('%H:%M') for m in livres],
+            'total_livres': len(livres)
+        })
+        data += timedelta(days=1)
+
+    return dias
+
+def verificar_disponibilidade(data_agendamento, horario_agendamento, servico, bloquear=False):
+    dia = carregar_ocupacao(data_agendamento, bloquear)
+
+    if not dia:
+        return False
+
+    # Dentro do expediente e com algum box livre durante o serviço e a limpeza
+    return dia.cabe(minutos(horario_agendamento), servico)
+
+def bloquear_dia(data):
+    """Trava a linha do dia em ocupacao_dias até o fim da transação.
+
+    Reservas do mesmo dia passam a ser serializadas entre si, enquanto dias
+    diferentes seguem em paralelo. O UPDATE funciona como SELECT ... FOR UPDATE
+    no MySQL e obtém a trava de escrita no SQLite.
+    """
+    if db.session.get(OcupacaoDia, data) is None:
+        # Criar a linha fora da transação atual para não disputar gap lock
+        try:
+            with db.engine.begin() as conexao:
+                conexao.execute(db.insert(OcupacaoDia).values(data=data, versao=0))
+        except IntegrityError:
+            pass
+
+    db.session.execute(
+        db.update(OcupacaoDia)
+        .where(OcupacaoDia.data == data)
+        .values(versao=OcupacaoDia.versao + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def reservar_horario(data_agendamento, horario_agendamento, servico):
+    """Verifica a disponibilidade com o dia travado e retorna o box reservado (ou None).
+
+    Deve ser chamada na mesma transação que insere o agendamento: a trava só
+    é liberada no commit ou rollback.
+    """
+    bloquear_dia(data_agendamento)
+    dia = carregar_ocupacao(data_agendamento, bloquear=True)
+
+    if not dia:
+        return None
+
+    return dia.reservar(minutos(horario_agendamento), servico, chave='novo')
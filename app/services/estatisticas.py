@@ -0,0 +1,129 @@
+from app import db
+from app.models import Agendamento, EstatisticaDiaria
+from app.utils.agendador import tarefa_periodica
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from datetime import date, timedelta
+from decimal import Decimal
+
+# Colunas de Agendamento que entram na estatística
+CAMPOS = ('data_agendamento', 'status', 'valor_total')
+
+def _acumular(deltas, data, status, valor, sinal):
+    item = deltas.setdefault((data, status or 'pendente'), [0, Decimal('0')])
+    item[0] += sinal
+    item[1] += sinal * Decimal(str(valor or 0))
+
+def somar_estatisticas(conexao, deltas):
+    """Aplica {(data, status): [quantidade, receita]} com upsert, sem ler a tabela"""
+    for (data, status), (quantidade, receita) in deltas.items():
+        if quantidade == 0 and receita == 0:
+            continue
+
+        valores = {'data': data, 'status': status, 'quantidade': quantidade, 'receita': receita}
+        dialeto = conexao.dialect.name
+
+        if dialeto == 'mysql':
+            stmt = mysql.insert(EstatisticaDiaria).values(**valores)
+            stmt = stmt.on_duplicate_key_update(
+                quantidade=EstatisticaDiaria.quantidade + stmt.inserted.quantidade,
+                receita=EstatisticaDiaria.receita + stmt.inserted.receita
+            )
+            conexao.execute(stmt)
+        elif dialeto in ('sqlite', 'postgresql'):
+            modulo = sqlite if dialeto == 'sqlite' else postgresql
+            stmt = modulo.insert(EstatisticaDiaria).values(**valores)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['data', 'status'],
+                set_={
+                    'quantidade': EstatisticaDiaria.quantidade + stmt.excluded.quantidade,
+                    'receita': EstatisticaDiaria.receita + stmt.excluded.receita
+                }
+            )
+            conexao.execute(stmt)
+        else:
+            resultado = conexao.execute(
+                db.update(EstatisticaDiaria)
+                .where(EstatisticaDiaria.data == data, EstatisticaDiaria.status == status)
+                .values(quantidade=EstatisticaDiaria.quantidade + quantidade, receita=EstatisticaDiaria.receita + receita)
+            )
+            if resultado.rowcount == 0:
+                conexao.execute(db.insert(EstatisticaDiaria).values(**valores))
+
+def _valores_anteriores(agendamento):
+    estado = inspect(agendamento)
+    valores = []
+    for campo in CAMPOS:
+        historico = estado.attrs[campo].history
+        if historico.deleted:
+            valores.append(historico.deleted[0])
+        else:
+            valores.append(getattr(agendamento, campo))
+    return valores
+
+# Carrega o valor antigo antes de sobrescrever, mesmo que o atributo ainda não tenha sido lido
+for _campo in CAMPOS:
+    event.listen(getattr(Agendamento, _campo), 'set', lambda *args: None, active_history=True)
+
+@event.listens_for(db.session, 'before_flush')
+def atualizar_estatisticas(session, flush_context, instances):
+    """Mantém estatisticas_diarias na mesma transação de cada criação/alteração de agendamento"""
+    deltas = {}
+
+    for obj in session.new:
+        if isinstance(obj, Agendamento):
+            _acumular(deltas, obj.data_agendamento, obj.status, obj.valor_total, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Agendamento):
+            _acumular(deltas, *_valores_anteriores(obj), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Agendamento):
+            continue
+        estado = inspect(obj)
+        if not any(estado.attrs[campo].history.has_changes() for campo in CAMPOS):
+            continue
+        _acumular(deltas, *_valores_anteriores(obj), -1)
+        _acumular(deltas, obj.data_agendamento, obj.status, obj.valor_total, 1)
+
+    if deltas:
+        somar_estatisticas(session.connection(), deltas)
+
+def recalcular_estatisticas(inicio=None, fim=None):
+    """Refaz estatisticas_diarias a partir de agendamentos (período aberto = todos os dias)"""
+    filtro_estatisticas = []
+    filtro_agendamentos = []
+    if inicio:
+        filtro_estatisticas.append(EstatisticaDiaria.data >= inicio)
+        filtro_agendamentos.append(Agendamento.data_agendamento >= inicio)
+    if fim:
+        filtro_estatisticas.append(EstatisticaDiaria.data <= fim)
+        filtro_agendamentos.append(Agendamento.data_agendamento <= fim)
+
+    db.session.execute(db.delete(EstatisticaDiaria).where(*filtro_estatisticas))
+    resultado = db.session.execute(
+        db.insert(EstatisticaDiaria).from_select(
+            ['data', 'status', 'quantidade', 'receita'],
+            db.select(
+                Agendamento.data_agendamento,
+                Agendamento.status,
+                db.func.count(Agendamento.id),
+                db.func.coalesce(db.func.sum(Agendamento.valor_total), 0)
+            ).where(*filtro_agendamentos).group_by(Agendamento.data_agendamento, Agendamento.status)
+        )
+    )
+    db.session.commit()
+    return {'linhas': resultado.rowcount}
+
+@tarefa_periodica('recalcular-estatisticas', intervalo=24 * 3600)
+def recalcular_estatisticas_recentes():
+    # Corrige eventuais desvios da última semana em diante
+    return recalcular_estatisticas(inicio=date.today() - timedelta(days=7))
+
+def estatisticas_periodo(inicio):
+    """{(data, status): (quantidade, receita)} de inicio em diante"""
+    linhas = db.session.query(
+        EstatisticaDiaria.data, EstatisticaDiaria.status, EstatisticaDiaria.quantidade, EstatisticaDiaria.receita
+    ).filter(EstatisticaDiaria.data >= inicio).all()
+    return {(data, status): (quantidade, receita) for data, status, quantidade, receita in linhas}
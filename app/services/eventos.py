@@ -0,0 +1,222 @@
+from app import db
+from app.models import Agendamento, AgendamentoEvento, Sequencia
+from app.utils.agendador import tarefa_periodica
+from app.utils.eventos import corretor
+from sqlalchemy import event, inspect
+from datetime import datetime, timedelta, timezone
+from queue import Empty
+import json
+
+TIPOS_EVENTO = ('criado', 'cancelado', 'status_alterado', 'reagendado', 'removido')
+
+# Eventos mais antigos são removidos pela tarefa limpar-eventos
+RETENCAO_EVENTOS = timedelta(hours=24)
+
+# Eventos reenviados por conexão a partir do Last-Event-ID; o restante vem na reconexão seguinte
+MAX_HISTORICO = 500
+
+# Espera sugerida ao navegador antes de reconectar (campo retry do SSE)
+RECONEXAO_MS = 1000
+
+# Linha de sequencias que numera agendamento_eventos
+SEQUENCIA_EVENTOS = 'agendamento_eventos'
+
+# Linha de sequencias com o maior id já removido pela retenção
+SEQUENCIA_REMOVIDOS = 'agendamento_eventos_removidos'
+
+def agora_utc():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _tipo(session, obj):
+    """Tipo do evento da alteração pendente do agendamento, ou None se não gera evento"""
+    if obj in session.new:
+        return 'criado'
+    if obj in session.deleted:
+        return 'removido'
+
+    estado = inspect(obj)
+    if estado.attrs.status.history.has_changes():
+        return 'cancelado' if obj.status == 'cancelado' else 'status_alterado'
+    if estado.attrs.data_agendamento.history.has_changes() or estado.attrs.horario_agendamento.history.has_changes():
+        return 'reagendado'
+    return None
+
+def travar_sequencia(conexao):
+    """Trava a sequência dos eventos até o fim da transação e retorna o último id usado.
+
+    Com a trava, uma transação só numera seus eventos depois que a anterior
+    terminou: um id visível garante que os menores já foram confirmados (ou
+    desfeitos junto com a sequência). Por isso a numeração fica para o commit,
+    e a trava dura só até ele.
+    """
+    ultimo = conexao.execute(
+        db.select(Sequencia.valor).where(Sequencia.nome == SEQUENCIA_EVENTOS).with_for_update()
+    ).scalar()
+    if ultimo is None:
+        # Bancos criados por db.create_all: continua do maior id existente
+        ultimo = conexao.execute(db.select(db.func.coalesce(db.func.max(AgendamentoEvento.id), 0))).scalar()
+        conexao.execute(db.insert(Sequencia).values(nome=SEQUENCIA_EVENTOS, valor=ultimo))
+    return ultimo
+
+def avancar_sequencia(conexao, valor):
+    conexao.execute(db.update(Sequencia).where(Sequencia.nome == SEQUENCIA_EVENTOS).values(valor=valor))
+
+def valor_sequencia(nome):
+    return db.session.query(Sequencia.valor).filter(Sequencia.nome == nome).scalar() or 0
+
+@event.listens_for(db.session, 'after_flush')
+def registrar_eventos(session, flush_context):
+    """Guarda um evento por agendamento criado, cancelado, reagendado ou com status
+    alterado; gravar_eventos os insere no commit da mesma transação"""
+    agora = agora_utc()
+    linhas = []
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Agendamento):
+            continue
+        tipo = _tipo(session, obj)
+        if tipo:
+            linhas.append({
+                'tipo': tipo,
+                'agendamento_id': obj.id,
+                'user_id': obj.user_id,
+                'status': obj.status,
+                'data_agendamento': obj.data_agendamento,
+                'horario_agendamento': obj.horario_agendamento,
+                'criado_em': agora
+            })
+
+    if linhas:
+        session.info.setdefault('eventos_pendentes', []).extend(linhas)
+
+@event.listens_for(db.session, 'before_commit')
+def gravar_eventos(session):
+    # O commit só faz o último flush depois deste evento: sem ele, eventos desse flush ficariam de fora
+    session.flush()
+    linhas = session.info.pop('eventos_pendentes', None)
+    if not linhas:
+        return
+
+    conexao = session.connection()
+    ultimo = travar_sequencia(conexao)
+    conexao.execute(AgendamentoEvento.__table__.insert(), [
+        dict(linha, id=ultimo + posicao) for posicao, linha in enumerate(linhas, 1)
+    ])
+    avancar_sequencia(conexao, ultimo + len(linhas))
+    session.info['eventos_gravados'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def avisar_corretor(session):
+    # Clientes conectados a este worker recebem o evento sem esperar a próxima leitura
+    if session.info.pop('eventos_gravados', False):
+        corretor.notificar()
+
+@event.listens_for(db.session, 'after_rollback')
+def descartar_eventos(session):
+    session.info.pop('eventos_pendentes', None)
+    session.info.pop('eventos_gravados', None)
+
+def eventos_desde(ultimo_id, user_id=None, limite=MAX_HISTORICO):
+    """Eventos com id maior que ultimo_id, em ordem (user_id=None: de todos os clientes)"""
+    query = AgendamentoEvento.query.filter(AgendamentoEvento.id > ultimo_id)
+    if user_id is not None:
+        query = query.filter(AgendamentoEvento.user_id == user_id)
+    return query.order_by(AgendamentoEvento.id.asc()).limit(limite).all()
+
+def ultimo_evento_id():
+    # Pela sequência: continua certa mesmo depois que a limpeza remove todos os eventos
+    return valor_sequencia(SEQUENCIA_EVENTOS)
+
+def historico_expirado(desde):
+    """Se eventos posteriores a `desde` já podem ter sido removidos pela retenção"""
+    if desde < valor_sequencia(SEQUENCIA_REMOVIDOS):
+        return True
+
+    # Sem marca (bancos limpos antes dela existir): os ids não têm lacunas
+    primeiro = db.session.query(db.func.min(AgendamentoEvento.id)).scalar()
+    if primeiro is None:
+        return desde < ultimo_evento_id()
+    return primeiro > desde + 1
+
+def alteracoes_desde(desde, user_id=None, limite=100):
+    """Uma página do registro após a sequência `desde`: (alterações, próxima sequência, há mais).
+
+    Lê limite + 1 linhas pelo índice da chave primária para saber se há mais
+    sem um COUNT.
+    """
+    eventos = eventos_desde(desde, user_id, limite + 1)
+    mais = len(eventos) > limite
+    eventos = eventos[:limite]
+
+    proximo = eventos[-1].id if eventos else desde
+    return [e.to_dict() for e in eventos], proximo, mais
+
+def formatar_sse(evento):
+    dados = {chave: valor for chave, valor in evento.items() if chave != 'user_id'}
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {json.dumps(dados)}\n\n"
+
+def gerar_stream(assinatura, ultimo_id, historico, completo, ping):
+    """Corpo text/event-stream: histórico pendente, depois os eventos da fila do corretor.
+
+    Eventos que chegam pelos dois caminhos são enviados uma vez só (ids
+    crescentes). Sem eventos, um comentário a cada `ping` segundos mantém a
+    conexão aberta em proxies.
+    """
+    try:
+        yield f'retry: {RECONEXAO_MS}\n\n'
+
+        for evento in historico:
+            ultimo_id = evento['id']
+            yield formatar_sse(evento)
+
+        if not completo:
+            # Histórico maior que MAX_HISTORICO: o navegador reconecta a partir do último id enviado
+            return
+
+        while True:
+            try:
+                evento = assinatura.fila.get(timeout=ping)
+            except Empty:
+                yield ': ping\n\n'
+                continue
+
+            if evento is None:
+                return
+            if evento['id'] <= ultimo_id:
+                continue
+            ultimo_id = evento['id']
+            yield formatar_sse(evento)
+    finally:
+        corretor.cancelar(assinatura)
+
+@tarefa_periodica('limpar-eventos', intervalo=3600)
+def limpar_eventos(agora=None):
+    """Remove eventos mais antigos que a retenção (clientes desconectados há mais tempo recarregam a tela).
+
+    Guarda o maior id removido em sequencias, para que historico_expirado
+    reconheça a lacuna mesmo quando nenhum evento sobra na tabela.
+    """
+    limite = (agora or agora_utc()) - RETENCAO_EVENTOS
+    antigos = AgendamentoEvento.criado_em < limite
+
+    conexao = db.session.connection()
+    removido = conexao.execute(db.select(db.func.max(AgendamentoEvento.id)).where(antigos)).scalar()
+    if removido is None:
+        db.session.commit()
+        return {'removidos': 0}
+
+    resultado = conexao.execute(
+        db.delete(AgendamentoEvento)
+        .where(antigos, AgendamentoEvento.id <= removido)
+    )
+
+    marca = conexao.execute(
+        db.select(Sequencia.valor).where(Sequencia.nome == SEQUENCIA_REMOVIDOS).with_for_update()
+    ).scalar()
+    if marca is None:
+        conexao.execute(db.insert(Sequencia).values(nome=SEQUENCIA_REMOVIDOS, valor=removido))
+    elif removido > marca:
+        conexao.execute(db.update(Sequencia).where(Sequencia.nome == SEQUENCIA_REMOVIDOS).values(valor=removido))
+
+    db.session.commit()
+    return {'removidos': resultado.rowcount}
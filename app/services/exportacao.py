@@ -0,0 +1,98 @@
+from app import db
+from app.models import Agendamento, Servico, Veiculo, ModeloVeiculo, User
+import csv
+import io
+import json
+
+# Linhas buscadas por vez no cursor do servidor
+LINHAS_POR_LOTE = 1000
+
+FORMATOS = ('csv', 'ndjson')
+
+COLUNAS = [
+    ('id', Agendamento.id),
+    ('data_agendamento', Agendamento.data_agendamento),
+    ('horario_agendamento', Agendamento.horario_agendamento),
+    ('status', Agendamento.status),
+    ('valor_total', Agendamento.valor_total),
+    ('servico_nome', Servico.nome),
+    ('servico_duracao', Servico.duracao_minutos),
+    ('veiculo_placa', Veiculo.placa),
+    ('modelo_veiculo_nome', ModeloVeiculo.nome),
+    ('nome_proprietario', Veiculo.nome_proprietario),
+    ('telefone_veiculo', Veiculo.telefone),
+    ('cliente_nome', User.nome),
+    ('cliente_email', User.email),
+    ('cliente_telefone', User.telefone),
+    ('observacoes', Agendamento.observacoes),
+    ('criado_em', Agendamento.criado_em),
+]
+
+def consulta_exportacao(inicio=None, fim=None, status=None):
+    """SELECT só das colunas exportadas, sem montar objetos do ORM"""
+    query = db.select(*[coluna for _, coluna in COLUNAS]).select_from(Agendamento).join(
+        Servico, Servico.id == Agendamento.servico_id
+    ).join(
+        Veiculo, Veiculo.id == Agendamento.veiculo_id
+    ).outerjoin(
+        ModeloVeiculo, ModeloVeiculo.id == Veiculo.modelo_veiculo_id
+    ).join(
+        User, User.id == Agendamento.user_id
+    )
+
+    if inicio:
+        query = query.where(Agendamento.data_agendamento >= inicio)
+    if fim:
+        query = query.where(Agendamento.data_agendamento <= fim)
+    if status:
+        query = query.where(Agendamento.status.in_(status))
+
+    return query.order_by(Agendamento.data_agendamento, Agendamento.horario_agendamento, Agendamento.id)
+
+def _valor(valor):
+    if valor is None:
+        return None
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    if not isinstance(valor, (int, str)):
+        # Numeric (Decimal) como texto, sem perder os centavos
+        return str(valor)
+    return valor
+
+def _linhas(query):
+    # yield_per liga stream_results: o driver busca LINHAS_POR_LOTE por vez
+    resultado = db.session.execute(query.execution_options(yield_per=LINHAS_POR_LOTE))
+    try:
+        for linha in resultado:
+            yield [_valor(valor) for valor in linha]
+    finally:
+        resultado.close()
+
+def gerar_csv(query):
+    """Gera o CSV em pedaços de até LINHAS_POR_LOTE linhas"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow([nome for nome, _ in COLUNAS])
+
+    for contador, linha in enumerate(_linhas(query), start=1):
+        escritor.writerow(linha)
+        if contador % LINHAS_POR_LOTE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+def gerar_ndjson(query):
+    """Um objeto JSON por linha, também enviado em pedaços"""
+    nomes = [nome for nome, _ in COLUNAS]
+    pedaco = []
+
+    for linha in _linhas(query):
+        pedaco.append(json.dumps(dict(zip(nomes, linha)), ensure_ascii=False))
+        if len(pedaco) == LINHAS_POR_LOTE:
+            yield '\n'.join(pedaco) + '\n'
+            pedaco = []
+
+    if pedaco:
+        yield '\n'.join(pedaco) + '\n'
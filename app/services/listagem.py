@@ -0,0 +1,180 @@
+from sqlalchemy import and_, or_, case, func
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Agendamento, Veiculo
+from datetime import date, time, datetime
+import base64
+import json
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
+STATUS_VALIDOS = ('pendente', 'confirmado', 'concluido', 'cancelado', 'expirado')
+
+# proximos: de hoje em diante; passados: antes de hoje
+PERIODOS = ('proximos', 'passados')
+
+def consulta_agendamentos():
+    """Query de agendamentos com serviço, veículo (e modelo) e cliente já carregados.
+
+    Os relacionamentos são todos muitos-para-um, então um único SELECT com
+    JOINs traz a página inteira, sem consultas extras por linha.
+    """
+    return Agendamento.query.options(
+        joinedload(Agendamento.servico),
+        joinedload(Agendamento.veiculo).joinedload(Veiculo.modelo),
+        joinedload(Agendamento.usuario)
+    )
+
+def agendamento_completo(agendamento, incluir_cliente=False):
+    """Serializa o agendamento com os dados usados nas listagens"""
+    servico = agendamento.servico
+    veiculo = agendamento.veiculo
+    modelo_veiculo = veiculo.modelo if veiculo else None
+
+    ag_dict = agendamento.to_dict()
+    ag_dict.update({
+        'servico_nome': servico.nome if servico else 'N/A',
+        'servico_duracao': servico.duracao_minutos if servico else 0,
+        'veiculo_placa': veiculo.placa if veiculo else 'N/A',
+        'modelo_veiculo_nome': modelo_veiculo.nome if modelo_veiculo else 'N/A',
+        'nome_proprietario': veiculo.nome_proprietario if veiculo else 'N/A',
+        'telefone_veiculo': veiculo.telefone if veiculo else 'N/A'
+    })
+
+    if incluir_cliente:
+        usuario = agendamento.usuario
+        ag_dict.update({
+            'cliente_nome': usuario.nome if usuario else 'N/A',
+            'cliente_telefone': usuario.telefone if usuario else 'N/A',
+            'cliente_email': usuario.email if usuario else 'N/A'
+        })
+
+    return ag_dict
+
+def codificar_cursor(agendamento):
+    """Cursor opaco com a chave de ordenação (data, horário, id) do último item"""
+    chave = [
+        agendamento.data_agendamento.isoformat(),
+        agendamento.horario_agendamento.isoformat(),
+        agendamento.id
+    ]
+    return base64.urlsafe_b64encode(json.dumps(chave).encode('utf-8')).decode('ascii')
+
+def decodificar_cursor(cursor):
+    try:
+        data_str, horario_str, agendamento_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return date.fromisoformat(data_str), time.fromisoformat(horario_str), int(agendamento_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Cursor inválido')
+
+def ler_paginacao(args, limite_padrao=LIMITE_PADRAO):
+    """Lê cursor e limit da query string. Lança ValueError se inválidos"""
+    cursor = args.get('cursor')
+    limite = args.get('limit', limite_padrao)
+
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError):
+        raise ValueError('Parâmetro limit deve ser um número')
+
+    if limite < 1 or limite > LIMITE_MAXIMO:
+        raise ValueError(f'Parâmetro limit deve estar entre 1 e {LIMITE_MAXIMO}')
+
+    return (decodificar_cursor(cursor) if cursor else None), limite
+
+def paginar(query, cursor=None, limite=LIMITE_PADRAO, crescente=False):
+    """Paginação por chave (keyset) ordenada por (data, horário, id).
+
+    Em vez de OFFSET, filtra a partir da chave do último item da página
+    anterior, então qualquer página custa o mesmo que a primeira.
+    Retorna os itens da página e o cursor da próxima (ou None).
+    """
+    colunas = (Agendamento.data_agendamento, Agendamento.horario_agendamento, Agendamento.id)
+
+    if cursor:
+        data, horario, agendamento_id = cursor
+        if crescente:
+            query = query.filter(or_(
+                colunas[0] > data,
+                and_(colunas[0] == data, colunas[1] > horario),
+                and_(colunas[0] == data, colunas[1] == horario, colunas[2] > agendamento_id)
+            ))
+        else:
+            query = query.filter(or_(
+                colunas[0] < data,
+                and_(colunas[0] == data, colunas[1] < horario),
+                and_(colunas[0] == data, colunas[1] == horario, colunas[2] < agendamento_id)
+            ))
+
+    ordem = [c.asc() if crescente else c.desc() for c in colunas]
+    itens = query.order_by(*ordem).limit(limite + 1).all()
+
+    proximo_cursor = codificar_cursor(itens[limite - 1]) if len(itens) > limite else None
+    return itens[:limite], proximo_cursor
+
+def ler_filtros(args):
+    """Lê status (lista separada por vírgula), inicio, fim e periodo. Lança ValueError se inválidos"""
+    status = [s for s in args.get('status', '').split(',') if s]
+    invalidos = [s for s in status if s not in STATUS_VALIDOS]
+    if invalidos:
+        raise ValueError(f'Status inválido: {", ".join(invalidos)}')
+
+    try:
+        inicio = datetime.strptime(args['inicio'], '%Y-%m-%d').date() if args.get('inicio') else None
+        fim = datetime.strptime(args['fim'], '%Y-%m-%d').date() if args.get('fim') else None
+    except ValueError:
+        raise ValueError('Formato de data inválido. Use YYYY-MM-DD')
+
+    if inicio and fim and fim < inicio:
+        raise ValueError('Data final deve ser igual ou posterior à inicial')
+
+    periodo = args.get('periodo')
+    if periodo and periodo not in PERIODOS:
+        raise ValueError(f'Período inválido. Use: {", ".join(PERIODOS)}')
+
+    return {'status': status, 'inicio': inicio, 'fim': fim, 'periodo': periodo}
+
+def _condicoes_periodo(filtros, hoje=None):
+    hoje = hoje or date.today()
+    condicoes = []
+    if filtros['inicio']:
+        condicoes.append(Agendamento.data_agendamento >= filtros['inicio'])
+    if filtros['fim']:
+        condicoes.append(Agendamento.data_agendamento <= filtros['fim'])
+    if filtros['periodo'] == 'proximos':
+        condicoes.append(Agendamento.data_agendamento >= hoje)
+    elif filtros['periodo'] == 'passados':
+        condicoes.append(Agendamento.data_agendamento < hoje)
+    return condicoes
+
+def filtrar(query, filtros):
+    """Aplica os filtros de ler_filtros no WHERE da query"""
+    query = query.filter(*_condicoes_periodo(filtros))
+    if filtros['status']:
+        query = query.filter(Agendamento.status.in_(filtros['status']))
+    return query
+
+def resumo_status(filtros, user_id=None, hoje=None):
+    """Contagem por status e de próximos/passados em um único GROUP BY.
+
+    Respeita a janela de datas mas não o filtro de status, para que cada aba
+    mostre o seu total independentemente da aba aberta.
+    """
+    hoje = hoje or date.today()
+    proximo = case((Agendamento.data_agendamento >= hoje, 1), else_=0)
+
+    condicoes = _condicoes_periodo(filtros, hoje)
+    if user_id is not None:
+        condicoes.append(Agendamento.user_id == user_id)
+
+    linhas = db.session.query(
+        Agendamento.status, proximo, func.count(Agendamento.id)
+    ).filter(*condicoes).group_by(Agendamento.status, proximo).all()
+
+    resumo = {'total': 0, 'proximos': 0, 'passados': 0, 'por_status': {s: 0 for s in STATUS_VALIDOS}}
+    for status, eh_proximo, quantidade in linhas:
+        resumo['total'] += quantidade
+        resumo['proximos' if eh_proximo else 'passados'] += quantidade
+        resumo['por_status'][status] = resumo['por_status'].get(status, 0) + quantidade
+    return resumo
@@ -0,0 +1,167 @@
+from app import db
+from app.models import Agendamento, Veiculo
+from app.services.catalogo import obter_servico
+from app.services.disponibilidade import (
+    bloquear_dia, carregar_ocupacao, minutos, horario_de_minutos
+)
+from app.utils.security import validate_placa
+from datetime import datetime, timedelta, timezone
+
+# Frotas de locadoras e entregas: até 50 veículos por pedido
+MAX_ITENS_LOTE = 50
+
+CAMPOS_OBRIGATORIOS = ['servico_id', 'placa', 'nome_proprietario', 'telefone', 'modelo_veiculo_id']
+
+FUSO_BRASILIA = timezone(timedelta(hours=-3))
+
+def _validar_item(item, data_padrao, agora):
+    """Item normalizado ou mensagem de erro (mesmas regras do agendamento individual)"""
+    if not isinstance(item, dict):
+        return None, 'Item deve ser um objeto'
+
+    for campo in CAMPOS_OBRIGATORIOS:
+        if not item.get(campo):
+            return None, f'Campo {campo} é obrigatório'
+
+    is_valid, message = validate_placa(item['placa'])
+    if not is_valid:
+        return None, message
+
+    servico = obter_servico(item['servico_id'])
+    if not servico:
+        return None, 'Serviço não encontrado'
+
+    data_str = item.get('data_agendamento') or data_padrao
+    if not data_str:
+        return None, 'Campo data_agendamento é obrigatório'
+
+    try:
+        data = datetime.strptime(data_str, '%Y-%m-%d').date()
+        horario = datetime.strptime(item['horario_agendamento'], '%H:%M').time() if item.get('horario_agendamento') else None
+    except (ValueError, TypeError) as e:
+        return None, f'Formato de data/horário inválido: {str(e)}'
+
+    if data < agora.date():
+        return None, 'Não é possível agendar para datas passadas'
+
+    if horario and data == agora.date() and horario <= agora.time():
+        return None, 'Não é possível agendar para horários que já passaram'
+
+    return {
+        'placa': item['placa'].upper().replace('-', '').replace(' ', ''),
+        'servico': servico,
+        'data': data,
+        'horario': horario,
+        'dados': item
+    }, None
+
+def _encaixar(dia, item, agora):
+    """Início (em minutos) do item no dia, ou None se não couber.
+
+    Com horário pedido, confere só aquele intervalo; sem horário, usa o
+    primeiro horário livre da grade do serviço no dia.
+    """
+    if item['horario']:
+        inicio = minutos(item['horario'])
+        return inicio if dia.cabe(inicio, item['servico']) else None
+
+    # Hoje só horários da grade que ainda não passaram
+    a_partir_de = agora.hour * 60 + agora.minute + 1 if item['data'] == agora.date() else None
+
+    livres = dia.livres(item['servico'], a_partir_de=a_partir_de)
+    return livres[0] if livres else None
+
+def reservar_lote(itens, user_id, data_padrao=None, agora=None):
+    """Reserva vários veículos em uma transação.
+
+    Cada dia envolvido é travado e lido uma única vez (em ordem de data, para
+    que lotes concorrentes não se bloqueiem mutuamente); os itens são
+    encaixados em memória contra a ocupação do dia, os veículos existentes são
+    buscados em uma consulta e todas as linhas são gravadas em um só commit.
+    Retorna um resultado por item, na ordem recebida.
+    """
+    agora = agora or datetime.now(FUSO_BRASILIA)
+    resultados = [None] * len(itens)
+    validos = []
+
+    for indice, item in enumerate(itens):
+        normalizado, erro = _validar_item(item, data_padrao, agora)
+        if erro:
+            resultados[indice] = {'indice': indice, 'placa': item.get('placa') if isinstance(item, dict) else None, 'sucesso': False, 'erro': erro}
+        else:
+            validos.append((indice, normalizado))
+
+    # Horários pedidos primeiro; os flexíveis preenchem o que sobrar
+    por_dia = {}
+    for indice, item in sorted(validos, key=lambda v: (v[1]['horario'] is None, v[0])):
+        por_dia.setdefault(item['data'], []).append((indice, item))
+
+    encaixados = []
+    boxes = {}
+    for data in sorted(por_dia):
+        bloquear_dia(data)
+        dia = carregar_ocupacao(data, bloquear=True)
+
+        for indice, item in por_dia[data]:
+            inicio = _encaixar(dia, item, agora) if dia else None
+            if inicio is None or dia.reservar(inicio, item['servico'], ('item', indice)) is None:
+                resultados[indice] = {'indice': indice, 'placa': item['placa'], 'sucesso': False, 'erro': 'Horário indisponível'}
+                continue
+
+            encaixados.append((indice, item, horario_de_minutos(inicio)))
+
+        # Box final de cada item (uma redistribuição posterior pode tê-lo mudado)
+        if dia:
+            boxes.update({chave[1]: dia.box(chave) for chave in dia.reservas})
+
+    if not encaixados:
+        db.session.rollback()
+        return resultados
+
+    veiculos = {
+        v.placa: v for v in Veiculo.query.filter(Veiculo.placa.in_({item['placa'] for _, item, _ in encaixados}))
+    }
+    for _, item, _ in encaixados:
+        if item['placa'] not in veiculos:
+            dados = item['dados']
+            veiculos[item['placa']] = Veiculo(
+                usuario_id=user_id,
+                nome_proprietario=dados['nome_proprietario'],
+                placa=item['placa'],
+                modelo_veiculo_id=dados['modelo_veiculo_id'],
+                telefone=dados['telefone']
+            )
+            db.session.add(veiculos[item['placa']])
+    db.session.flush()
+
+    agendamentos = []
+    for indice, item, horario in encaixados:
+        agendamento = Agendamento(
+            data_agendamento=item['data'],
+            horario_agendamento=horario,
+            valor_total=float(item['servico']['preco']),
+            user_id=user_id,
+            veiculo_id=veiculos[item['placa']].id,
+            servico_id=item['servico']['id'],
+            observacoes=item['dados'].get('observacoes'),
+            status='confirmado',
+            box=boxes[indice]
+        )
+        agendamentos.append((indice, item, agendamento))
+    db.session.add_all([agendamento for _, _, agendamento in agendamentos])
+    db.session.flush()
+    ids = [agendamento.id for _, _, agendamento in agendamentos]
+    db.session.commit()
+
+    # Recarrega os agendamentos gravados em uma consulta, e não um refresh por objeto
+    Agendamento.query.filter(Agendamento.id.in_(ids)).all()
+
+    for indice, item, agendamento in agendamentos:
+        agendamento_dict = agendamento.to_dict()
+        agendamento_dict.update({
+            'servico_nome': item['servico']['nome'],
+            'veiculo_placa': item['placa']
+        })
+        resultados[indice] = {'indice': indice, 'placa': item['placa'], 'sucesso': True, 'agendamento': agendamento_dict}
+
+    return resultados
@@ -0,0 +1,105 @@
+from app import db
+from app.models import Agendamento, AgendamentoEvento
+from app.services.disponibilidade import STATUS_OCUPANTES
+from app.utils.agendador import tarefa_periodica
+from app.utils.revogacao import revogacao
+from app.services.estatisticas import somar_estatisticas
+from app.services.eventos import agora_utc, travar_sequencia, avancar_sequencia
+from app.utils.eventos import corretor
+from datetime import date
+import time
+
+# Agendamentos por transação na expiração em lote
+TAMANHO_LOTE = 1000
+
+@tarefa_periodica('expirar-agendamentos', intervalo=3600)
+def expirar_agendamentos(hoje=None, tamanho_lote=TAMANHO_LOTE):
+    """Marca como expirados os agendamentos pendentes/confirmados de dias passados.
+
+    Um UPDATE por faixa de IDs, cada um na sua própria transação, para que as
+    travas durem só um lote e nada seja carregado na memória além dos IDs do
+    lote. O UPDATE em conjunto não passa pelos eventos do ORM, então os
+    totais por dia/status do lote são transferidos para 'expirado' em
+    estatisticas_diarias e os eventos de status (agendamento_eventos) são
+    inseridos com INSERT ... SELECT depois do UPDATE, já com a sequência
+    travada até o commit.
+    """
+    hoje = hoje or date.today()
+    inicio = time.perf_counter()
+
+    filtro = (
+        Agendamento.data_agendamento < hoje,
+        Agendamento.status.in_(STATUS_OCUPANTES)
+    )
+    menor_id, maior_id = db.session.query(
+        db.func.min(Agendamento.id),
+        db.func.max(Agendamento.id)
+    ).filter(*filtro).one()
+    db.session.commit()
+
+    expirados = 0
+    lotes = 0
+    if menor_id is not None:
+        for base in range(menor_id, maior_id + 1, tamanho_lote):
+            faixa = (Agendamento.id >= base, Agendamento.id < base + tamanho_lote, *filtro)
+
+            # IDs do lote: depois do UPDATE o filtro não os distingue dos já expirados
+            ids = [agendamento_id for agendamento_id, in db.session.query(Agendamento.id).filter(*faixa)]
+            if not ids:
+                db.session.commit()
+                continue
+
+            totais = db.session.query(
+                Agendamento.data_agendamento,
+                Agendamento.status,
+                db.func.count(Agendamento.id),
+                db.func.coalesce(db.func.sum(Agendamento.valor_total), 0)
+            ).filter(*faixa).group_by(Agendamento.data_agendamento, Agendamento.status).all()
+
+            resultado = db.session.execute(
+                db.update(Agendamento)
+                .where(Agendamento.id.in_(ids), *filtro)
+                .values(status='expirado')
+                .execution_options(synchronize_session=False)
+            )
+
+            # Sequência travada só agora, já perto do commit
+            conexao = db.session.connection()
+            ultimo = travar_sequencia(conexao)
+            eventos = conexao.execute(
+                db.insert(AgendamentoEvento).from_select(
+                    ['id', 'tipo', 'agendamento_id', 'user_id', 'status', 'data_agendamento', 'horario_agendamento', 'criado_em'],
+                    db.select(
+                        db.literal(ultimo) + db.func.row_number().over(order_by=Agendamento.id),
+                        db.literal('status_alterado'), Agendamento.id, Agendamento.user_id, db.literal('expirado'),
+                        Agendamento.data_agendamento, Agendamento.horario_agendamento, db.literal(agora_utc(), db.DateTime)
+                    ).where(Agendamento.id.in_(ids), Agendamento.status == 'expirado')
+                )
+            )
+            avancar_sequencia(conexao, ultimo + eventos.rowcount)
+
+            deltas = {}
+            for data, status, quantidade, receita in totais:
+                deltas[(data, status)] = [-quantidade, -receita]
+                expirado = deltas.setdefault((data, 'expirado'), [0, 0])
+                expirado[0] += quantidade
+                expirado[1] += receita
+            somar_estatisticas(db.session.connection(), deltas)
+
+            db.session.commit()
+            expirados += resultado.rowcount
+            lotes += 1
+
+    if expirados:
+        corretor.notificar()
+
+    return {
+        'expirados': expirados,
+        'lotes': lotes,
+        'duracao_ms': round((time.perf_counter() - inicio) * 1000, 2)
+    }
+
+@tarefa_periodica('limpar-tokens-revogados', intervalo=6 * 3600)
+def limpar_tokens_revogados():
+    """Remove revogações de tokens que já expiraram"""
+    return {'removidos': revogacao.limpar_expirados()}
@@ -0,0 +1,95 @@
+from app import db
+from app.models import Agendamento, OcupacaoDia
+from app.services.disponibilidade import consultar_ocupados, montar_mapa, codificar_mapa
+from sqlalchemy import event, inspect
+from datetime import date
+
+# Colunas de Agendamento que mudam a ocupação do dia
+CAMPOS = ('data_agendamento', 'horario_agendamento', 'status', 'servico_id', 'box')
+
+def reconstruir_mapas(datas):
+    """Refaz ocupacao_dias.mapa dos dias a partir dos agendamentos que ocupam horário.
+
+    Cada dia é travado (versao + 1) antes da leitura, como em bloquear_dia,
+    para que uma reserva concorrente do mesmo dia não fique fora do mapa.
+    """
+    datas = sorted(datas)
+    for data in datas:
+        resultado = db.session.execute(
+            db.update(OcupacaoDia).where(OcupacaoDia.data == data)
+            .values(versao=OcupacaoDia.versao + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if resultado.rowcount == 0:
+            db.session.execute(db.insert(OcupacaoDia).values(data=data, versao=0))
+
+    ocupados = consultar_ocupados(datas[0], datas[-1], bloquear=True) if datas else {}
+
+    for data in datas:
+        db.session.execute(
+            db.update(OcupacaoDia).where(OcupacaoDia.data == data)
+            .values(mapa=codificar_mapa(montar_mapa(ocupados.get(data, []))))
+            .execution_options(synchronize_session=False)
+        )
+
+def _datas_afetadas(session):
+    datas = set()
+
+    for obj in session.new:
+        if isinstance(obj, Agendamento):
+            datas.add(obj.data_agendamento)
+
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Agendamento):
+            continue
+        estado = inspect(obj)
+        if obj not in session.deleted and not any(estado.attrs[campo].history.has_changes() for campo in CAMPOS):
+            continue
+        datas.add(obj.data_agendamento)
+        # Mudança de data libera o dia anterior
+        datas.update(estado.attrs.data_agendamento.history.deleted)
+
+    datas.discard(None)
+    return datas
+
+# Carrega a data anterior antes de sobrescrever, mesmo que ainda não tenha sido lida
+event.listen(Agendamento.data_agendamento, 'set', lambda *args: None, active_history=True)
+
+@event.listens_for(db.session, 'after_flush')
+def atualizar_mapas(session, flush_context):
+    """Mantém o mapa de ocupação na mesma transação de cada criação,
+    cancelamento, conclusão ou mudança de status de agendamento"""
+    datas = _datas_afetadas(session)
+    if datas:
+        reconstruir_mapas(datas)
+
+def datas_ocupacao(inicio, fim=None):
+    """Dias com agendamentos ou linha em ocupacao_dias no período (fim aberto = todos os seguintes)"""
+    filtro_agendamentos = [Agendamento.data_agendamento >= inicio]
+    filtro_dias = [OcupacaoDia.data >= inicio]
+    if fim:
+        filtro_agendamentos.append(Agendamento.data_agendamento <= fim)
+        filtro_dias.append(OcupacaoDia.data <= fim)
+
+    datas = {d for d, in db.session.query(Agendamento.data_agendamento).filter(*filtro_agendamentos).distinct()}
+    datas |= {d for d, in db.session.query(OcupacaoDia.data).filter(*filtro_dias)}
+    return datas
+
+def reconstruir_futuros():
+    """Refaz, na transação atual, os mapas de hoje em diante.
+
+    Usada quando muda a duração ou a limpeza de um serviço ou a limpeza de um
+    dia, o que altera o trecho ocupado por agendamentos já gravados.
+    """
+    datas = datas_ocupacao(date.today())
+    if datas:
+        reconstruir_mapas(datas)
+
+def reconstruir_ocupacao(inicio=None, fim=None):
+    """Refaz os mapas de todos os dias com agendamentos ou linha em ocupacao_dias (padrão: de hoje em diante)"""
+    datas = datas_ocupacao(inicio or date.today(), fim)
+
+    if datas:
+        reconstruir_mapas(datas)
+    db.session.commit()
+    return {'dias': len(datas)}
@@ -0,0 +1,121 @@
+from app import db
+from app.models import Veiculo, VeiculoTrigrama
+from sqlalchemy import event, inspect
+import re
+
+MODOS_BUSCA = ('exato', 'prefixo', 'substring')
+
+# Menor trecho indexado: buscas por substring precisam de pelo menos um trigrama
+TAMANHO_TRIGRAMA = 3
+
+# Ordem dos resultados: placa igual, começando pelo termo, contendo o termo
+CORRESPONDENCIAS = ('exata', 'prefixo', 'substring')
+
+def normalizar_placa(texto):
+    """Maiúsculas, só letras e números (ABC-1D23 -> ABC1D23)"""
+    return re.sub(r'[^A-Z0-9]', '', (texto or '').upper())
+
+def trigramas(placa):
+    placa = normalizar_placa(placa)
+    return {placa[i:i + TAMANHO_TRIGRAMA] for i in range(len(placa) - TAMANHO_TRIGRAMA + 1)}
+
+def _sucessor(prefixo):
+    # Menor texto maior que todos os que começam com o prefixo (placas são ASCII)
+    return prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+
+def filtro_placa(termo, modo='substring'):
+    """Condição sobre Veiculo que usa o índice único de placa ou a tabela de trigramas.
+
+    - exato: igualdade na placa
+    - prefixo: intervalo placa >= termo AND placa < sucessor(termo)
+    - substring: veículos que têm todos os trigramas do termo; o LIKE final só
+      confere os candidatos (trigramas fora de ordem), nunca a frota inteira
+    """
+    termo = normalizar_placa(termo)
+
+    if modo == 'exato':
+        return Veiculo.placa == termo
+
+    if modo == 'prefixo':
+        return db.and_(Veiculo.placa >= termo, Veiculo.placa < _sucessor(termo))
+
+    if modo == 'substring':
+        partes = trigramas(termo)
+        candidatos = db.select(VeiculoTrigrama.veiculo_id).where(
+            VeiculoTrigrama.trigrama.in_(partes)
+        ).group_by(VeiculoTrigrama.veiculo_id).having(
+            db.func.count(VeiculoTrigrama.trigrama) == len(partes)
+        )
+        return db.and_(Veiculo.id.in_(candidatos), Veiculo.placa.contains(termo, autoescape=True))
+
+    raise ValueError(f'Modo de busca inválido. Use: {", ".join(MODOS_BUSCA)}')
+
+def buscar_veiculos(termo, modo='substring', limite=50):
+    """Veículos cuja placa corresponde ao termo, dos mais aos menos relevantes"""
+    termo = normalizar_placa(termo)
+
+    relevancia = db.case(
+        (Veiculo.placa == termo, 0),
+        (db.and_(Veiculo.placa >= termo, Veiculo.placa < _sucessor(termo)), 1),
+        else_=2
+    )
+
+    linhas = db.session.query(Veiculo, relevancia).filter(
+        filtro_placa(termo, modo)
+    ).order_by(relevancia, Veiculo.placa).limit(limite).all()
+
+    return [
+        dict(veiculo.to_dict(), correspondencia=CORRESPONDENCIAS[rank])
+        for veiculo, rank in linhas
+    ]
+
+def _inserir_trigramas(conexao, veiculo_id, placa):
+    partes = trigramas(placa)
+    if partes:
+        conexao.execute(
+            db.insert(VeiculoTrigrama),
+            [{'trigrama': t, 'veiculo_id': veiculo_id} for t in sorted(partes)]
+        )
+
+def _remover_trigramas(conexao, veiculo_id):
+    conexao.execute(db.delete(VeiculoTrigrama).where(VeiculoTrigrama.veiculo_id == veiculo_id))
+
+# Índice mantido na mesma transação de quem grava o veículo (cadastro de
+# veículo, criação de agendamento com placa nova, alterações e exclusão)
+@event.listens_for(Veiculo, 'after_insert')
+def _indexar_veiculo_novo(mapper, conexao, veiculo):
+    _inserir_trigramas(conexao, veiculo.id, veiculo.placa)
+
+@event.listens_for(Veiculo, 'after_update')
+def _reindexar_veiculo(mapper, conexao, veiculo):
+    if inspect(veiculo).attrs.placa.history.has_changes():
+        _remover_trigramas(conexao, veiculo.id)
+        _inserir_trigramas(conexao, veiculo.id, veiculo.placa)
+
+@event.listens_for(Veiculo, 'before_delete')
+def _desindexar_veiculo(mapper, conexao, veiculo):
+    _remover_trigramas(conexao, veiculo.id)
+
+def reindexar_placas(tamanho_lote=1000):
+    """Refaz veiculo_trigramas para todos os veículos, em lotes por faixa de id"""
+    db.session.execute(db.delete(VeiculoTrigrama))
+
+    veiculos = 0
+    ultimo_id = 0
+    while True:
+        lote = db.session.execute(
+            db.select(Veiculo.id, Veiculo.placa).where(Veiculo.id > ultimo_id).order_by(Veiculo.id).limit(tamanho_lote)
+        ).all()
+        if not lote:
+            break
+
+        linhas = [{'trigrama': t, 'veiculo_id': veiculo_id} for veiculo_id, placa in lote for t in sorted(trigramas(placa))]
+        if linhas:
+            db.session.execute(db.insert(VeiculoTrigrama), linhas)
+        db.session.commit()
+
+        veiculos += len(lote)
+        ultimo_id = lote[-1][0]
+
+    db.session.commit()
+    return {'veiculos': veiculos}
@@ -0,0 +1,165 @@
+from app import db
+from app.models import Agendamento, Veiculo, Servico, EstatisticaDiaria
+from app.services.catalogo import catalogo, horarios_funcionamento, modelos_veiculo
+from app.services.disponibilidade import dia_semana, expediente, STATUS_OCUPANTES
+from app.utils.cache import CacheTTL
+from datetime import datetime, timedelta, timezone
+
+# Até três anos por relatório
+MAX_DIAS_RELATORIO = 1096
+
+# Agendamentos que ocupam o box (os expirados e cancelados não aconteceram)
+STATUS_UTILIZACAO = STATUS_OCUPANTES + ('concluido',)
+
+DIAS = ['Domingo', 'Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado']
+
+_cache = CacheTTL(maximo=200)
+
+def _percentual(parte, total):
+    return round(parte * 100 / total, 2) if total else 0.0
+
+def _assinatura(inicio, fim):
+    """Muda sempre que um agendamento do período ou os catálogos mudam.
+
+    Lê só o rollup estatisticas_diarias (uma linha por dia/status), então é
+    barata mesmo para um ano inteiro.
+    """
+    totais = db.session.query(
+        EstatisticaDiaria.status,
+        db.func.sum(EstatisticaDiaria.quantidade),
+        db.func.sum(EstatisticaDiaria.receita)
+    ).filter(EstatisticaDiaria.data.between(inicio, fim)).group_by(EstatisticaDiaria.status).all()
+
+    return (
+        tuple(sorted((status, int(quantidade or 0), str(receita or 0)) for status, quantidade, receita in totais)),
+        catalogo.versao('servicos')[0],
+        catalogo.versao('horarios')[0]
+    )
+
+def gerar_relatorio(inicio, fim, ttl=300):
+    """Relatório de receita e utilização, em cache por período enquanto os dados não mudarem"""
+    assinatura = _assinatura(inicio, fim)
+
+    item = _cache.obter((inicio, fim))
+    if item is not None and item[0] == assinatura:
+        return dict(item[1], cache=True)
+
+    relatorio = _calcular(inicio, fim)
+    _cache.definir((inicio, fim), (assinatura, relatorio), ttl)
+    return dict(relatorio, cache=False)
+
+def _calcular(inicio, fim):
+    # Serviço x dia x status: uma linha por combinação, não por agendamento
+    por_servico_dia = db.session.query(
+        Agendamento.servico_id,
+        Agendamento.data_agendamento,
+        Agendamento.status,
+        db.func.count(Agendamento.id),
+        db.func.coalesce(db.func.sum(Agendamento.valor_total), 0),
+        db.func.coalesce(db.func.sum(Servico.duracao_minutos), 0)
+    ).join(Servico, Servico.id == Agendamento.servico_id).filter(
+        Agendamento.data_agendamento.between(inicio, fim)
+    ).group_by(Agendamento.servico_id, Agendamento.data_agendamento, Agendamento.status).all()
+
+    por_modelo_status = db.session.query(
+        Veiculo.modelo_veiculo_id,
+        Agendamento.status,
+        db.func.count(Agendamento.id),
+        db.func.coalesce(db.func.sum(Agendamento.valor_total), 0)
+    ).join(Veiculo, Veiculo.id == Agendamento.veiculo_id).filter(
+        Agendamento.data_agendamento.between(inicio, fim)
+    ).group_by(Veiculo.modelo_veiculo_id, Agendamento.status).all()
+
+    servicos = catalogo.obter('servicos')
+    modelos = {m['id']: m['nome'] for m in modelos_veiculo()}
+    horarios = horarios_funcionamento()
+
+    # Minutos de funcionamento de cada dia da semana dentro do período, vezes os boxes do dia
+    semana = {dia: {'agendamentos': 0, 'receita': 0.0, 'minutos_ocupados': 0, 'minutos_disponiveis': 0} for dia in range(7)}
+    data = inicio
+    while data <= fim:
+        horario = expediente(horarios.get(dia_semana(data)))
+        if horario:
+            semana[dia_semana(data)]['minutos_disponiveis'] += (horario[1] - horario[0]) * horario[2]
+        data += timedelta(days=1)
+
+    por_status = {}
+    por_servico = {}
+    receita_total = 0.0
+    minutos_ocupados = 0
+
+    for servico_id, data, status, quantidade, receita, minutos in por_servico_dia:
+        receita = float(receita) if status == 'concluido' else 0.0
+        por_status[status] = por_status.get(status, 0) + quantidade
+
+        servico = por_servico.setdefault(servico_id, {
+            'servico_id': servico_id,
+            'servico_nome': servicos.get(servico_id, {}).get('nome', 'N/A'),
+            'agendamentos': 0,
+            'concluidos': 0,
+            'receita': 0.0,
+            'minutos_ocupados': 0
+        })
+        servico['agendamentos'] += quantidade
+        servico['receita'] += receita
+        if status == 'concluido':
+            servico['concluidos'] += quantidade
+
+        dia = semana[dia_semana(data)]
+        dia['agendamentos'] += quantidade
+        dia['receita'] += receita
+        receita_total += receita
+
+        if status in STATUS_UTILIZACAO:
+            servico['minutos_ocupados'] += int(minutos)
+            dia['minutos_ocupados'] += int(minutos)
+            minutos_ocupados += int(minutos)
+
+    por_modelo = {}
+    for modelo_id, status, quantidade, receita in por_modelo_status:
+        modelo = por_modelo.setdefault(modelo_id, {
+            'modelo_veiculo_id': modelo_id,
+            'modelo_nome': modelos.get(modelo_id, 'N/A'),
+            'agendamentos': 0,
+            'receita': 0.0
+        })
+        modelo['agendamentos'] += quantidade
+        if status == 'concluido':
+            modelo['receita'] += float(receita)
+
+    minutos_disponiveis = sum(dia['minutos_disponiveis'] for dia in semana.values())
+
+    return {
+        'periodo': {
+            'inicio': inicio.isoformat(),
+            'fim': fim.isoformat(),
+            'dias': (fim - inicio).days + 1
+        },
+        'totais': {
+            'agendamentos': sum(por_status.values()),
+            'por_status': por_status,
+            'receita': round(receita_total, 2),
+            'minutos_ocupados': minutos_ocupados,
+            'minutos_disponiveis': minutos_disponiveis,
+            'utilizacao_percentual': _percentual(minutos_ocupados, minutos_disponiveis)
+        },
+        'por_servico': sorted(
+            [dict(s, receita=round(s['receita'], 2)) for s in por_servico.values()],
+            key=lambda s: s['receita'], reverse=True
+        ),
+        'por_modelo': sorted(
+            [dict(m, receita=round(m['receita'], 2)) for m in por_modelo.values()],
+            key=lambda m: m['receita'], reverse=True
+        ),
+        'por_dia_semana': [
+            dict(
+                dia,
+                dia_semana=numero,
+                dia_nome=DIAS[numero],
+                receita=round(dia['receita'], 2),
+                utilizacao_percentual=_percentual(dia['minutos_ocupados'], dia['minutos_disponiveis'])
+            )
+            for numero, dia in semana.items()
+        ],
+        'gerado_em': datetime.now(timezone.utc).isoformat()
+    }
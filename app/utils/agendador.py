@@ -0,0 +1,171 @@
+from app import db
+from app.models import TarefaAgendada
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta, timezone
+from threading import Thread, Event
+import socket
+import json
+import time
+import os
+
+# Tarefas registradas com @tarefa_periodica, por nome
+TAREFAS = {}
+
+class Tarefa:
+    def __init__(self, nome, intervalo, funcao):
+        self.nome = nome
+        self.intervalo = intervalo
+        self.funcao = funcao
+
+def tarefa_periodica(nome, intervalo):
+    """Registra a função para rodar a cada `intervalo` segundos em um único worker"""
+    def decorador(funcao):
+        TAREFAS[nome] = Tarefa(nome, intervalo, funcao)
+        return funcao
+    return decorador
+
+def _agora():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class Agendador:
+    """Executa as tarefas periódicas em uma thread de cada worker.
+
+    Todos os workers verificam as tarefas a cada AGENDADOR_INTERVALO segundos,
+    mas só quem consegue o lease da linha da tarefa em tarefas_agendadas
+    (UPDATE condicional) executa. Se o worker morrer no meio, o lease vence
+    após AGENDADOR_LEASE segundos e outro assume.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.intervalo = 30
+        self.lease = 600
+        self._thread = None
+        self._parar = Event()
+        self._tarefas_registradas = False
+
+    @property
+    def identidade(self):
+        # Calculada na hora: com fork (gunicorn) cada worker tem o seu PID
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    def init_app(self, app):
+        self.app = app
+        self.intervalo = int(app.config.get('AGENDADOR_INTERVALO', 30))
+        self.lease = int(app.config.get('AGENDADOR_LEASE', 600))
+        self._tarefas_registradas = False
+
+        if app.config.get('AGENDADOR_HABILITADO') and not app.config.get('TESTING'):
+            self.iniciar()
+
+    def iniciar(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = Thread(target=self._loop, name='agendador', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _loop(self):
+        while not self._parar.is_set():
+            self.executar_pendentes()
+            self._parar.wait(self.intervalo)
+
+    def executar_pendentes(self):
+        """Executa as tarefas vencidas cujo lease este worker conseguir; retorna os nomes executados"""
+        executadas = []
+        with self.app.app_context():
+            try:
+                self._registrar_tarefas()
+                for tarefa in TAREFAS.values():
+                    if self._assumir(tarefa):
+                        self._executar(tarefa)
+                        executadas.append(tarefa.nome)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Erro no agendador: {str(e)}")
+            finally:
+                db.session.remove()
+        return executadas
+
+    def _registrar_tarefas(self):
+        if self._tarefas_registradas:
+            return
+
+        existentes = {nome for (nome,) in db.session.query(TarefaAgendada.nome)}
+        db.session.commit()
+        for nome in TAREFAS.keys() - existentes:
+            # Outro worker pode criar a mesma linha ao mesmo tempo
+            try:
+                with db.engine.begin() as conexao:
+                    conexao.execute(db.insert(TarefaAgendada).values(nome=nome, proxima_execucao=_agora(), execucoes=0))
+            except IntegrityError:
+                pass
+        self._tarefas_registradas = True
+
+    def _assumir(self, tarefa):
+        agora = _agora()
+        resultado = db.session.execute(
+            db.update(TarefaAgendada)
+            .where(
+                TarefaAgendada.nome == tarefa.nome,
+                TarefaAgendada.proxima_execucao <= agora,
+                db.or_(TarefaAgendada.lease_ate.is_(None), TarefaAgendada.lease_ate < agora)
+            )
+            .values(lider=self.identidade, lease_ate=agora + timedelta(seconds=self.lease))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return resultado.rowcount == 1
+
+    def _executar(self, tarefa):
+        inicio = _agora()
+        cronometro = time.perf_counter()
+        resultado = None
+        erro = None
+
+        try:
+            resultado = tarefa.funcao()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            erro = str(e)
+            print(f"Erro na tarefa {tarefa.nome}: {erro}")
+
+        valores = {
+            'lease_ate': None,
+            'proxima_execucao': inicio + timedelta(seconds=tarefa.intervalo),
+            'ultima_execucao': inicio,
+            'ultima_duracao_ms': round((time.perf_counter() - cronometro) * 1000, 2),
+            'ultimo_erro': erro,
+            'execucoes': TarefaAgendada.execucoes + 1
+        }
+        if erro is None:
+            valores['ultimo_sucesso'] = _agora()
+            valores['ultimo_resultado'] = json.dumps(resultado, default=str) if resultado is not None else None
+
+        db.session.execute(
+            db.update(TarefaAgendada)
+            .where(TarefaAgendada.nome == tarefa.nome, TarefaAgendada.lider == self.identidade)
+            .values(**valores)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    def status(self):
+        linhas = {t.nome: t for t in TarefaAgendada.query.all()}
+        tarefas = []
+        for nome, tarefa in TAREFAS.items():
+            item = linhas[nome].to_dict() if nome in linhas else {'nome': nome, 'execucoes': 0}
+            item['intervalo_segundos'] = tarefa.intervalo
+            tarefas.append(item)
+
+        return {
+            'habilitado': bool(self._thread and self._thread.is_alive()),
+            'worker': self.identidade,
+            'tarefas': tarefas
+        }
+
+agendador = Agendador()
@@ -0,0 +1,50 @@
+from threading import Lock
+import time
+
+class CacheTTL:
+    """Cache em memória do processo com expiração por item"""
+
+    def __init__(self, maximo=10000):
+        self.maximo = maximo
+        self._itens = {}
+        self._lock = Lock()
+
+    def obter(self, chave, padrao=None):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return padrao
+
+            valor, expira_em = item
+            if expira_em <= time.monotonic():
+                del self._itens[chave]
+                return padrao
+            return valor
+
+    def definir(self, chave, valor, ttl):
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            if len(self._itens) >= self.maximo:
+                self._remover_expirados()
+            if len(self._itens) >= self.maximo:
+                # Cache cheio: descarta o item mais antigo
+                self._itens.pop(next(iter(self._itens)))
+            self._itens[chave] = (valor, time.monotonic() + ttl)
+
+    def remover(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def _remover_expirados(self):
+        agora = time.monotonic()
+        for chave in [c for c, (_, expira_em) in self._itens.items() if expira_em <= agora]:
+            del self._itens[chave]
+
+    def __len__(self):
+        return len(self._itens)
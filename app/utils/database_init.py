@@ -1,5 +1,6 @@
 from app import db
 from app.models import Administrador, Servico, ModeloVeiculo, HorarioFuncionamento
+from app.services.catalogo import catalogo
 from datetime import time
 import os
 
@@ -69,6 +70,10 @@ def init_database():
                 db.session.add(horario)
                 print(f"Horário configurado: {dia_semana}")
 
+        # Descarta os catálogos em cache nos workers
+        for nome in ('servicos', 'modelos', 'horarios'):
+            catalogo.invalidar(nome)
+
         db.session.commit()
         print("Banco de dados inicializado com sucesso!")
 
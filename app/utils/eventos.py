@@ -0,0 +1,119 @@
+from app import db
+from app.models import AgendamentoEvento
+from threading import Thread, Event, Lock
+from queue import Queue, Full
+
+class Assinatura:
+    """Fila de eventos de um cliente SSE conectado a este worker"""
+
+    def __init__(self, user_id, ultimo_id, tamanho_fila):
+        # user_id None: administrador, recebe os eventos de todos os clientes
+        self.user_id = user_id
+        self.ultimo_id = ultimo_id
+        self.fila = Queue(maxsize=tamanho_fila)
+
+    def entregar(self, evento):
+        """Coloca o evento na fila; False se o cliente ficou para trás e deve reconectar"""
+        if evento['id'] <= self.ultimo_id:
+            return True
+        if self.user_id is not None and evento['user_id'] != self.user_id:
+            return True
+        try:
+            self.fila.put_nowait(evento)
+        except Full:
+            return False
+        self.ultimo_id = evento['id']
+        return True
+
+class CorretorEventos:
+    """Distribui os eventos de agendamento aos clientes SSE deste worker.
+
+    Enquanto houver clientes conectados, uma thread lê agendamento_eventos a
+    cada EVENTOS_INTERVALO segundos (uma consulta por worker, qualquer que
+    seja o número de clientes) e repassa as linhas novas às filas. Como a
+    origem é a tabela, todos os workers enxergam as alterações feitas em
+    qualquer um deles; commits no próprio worker acordam a thread na hora.
+    Basta guardar o último id lido porque os ids seguem a ordem dos commits
+    (app.services.eventos.travar_sequencia).
+    """
+
+    def __init__(self):
+        self.app = None
+        self.intervalo = 1.0
+        self.tamanho_fila = 1000
+        self.assinaturas = set()
+        self.ultimo_id = None
+        self._trava = Lock()
+        self._acordar = Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.app = app
+        self.intervalo = float(app.config.get('EVENTOS_INTERVALO', 1))
+        self.tamanho_fila = int(app.config.get('EVENTOS_TAMANHO_FILA', 1000))
+        self.assinaturas = set()
+        self.ultimo_id = None
+
+    def assinar(self, user_id, ultimo_id):
+        assinatura = Assinatura(user_id, ultimo_id, self.tamanho_fila)
+        with self._trava:
+            self.assinaturas.add(assinatura)
+            # Nos testes a leitura é feita chamando verificar()
+            if not self.app.config.get('TESTING') and not (self._thread and self._thread.is_alive()):
+                self._thread = Thread(target=self._loop, name='eventos', daemon=True)
+                self._thread.start()
+        return assinatura
+
+    def cancelar(self, assinatura):
+        with self._trava:
+            self.assinaturas.discard(assinatura)
+
+    def notificar(self):
+        self._acordar.set()
+
+    def _loop(self):
+        while True:
+            with self._trava:
+                if not self.assinaturas:
+                    # Sem clientes a thread termina; a próxima assinatura inicia outra
+                    self._thread = None
+                    self.ultimo_id = None
+                    return
+            self.verificar()
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+
+    def verificar(self):
+        """Lê os eventos novos e entrega a cada assinatura; retorna quantos foram lidos"""
+        with self.app.app_context():
+            try:
+                if self.ultimo_id is None:
+                    # Assinaturas novas já receberam o histórico pedido direto da tabela
+                    self.ultimo_id = min([a.ultimo_id for a in self.assinaturas] or [0])
+
+                eventos = [
+                    dict(e.to_dict(), user_id=e.user_id)
+                    for e in AgendamentoEvento.query.filter(AgendamentoEvento.id > self.ultimo_id)
+                    .order_by(AgendamentoEvento.id.asc()).limit(self.tamanho_fila)
+                ]
+            except Exception as e:
+                print(f"Erro ao ler eventos: {str(e)}")
+                return 0
+            finally:
+                db.session.remove()
+
+        with self._trava:
+            for evento in eventos:
+                for assinatura in list(self.assinaturas):
+                    if not assinatura.entregar(evento):
+                        # Fila cheia: encerra o stream (None) e o cliente retoma pelo Last-Event-ID
+                        self.assinaturas.discard(assinatura)
+                        with assinatura.fila.mutex:
+                            assinatura.fila.queue.clear()
+                        assinatura.fila.put_nowait(None)
+            if eventos:
+                self.ultimo_id = eventos[-1]['id']
+
+        return len(eventos)
+
+corretor = CorretorEventos()
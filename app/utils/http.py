@@ -0,0 +1,50 @@
+from flask import request, make_response, current_app
+from datetime import timezone
+import hashlib
+
+# Cache-Control por tipo de recurso
+CACHE_PUBLICO_CURTO = 'public, max-age=60'
+CACHE_PUBLICO_LONGO = 'public, max-age=3600'
+CACHE_PRIVADO_REVALIDAR = 'private, no-cache'
+
+def gerar_etag(*partes):
+    """ETag forte a partir dos valores que identificam a versão do recurso"""
+    return hashlib.sha1(repr(partes).encode('utf-8')).hexdigest()
+
+def _utc(momento):
+    # Colunas TIMESTAMP voltam sem timezone (UTC); HTTP só tem precisão de segundos
+    if momento is None:
+        return None
+    if momento.tzinfo is None:
+        momento = momento.replace(tzinfo=timezone.utc)
+    return momento.replace(microsecond=0)
+
+def cliente_atualizado(etag, ultima_modificacao=None):
+    """Indica se os validadores enviados pelo cliente correspondem à versão atual"""
+    if request.if_none_match:
+        # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+        return request.if_none_match.contains(etag)
+
+    if request.if_modified_since and ultima_modificacao:
+        return _utc(ultima_modificacao) <= request.if_modified_since
+
+    return False
+
+def resposta_condicional(etag, ultima_modificacao, gerar, cache_control):
+    """GET condicional: 304 sem chamar gerar() quando o cliente já tem esta versão.
+
+    gerar é chamada só quando o corpo precisa ser enviado e deve retornar o
+    mesmo que uma view (resposta ou tupla resposta/status).
+    """
+    if cliente_atualizado(etag, ultima_modificacao):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(gerar())
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(etag)
+    if ultima_modificacao:
+        response.last_modified = _utc(ultima_modificacao)
+    response.headers['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,121 @@
+from app import db
+from app.models import TokenRevogado
+from app.utils.cache import CacheTTL
+from datetime import datetime, timezone
+from threading import Lock
+import time
+
+def _agora():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _expiracao(jwt_payload):
+    # Data de expiração do token em UTC (sem timezone, como gravado no banco)
+    return datetime.fromtimestamp(jwt_payload['exp'], timezone.utc).replace(tzinfo=None)
+
+class ArmazenamentoBanco:
+    """Revogações na tabela tokens_revogados, compartilhada entre workers e reinícios"""
+
+    def revogar(self, jti, expira_em):
+        db.session.merge(TokenRevogado(jti=jti, expira_em=expira_em))
+        db.session.commit()
+
+    def esta_revogado(self, jti):
+        return db.session.query(TokenRevogado.jti).filter(
+            TokenRevogado.jti == jti,
+            TokenRevogado.expira_em > _agora()
+        ).first() is not None
+
+    def limpar_expirados(self):
+        removidos = TokenRevogado.query.filter(TokenRevogado.expira_em <= _agora()).delete(synchronize_session=False)
+        db.session.commit()
+        return removidos
+
+class ArmazenamentoChaveValor:
+    """Substituto local de um servidor chave/valor no estilo Redis (SETEX/EXISTS).
+
+    Os dados ficam só neste processo, então serve para desenvolvimento ou
+    deploy com um único worker. Um cliente Redis com os mesmos três métodos
+    pode ser usado no lugar.
+    """
+
+    def __init__(self):
+        self._chaves = {}
+        self._lock = Lock()
+
+    def revogar(self, jti, expira_em):
+        ttl = (expira_em - _agora()).total_seconds()
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._chaves[jti] = time.monotonic() + ttl
+
+    def esta_revogado(self, jti):
+        with self._lock:
+            expira_em = self._chaves.get(jti)
+            if expira_em is None:
+                return False
+            if expira_em <= time.monotonic():
+                del self._chaves[jti]
+                return False
+            return True
+
+    def limpar_expirados(self):
+        agora = time.monotonic()
+        with self._lock:
+            expirados = [jti for jti, expira_em in self._chaves.items() if expira_em <= agora]
+            for jti in expirados:
+                del self._chaves[jti]
+        return len(expirados)
+
+ARMAZENAMENTOS = {
+    'banco': ArmazenamentoBanco,
+    'chave_valor': ArmazenamentoChaveValor
+}
+
+class RevogacaoTokens:
+    """Lista de tokens revogados com cache TTL em memória na frente do armazenamento.
+
+    Tokens revogados ficam no cache até expirarem. Tokens válidos ficam no
+    máximo REVOGACAO_CACHE_TTL segundos, que é o atraso máximo para um logout
+    feito em outro worker ser percebido aqui.
+    """
+
+    def __init__(self):
+        self.armazenamento = None
+        self.cache = CacheTTL()
+        self.ttl_validos = 30
+
+    def init_app(self, app):
+        backend = app.config.get('REVOGACAO_BACKEND', 'banco')
+        if backend not in ARMAZENAMENTOS:
+            raise ValueError(f"REVOGACAO_BACKEND inválido: {backend}")
+
+        self.armazenamento = ARMAZENAMENTOS[backend]()
+        self.ttl_validos = int(app.config.get('REVOGACAO_CACHE_TTL', 30))
+        self.cache.limpar()
+
+    def revogar(self, jwt_payload):
+        expira_em = _expiracao(jwt_payload)
+        self.armazenamento.revogar(jwt_payload['jti'], expira_em)
+        self.cache.definir(jwt_payload['jti'], True, (expira_em - _agora()).total_seconds())
+
+    def registrar_emissao(self, jwt_payload):
+        # Um token recém-emitido não pode estar revogado: evita a consulta no primeiro uso
+        restante = (_expiracao(jwt_payload) - _agora()).total_seconds()
+        self.cache.definir(jwt_payload['jti'], False, min(self.ttl_validos, restante))
+
+    def esta_revogado(self, jwt_payload):
+        jti = jwt_payload['jti']
+        revogado = self.cache.obter(jti)
+        if revogado is not None:
+            return revogado
+
+        restante = (_expiracao(jwt_payload) - _agora()).total_seconds()
+        revogado = self.armazenamento.esta_revogado(jti)
+        self.cache.definir(jti, revogado, restante if revogado else min(self.ttl_validos, restante))
+        return revogado
+
+    def limpar_expirados(self):
+        return self.armazenamento.limpar_expirados()
+
+revogacao = RevogacaoTokens()
@@ -1,4 +1,6 @@
-from flask import jsonify
+from flask import jsonify, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from functools import wraps
 import re
 from datetime import datetime
 
@@ -134,4 +136,33 @@ def validate_vehicle_type(tipo):
 
 def error_response(message, status_code=400):
     # Retorna resposta de erro padronizada
-    return jsonify({'error': message}), status_code
\ No newline at end of file
+    return jsonify({'error': message}), status_code
+
+def token_admin():
+    # Indica se o token da requisição foi emitido para um administrador
+    return get_jwt().get('tipo') == 'admin'
+
+def usuario_atual():
+    # Conta do token, consultada só nas rotas que precisam dela e uma vez por
+    # requisição; None se a conta foi removida depois da emissão do token
+    if '_usuario_jwt' not in g:
+        from app import db
+        from app.models import User, Administrador
+
+        # Usuários e administradores têm IDs independentes: a claim tipo
+        # define em qual tabela procurar
+        modelo = Administrador if token_admin() else User
+        g._usuario_jwt = db.session.get(modelo, int(get_jwt_identity()))
+    return g._usuario_jwt
+
+def admin_required(mensagem='Acesso não autorizado'):
+    # Exige token válido com a claim tipo=admin, sem consultar o banco
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            if not token_admin():
+                return error_response(mensagem, 403)
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
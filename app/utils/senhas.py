@@ -0,0 +1,134 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from threading import Lock
+import bcrypt
+import time
+import os
+
+class SenhasOcupadas(Exception):
+    """Fila de hashing cheia: a requisição deve ser recusada com 503"""
+
+class MetricaLatencia:
+    """Contagem e latências recentes (em ms) de uma operação"""
+
+    def __init__(self, amostras=1000):
+        self.total = 0
+        self.soma_ms = 0.0
+        self.maximo_ms = 0.0
+        self.recentes = deque(maxlen=amostras)
+
+    def registrar(self, ms):
+        self.total += 1
+        self.soma_ms += ms
+        self.maximo_ms = max(self.maximo_ms, ms)
+        self.recentes.append(ms)
+
+    def to_dict(self):
+        ordenadas = sorted(self.recentes)
+
+        def percentil(p):
+            if not ordenadas:
+                return None
+            return round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))], 2)
+
+        return {
+            'total': self.total,
+            'media_ms': round(self.soma_ms / self.total, 2) if self.total else None,
+            'p50_ms': percentil(0.5),
+            'p95_ms': percentil(0.95),
+            'maximo_ms': round(self.maximo_ms, 2)
+        }
+
+class PoolSenhas:
+    """Hash e verificação bcrypt em um pool de threads limitado.
+
+    O bcrypt libera o GIL, então as outras threads do processo continuam
+    atendendo enquanto um hash é calculado. Quando há mais pedidos que
+    BCRYPT_WORKERS + BCRYPT_FILA_MAXIMA, os novos são recusados na hora em vez
+    de acumular latência para todo o worker.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._executor = None
+        self.configurar(12, min(4, os.cpu_count() or 1), 32)
+
+    def init_app(self, app):
+        self.configurar(
+            int(app.config.get('BCRYPT_ROUNDS', 12)),
+            int(app.config.get('BCRYPT_WORKERS', self.workers)),
+            int(app.config.get('BCRYPT_FILA_MAXIMA', self.fila_maxima))
+        )
+
+    def configurar(self, rounds, workers, fila_maxima):
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False)
+
+            self.rounds = rounds
+            self.workers = workers
+            self.fila_maxima = fila_maxima
+            self.capacidade = workers + fila_maxima
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+            self._em_andamento = 0
+            self._maior_fila = 0
+            self._rejeitadas = 0
+            self._latencias = {'hash': MetricaLatencia(), 'verificacao': MetricaLatencia()}
+            self._espera = MetricaLatencia()
+
+    def _executar(self, operacao, funcao, *args):
+        with self._lock:
+            if self._em_andamento >= self.capacidade:
+                self._rejeitadas += 1
+                raise SenhasOcupadas('Servidor ocupado, tente novamente em instantes')
+            self._em_andamento += 1
+            self._maior_fila = max(self._maior_fila, self._em_andamento - self.workers)
+
+        enviado_em = time.perf_counter()
+
+        def tarefa():
+            iniciado_em = time.perf_counter()
+            resultado = funcao(*args)
+            return resultado, iniciado_em, time.perf_counter()
+
+        try:
+            resultado, iniciado_em, finalizado_em = self._executor.submit(tarefa).result()
+        finally:
+            with self._lock:
+                self._em_andamento -= 1
+
+        with self._lock:
+            self._espera.registrar((iniciado_em - enviado_em) * 1000)
+            self._latencias[operacao].registrar((finalizado_em - iniciado_em) * 1000)
+        return resultado
+
+    def gerar_hash(self, senha):
+        salt = bcrypt.gensalt(self.rounds)
+        return self._executar('hash', bcrypt.hashpw, senha.encode('utf-8'), salt).decode('utf-8')
+
+    def verificar(self, senha, senha_hash):
+        return self._executar('verificacao', bcrypt.checkpw, senha.encode('utf-8'), senha_hash.encode('utf-8'))
+
+    def precisa_rehash(self, senha_hash):
+        # Hash no formato $2b$<rounds>$...: refaz quando o custo configurado mudou
+        try:
+            return int(senha_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'rounds': self.rounds,
+                'workers': self.workers,
+                'fila_maxima': self.fila_maxima,
+                'em_andamento': self._em_andamento,
+                'fila_atual': max(0, self._em_andamento - self.workers),
+                'maior_fila': self._maior_fila,
+                'rejeitadas': self._rejeitadas,
+                'espera_fila': self._espera.to_dict(),
+                'hash': self._latencias['hash'].to_dict(),
+                'verificacao': self._latencias['verificacao'].to_dict()
+            }
+
+senhas = PoolSenhas()
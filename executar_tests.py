@@ -9,7 +9,28 @@ def executar_todos_testes():
         "test_servicos.py",
         "test_modelos_veiculo.py",
         "test_agendamentos.py",
-        "test_admin_completo.py"
+        "test_admin_completo.py",
+        "test_disponibilidade.py",
+        "test_listagem.py",
+        "test_indices.py",
+        "test_permissoes.py",
+        "test_revogacao.py",
+        "test_senhas.py",
+        "test_catalogo.py",
+        "test_http_condicional.py",
+        "test_manutencao.py",
+        "test_agendador.py",
+        "test_estatisticas.py",
+        "test_relatorios.py",
+        "test_exportacao.py",
+        "test_placas.py",
+        "test_historico.py",
+        "test_lote.py",
+        "test_boxes.py",
+        "test_ocupacao.py",
+        "test_grade.py",
+        "test_eventos.py",
+        "test_sincronizacao.py"
     ]
     
     total_passaram = 0
@@ -0,0 +1,10 @@
+# Configuração do gunicorn usada pela imagem Docker
+import os
+
+bind = '0.0.0.0:5000'
+
+# Cada conexão SSE (/api/agendamentos/eventos) ocupa uma thread enquanto estiver
+# aberta: com o worker sync padrão, um único EventSource bloquearia o worker inteiro
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
@@ -0,0 +1,30 @@
+"""índice de agendamento_eventos por usuário (sincronização incremental)
+
+Revision ID: 2319a352385e
+Revises: cfd8d3abf4ac
+Create Date: 2026-10-18 03:47:23.662051
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2319a352385e'
+down_revision = 'cfd8d3abf4ac'
+branch_labels = None
+depends_on = None
+
+
+def _indices(tabela):
+    return {indice['name'] for indice in sa.inspect(op.get_bind()).get_indexes(tabela)}
+
+
+def upgrade():
+    if 'ix_agendamento_eventos_user_id' not in _indices('agendamento_eventos'):
+        op.create_index('ix_agendamento_eventos_user_id', 'agendamento_eventos', ['user_id', 'id'])
+
+
+def downgrade():
+    if 'ix_agendamento_eventos_user_id' in _indices('agendamento_eventos'):
+        op.drop_index('ix_agendamento_eventos_user_id', table_name='agendamento_eventos')
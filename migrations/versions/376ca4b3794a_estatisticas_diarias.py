@@ -0,0 +1,44 @@
+"""estatisticas diarias
+
+Revision ID: 376ca4b3794a
+Revises: c254cb0ff044
+Create Date: 2026-10-18 03:20:46.795873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '376ca4b3794a'
+down_revision = 'c254cb0ff044'
+branch_labels = None
+depends_on = None
+
+
+def _tabelas():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    if 'estatisticas_diarias' not in _tabelas():
+        op.create_table(
+            'estatisticas_diarias',
+            sa.Column('data', sa.Date(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('quantidade', sa.Integer(), nullable=False),
+            sa.Column('receita', sa.Numeric(precision=12, scale=2), nullable=False),
+            sa.PrimaryKeyConstraint('data', 'status')
+        )
+
+        # Carga inicial a partir dos agendamentos existentes
+        op.execute(
+            "INSERT INTO estatisticas_diarias (data, status, quantidade, receita) "
+            "SELECT data_agendamento, status, COUNT(id), COALESCE(SUM(valor_total), 0) "
+            "FROM agendamentos GROUP BY data_agendamento, status"
+        )
+
+
+def downgrade():
+    if 'estatisticas_diarias' in _tabelas():
+        op.drop_table('estatisticas_diarias')
@@ -0,0 +1,39 @@
+"""versoes catalogo
+
+Revision ID: 39be9fdcc2e7
+Revises: 5f93bd3d79ee
+Create Date: 2026-10-18 03:13:25.552753
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '39be9fdcc2e7'
+down_revision = '5f93bd3d79ee'
+branch_labels = None
+depends_on = None
+
+CATALOGOS = ['servicos', 'modelos', 'horarios']
+
+
+def _tabelas():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    if 'versoes_catalogo' not in _tabelas():
+        tabela = op.create_table(
+            'versoes_catalogo',
+            sa.Column('nome', sa.String(length=50), nullable=False),
+            sa.Column('versao', sa.Integer(), nullable=False),
+            sa.Column('atualizado_em', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+            sa.PrimaryKeyConstraint('nome')
+        )
+        op.bulk_insert(tabela, [{'nome': nome, 'versao': 1} for nome in CATALOGOS])
+
+
+def downgrade():
+    if 'versoes_catalogo' in _tabelas():
+        op.drop_table('versoes_catalogo')
@@ -0,0 +1,50 @@
+"""veiculo trigramas
+
+Revision ID: 586e929cc4cb
+Revises: 376ca4b3794a
+Create Date: 2026-10-18 03:25:45.767112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '586e929cc4cb'
+down_revision = '376ca4b3794a'
+branch_labels = None
+depends_on = None
+
+
+def _tabelas():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    if 'veiculo_trigramas' not in _tabelas():
+        op.create_table(
+            'veiculo_trigramas',
+            sa.Column('trigrama', sa.String(length=3), nullable=False),
+            sa.Column('veiculo_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['veiculo_id'], ['veiculos.id']),
+            sa.PrimaryKeyConstraint('trigrama', 'veiculo_id')
+        )
+        op.create_index(op.f('ix_veiculo_trigramas_veiculo_id'), 'veiculo_trigramas', ['veiculo_id'], unique=False)
+
+        # Carga inicial com as placas já cadastradas (os trigramas são gerados em Python)
+        trigramas = sa.table('veiculo_trigramas', sa.column('trigrama'), sa.column('veiculo_id'))
+        linhas = []
+        for veiculo_id, placa in op.get_bind().execute(sa.text('SELECT id, placa FROM veiculos')):
+            placa = ''.join(c for c in placa.upper() if c.isalnum())
+            linhas.extend(
+                {'trigrama': t, 'veiculo_id': veiculo_id}
+                for t in sorted({placa[i:i + 3] for i in range(len(placa) - 2)})
+            )
+        if linhas:
+            op.bulk_insert(trigramas, linhas)
+
+
+def downgrade():
+    if 'veiculo_trigramas' in _tabelas():
+        op.drop_index(op.f('ix_veiculo_trigramas_veiculo_id'), table_name='veiculo_trigramas')
+        op.drop_table('veiculo_trigramas')
@@ -0,0 +1,37 @@
+"""tokens revogados
+
+Revision ID: 5f93bd3d79ee
+Revises: 973b1bcd70e5
+Create Date: 2026-10-18 03:07:39.318118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f93bd3d79ee'
+down_revision = '973b1bcd70e5'
+branch_labels = None
+depends_on = None
+
+
+def _tabelas():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    if 'tokens_revogados' not in _tabelas():
+        op.create_table(
+            'tokens_revogados',
+            sa.Column('jti', sa.String(length=36), nullable=False),
+            sa.Column('expira_em', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('jti')
+        )
+        op.create_index('ix_tokens_revogados_expira_em', 'tokens_revogados', ['expira_em'])
+
+
+def downgrade():
+    if 'tokens_revogados' in _tabelas():
+        op.drop_index('ix_tokens_revogados_expira_em', table_name='tokens_revogados')
+        op.drop_table('tokens_revogados')
@@ -0,0 +1,44 @@
+"""grade de horários e limpeza por serviço e por dia
+
+Revision ID: 8029427f5ed2
+Revises: c0642d2fe22c
+Create Date: 2026-10-18 03:41:47.817873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8029427f5ed2'
+down_revision = 'c0642d2fe22c'
+branch_labels = None
+depends_on = None
+
+
+def _colunas(tabela):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabela)}
+
+
+def upgrade():
+    # Nulos no serviço: vale a regra do dia
+    colunas = _colunas('servicos')
+    for coluna in ('intervalo_minutos', 'limpeza_minutos'):
+        if coluna not in colunas:
+            op.add_column('servicos', sa.Column(coluna, sa.Integer(), nullable=True))
+
+    # Padrões do dia mantêm a grade de 30 minutos sem limpeza (os mapas de ocupação continuam válidos)
+    colunas = _colunas('horarios_funcionamento')
+    if 'intervalo_minutos' not in colunas:
+        op.add_column('horarios_funcionamento', sa.Column('intervalo_minutos', sa.Integer(), nullable=False, server_default='30'))
+    if 'limpeza_minutos' not in colunas:
+        op.add_column('horarios_funcionamento', sa.Column('limpeza_minutos', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    for tabela in ('horarios_funcionamento', 'servicos'):
+        colunas = _colunas(tabela)
+        with op.batch_alter_table(tabela) as batch_op:
+            for coluna in ('limpeza_minutos', 'intervalo_minutos'):
+                if coluna in colunas:
+                    batch_op.drop_column(coluna)
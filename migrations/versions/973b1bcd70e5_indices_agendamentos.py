@@ -0,0 +1,57 @@
+"""indices agendamentos
+
+Revision ID: 973b1bcd70e5
+Revises:
+Create Date: 2026-10-18 02:59:51.530992
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '973b1bcd70e5'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Bancos criados por /api/init-db (db.create_all) já podem ter as tabelas e
+# índices, então cada passo só é aplicado se ainda não existir.
+INDICES = [
+    ('ix_agendamentos_data_status', 'agendamentos', ['data_agendamento', 'status']),
+    ('ix_agendamentos_usuario_data_horario', 'agendamentos', ['user_id', 'data_agendamento', 'horario_agendamento']),
+    ('ix_agendamentos_veiculo_data', 'agendamentos', ['veiculo_id', 'data_agendamento']),
+    ('ix_agendamentos_data_horario', 'agendamentos', ['data_agendamento', 'horario_agendamento', 'id']),
+    ('ix_veiculos_usuario_id', 'veiculos', ['usuario_id']),
+]
+
+
+def _tabelas():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _indices(tabela):
+    return {indice['name'] for indice in sa.inspect(op.get_bind()).get_indexes(tabela)}
+
+
+def upgrade():
+    if 'ocupacao_dias' not in _tabelas():
+        op.create_table(
+            'ocupacao_dias',
+            sa.Column('data', sa.Date(), nullable=False),
+            sa.Column('versao', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('data')
+        )
+
+    for nome, tabela, colunas in INDICES:
+        if nome not in _indices(tabela):
+            op.create_index(nome, tabela, colunas)
+
+
+def downgrade():
+    for nome, tabela, colunas in reversed(INDICES):
+        if nome in _indices(tabela):
+            op.drop_index(nome, table_name=tabela)
+
+    if 'ocupacao_dias' in _tabelas():
+        op.drop_table('ocupacao_dias')
@@ -0,0 +1,44 @@
+"""quantidade de boxes e box do agendamento
+
+Revision ID: 9b89608a9ec8
+Revises: 586e929cc4cb
+Create Date: 2026-10-18 03:32:56.648043
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b89608a9ec8'
+down_revision = '586e929cc4cb'
+branch_labels = None
+depends_on = None
+
+
+def _colunas(tabela):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabela)}
+
+
+def upgrade():
+    if 'quantidade_boxes' not in _colunas('horarios_funcionamento'):
+        op.add_column(
+            'horarios_funcionamento',
+            sa.Column('quantidade_boxes', sa.Integer(), nullable=False, server_default='1')
+        )
+
+    if 'box' not in _colunas('agendamentos'):
+        op.add_column('agendamentos', sa.Column('box', sa.Integer(), nullable=True))
+
+        # Até aqui havia um box só: nenhum agendamento existente se sobrepõe
+        op.execute("UPDATE agendamentos SET box = 1")
+
+
+def downgrade():
+    if 'box' in _colunas('agendamentos'):
+        with op.batch_alter_table('agendamentos') as batch_op:
+            batch_op.drop_column('box')
+
+    if 'quantidade_boxes' in _colunas('horarios_funcionamento'):
+        with op.batch_alter_table('horarios_funcionamento') as batch_op:
+            batch_op.drop_column('quantidade_boxes')
@@ -0,0 +1,38 @@
+"""sequencias (ids de agendamento_eventos na ordem dos commits)
+
+Revision ID: a4c9e1f7d203
+Revises: 2319a352385e
+Create Date: 2026-10-18 05:12:41.208316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c9e1f7d203'
+down_revision = '2319a352385e'
+branch_labels = None
+depends_on = None
+
+
+def _tabelas():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    if 'sequencias' not in _tabelas():
+        tabela = op.create_table(
+            'sequencias',
+            sa.Column('nome', sa.String(length=50), nullable=False),
+            sa.Column('valor', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('nome')
+        )
+        # Continua do último evento já gravado
+        ultimo = op.get_bind().execute(sa.text('SELECT COALESCE(MAX(id), 0) FROM agendamento_eventos')).scalar()
+        op.bulk_insert(tabela, [{'nome': 'agendamento_eventos', 'valor': ultimo}])
+
+
+def downgrade():
+    if 'sequencias' in _tabelas():
+        op.drop_table('sequencias')
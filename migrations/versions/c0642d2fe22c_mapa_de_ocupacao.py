@@ -0,0 +1,74 @@
+"""mapa de ocupacao
+
+Revision ID: c0642d2fe22c
+Revises: 9b89608a9ec8
+Create Date: 2026-10-18 03:38:13.662334
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c0642d2fe22c'
+down_revision = '9b89608a9ec8'
+branch_labels = None
+depends_on = None
+
+# Mesmo formato de app.services.disponibilidade: 288 bits de 5 minutos por box
+MINUTOS_POR_BIT = 5
+BITS_DIA = 24 * 60 // MINUTOS_POR_BIT
+BYTES_POR_BOX = BITS_DIA // 8
+
+
+def _colunas(tabela):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabela)}
+
+
+def upgrade():
+    if 'mapa' in _colunas('ocupacao_dias'):
+        return
+
+    op.add_column('ocupacao_dias', sa.Column('mapa', sa.LargeBinary(), nullable=True))
+
+    # Carga inicial com os agendamentos que ocupam horário (boxes já preenchidos na revisão anterior)
+    agendamentos = sa.table(
+        'agendamentos',
+        sa.column('data_agendamento', sa.Date), sa.column('horario_agendamento', sa.Time),
+        sa.column('box', sa.Integer), sa.column('status', sa.String), sa.column('servico_id', sa.Integer)
+    )
+    servicos = sa.table('servicos', sa.column('id', sa.Integer), sa.column('duracao_minutos', sa.Integer))
+    ocupacao_dias = sa.table('ocupacao_dias', sa.column('data', sa.Date), sa.column('versao', sa.Integer), sa.column('mapa', sa.LargeBinary))
+
+    conexao = op.get_bind()
+    consulta = sa.select(
+        agendamentos.c.data_agendamento, agendamentos.c.horario_agendamento,
+        servicos.c.duracao_minutos, agendamentos.c.box
+    ).select_from(
+        agendamentos.join(servicos, servicos.c.id == agendamentos.c.servico_id)
+    ).where(agendamentos.c.status.in_(['pendente', 'confirmado']))
+
+    mapas = {}
+    for data, horario, duracao, box in conexao.execute(consulta):
+        inicio = horario.hour * 60 + horario.minute
+        primeiro = inicio // MINUTOS_POR_BIT
+        ultimo = min(-(-(inicio + duracao) // MINUTOS_POR_BIT), BITS_DIA)
+        bits = mapas.setdefault(data, [])
+        while len(bits) < (box or 1):
+            bits.append(0)
+        if ultimo > primeiro:
+            bits[(box or 1) - 1] |= ((1 << (ultimo - primeiro)) - 1) << primeiro
+
+    existentes = {data for data, in conexao.execute(sa.select(ocupacao_dias.c.data))}
+    for data, bits in mapas.items():
+        mapa = b''.join(b.to_bytes(BYTES_POR_BOX, 'big') for b in bits)
+        if data in existentes:
+            conexao.execute(ocupacao_dias.update().where(ocupacao_dias.c.data == data).values(mapa=mapa))
+        else:
+            conexao.execute(ocupacao_dias.insert().values(data=data, versao=0, mapa=mapa))
+
+
+def downgrade():
+    if 'mapa' in _colunas('ocupacao_dias'):
+        with op.batch_alter_table('ocupacao_dias') as batch_op:
+            batch_op.drop_column('mapa')
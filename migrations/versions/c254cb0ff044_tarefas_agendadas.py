@@ -0,0 +1,43 @@
+"""tarefas agendadas
+
+Revision ID: c254cb0ff044
+Revises: 39be9fdcc2e7
+Create Date: 2026-10-18 03:17:39.336146
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c254cb0ff044'
+down_revision = '39be9fdcc2e7'
+branch_labels = None
+depends_on = None
+
+
+def _tabelas():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    if 'tarefas_agendadas' not in _tabelas():
+        op.create_table(
+            'tarefas_agendadas',
+            sa.Column('nome', sa.String(length=100), nullable=False),
+            sa.Column('lider', sa.String(length=100), nullable=True),
+            sa.Column('lease_ate', sa.DateTime(), nullable=True),
+            sa.Column('proxima_execucao', sa.DateTime(), nullable=False),
+            sa.Column('ultima_execucao', sa.DateTime(), nullable=True),
+            sa.Column('ultimo_sucesso', sa.DateTime(), nullable=True),
+            sa.Column('ultima_duracao_ms', sa.Float(), nullable=True),
+            sa.Column('ultimo_resultado', sa.Text(), nullable=True),
+            sa.Column('ultimo_erro', sa.Text(), nullable=True),
+            sa.Column('execucoes', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('nome')
+        )
+
+
+def downgrade():
+    if 'tarefas_agendadas' in _tabelas():
+        op.drop_table('tarefas_agendadas')
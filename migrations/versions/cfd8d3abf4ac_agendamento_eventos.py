@@ -0,0 +1,44 @@
+"""registro de eventos de agendamentos (stream SSE)
+
+Revision ID: cfd8d3abf4ac
+Revises: 8029427f5ed2
+Create Date: 2026-10-18 03:44:56.188362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cfd8d3abf4ac'
+down_revision = '8029427f5ed2'
+branch_labels = None
+depends_on = None
+
+
+def _tabelas():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    if 'agendamento_eventos' not in _tabelas():
+        op.create_table(
+            'agendamento_eventos',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('tipo', sa.String(length=20), nullable=False),
+            sa.Column('agendamento_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('data_agendamento', sa.Date(), nullable=True),
+            sa.Column('horario_agendamento', sa.Time(), nullable=True),
+            sa.Column('criado_em', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sqlite_autoincrement=True
+        )
+        op.create_index(op.f('ix_agendamento_eventos_criado_em'), 'agendamento_eventos', ['criado_em'], unique=False)
+
+
+def downgrade():
+    if 'agendamento_eventos' in _tabelas():
+        op.drop_index(op.f('ix_agendamento_eventos_criado_em'), table_name='agendamento_eventos')
+        op.drop_table('agendamento_eventos')
@@ -1,6 +1,7 @@
 import pytest
 import os
 import sys
+from datetime import date, time, timedelta
 from dotenv import load_dotenv
 
 # Adiciona o diretório raiz ao path
@@ -10,6 +11,8 @@ load_dotenv()
 
 BASE_URL = os.getenv('TEST_BASE_URL', 'http://localhost:5000')
 
+AMANHA = date.today() + timedelta(days=1)
+
 @pytest.fixture
 def base_url():
     return BASE_URL
@@ -33,4 +36,167 @@ def admin_credentials():
     return {
         "email": "admin@lustro.com",
         "senha": "Admin@007"
-    }
\ No newline at end of file
+    }
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'banco_arquivo: usa SQLite em arquivo, para transações concorrentes em threads')
+    config.addinivalue_line('markers', 'cadastro(servico): colunas do serviço criado pela fixture cadastro')
+    config.addinivalue_line('markers', 'expediente(**colunas): colunas de HorarioFuncionamento da fixture lava_rapido')
+
+@pytest.fixture
+def app(request, tmp_path):
+    # Aplicação em processo com banco próprio (SQLite em memória por padrão)
+    from app import create_app, db
+
+    # O SQLite em memória é uma conexão só, compartilhada por todas as threads
+    uri = os.getenv('TEST_DATABASE_URI', 'sqlite://')
+    if uri == 'sqlite://' and request.node.get_closest_marker('banco_arquivo'):
+        uri = f"sqlite:///{tmp_path / 'lustro.db'}"
+
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'BCRYPT_ROUNDS': 4
+    })
+
+    with app.app_context():
+        db.create_all()
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def contador_queries(app):
+    # Conta os comandos SQL enviados ao banco durante o bloco
+    from sqlalchemy import event
+    from app import db
+
+    class Contador:
+        def __init__(self):
+            self.total = 0
+
+        def __call__(self, *args, **kwargs):
+            self.total += 1
+
+        def __enter__(self):
+            self.total = 0
+            event.listen(self.engine, 'before_cursor_execute', self)
+            return self
+
+        def __exit__(self, *exc):
+            event.remove(self.engine, 'before_cursor_execute', self)
+
+    contador = Contador()
+    with app.app_context():
+        contador.engine = db.engine
+    return contador
+
+def cabecalho(token):
+    return {'Authorization': f'Bearer {token}'}
+
+def entrar(client, email, senha, admin=False):
+    url = '/api/auth/admin/login' if admin else '/api/auth/login'
+    return client.post(url, json={'email': email, 'senha': senha}).get_json()['access_token']
+
+@pytest.fixture
+def cadastro(request, app, client):
+    """Administrador, dois clientes, um serviço de 60 minutos e um modelo de veículo.
+
+    Retorna os ids, os tokens e o cabeçalho de autorização de cada conta
+    ('cliente', 'outro', 'admin'). O serviço aceita outras colunas com
+    @pytest.mark.cadastro(servico={...}).
+    """
+    from app import db
+    from app.models import User, Administrador, Servico, ModeloVeiculo
+
+    marcador = request.node.get_closest_marker('cadastro')
+    colunas_servico = marcador.kwargs.get('servico', {}) if marcador else {}
+
+    with app.app_context():
+        admin = Administrador(email='admin@teste.com', nome='Admin')
+        admin.set_password('Admin@007')
+        cliente = User(nome='Cliente', email='cliente@teste.com', telefone='(11) 99999-9999')
+        cliente.set_password('Senha@123')
+        outro = User(nome='Outro Cliente', email='outro@teste.com', telefone='(11) 98888-8888')
+        outro.set_password('Senha@123')
+        servico = Servico(**{'nome': 'Lavagem', 'descricao': 'Teste', 'preco': 50, 'duracao_minutos': 60, **colunas_servico})
+        modelo = ModeloVeiculo(nome='Sedan')
+        db.session.add_all([admin, cliente, outro, servico, modelo])
+        db.session.commit()
+        ids = {'admin_id': admin.id, 'cliente_id': cliente.id, 'outro_id': outro.id, 'servico_id': servico.id, 'modelo_veiculo_id': modelo.id}
+
+    tokens = {
+        'cliente': entrar(client, 'cliente@teste.com', 'Senha@123'),
+        'outro': entrar(client, 'outro@teste.com', 'Senha@123'),
+        'admin': entrar(client, 'admin@teste.com', 'Admin@007', admin=True)
+    }
+    return {'ids': ids, 'tokens': tokens, **{conta: cabecalho(token) for conta, token in tokens.items()}}
+
+@pytest.fixture
+def lava_rapido(request, app, cadastro):
+    """cadastro com expediente todos os dias, das 08:00 às 12:00 em um box.
+
+    Outras colunas de HorarioFuncionamento (hora_fechamento, quantidade_boxes,
+    limpeza_minutos...) com @pytest.mark.expediente(...).
+    """
+    from app import db
+    from app.models import HorarioFuncionamento
+
+    marcador = request.node.get_closest_marker('expediente')
+    colunas = {'aberto': True, 'hora_abertura': time(8, 0), 'hora_fechamento': time(12, 0), **(marcador.kwargs if marcador else {})}
+
+    with app.app_context():
+        for dia in range(7):
+            db.session.add(HorarioFuncionamento(dia_semana=dia, **colunas))
+        db.session.commit()
+    return cadastro
+
+def adicionar_veiculo(cadastro, placa, conta='cliente', **colunas):
+    """Veículo da conta na sessão do app_context atual, já com id"""
+    from app import db
+    from app.models import Veiculo
+
+    veiculo = Veiculo(**{
+        'usuario_id': cadastro['ids'][f'{conta}_id'], 'nome_proprietario': 'Cliente', 'placa': placa,
+        'modelo_veiculo_id': cadastro['ids']['modelo_veiculo_id'], 'telefone': '11999999999', **colunas
+    })
+    db.session.add(veiculo)
+    db.session.flush()
+    return veiculo
+
+def novo_agendamento(cadastro, veiculo_id, dia, status, horario=time(8, 0), **colunas):
+    """Agendamento do cliente pelo ORM, sem passar pela reserva de horário da API"""
+    from app.models import Agendamento
+
+    return Agendamento(**{
+        'veiculo_id': veiculo_id, 'servico_id': cadastro['ids']['servico_id'], 'user_id': cadastro['ids']['cliente_id'],
+        'data_agendamento': dia, 'horario_agendamento': horario, 'valor_total': 50, 'status': status, **colunas
+    })
+
+def agendar(client, lava_rapido, placa, horario, conta='cliente', servico_id=None):
+    """Agendamento para amanhã pela API; retorna a resposta"""
+    return client.post('/api/agendamentos', headers=lava_rapido[conta], json={
+        'data_agendamento': AMANHA.isoformat(), 'horario_agendamento': horario, 'placa': placa,
+        'nome_proprietario': 'Cliente', 'telefone': '11999999999',
+        'servico_id': servico_id or lava_rapido['ids']['servico_id'],
+        'modelo_veiculo_id': lava_rapido['ids']['modelo_veiculo_id']
+    })
+
+def criar_agendamento(client, lava_rapido, placa, horario, **opcoes):
+    """Como agendar, exigindo 201; retorna o id do agendamento"""
+    response = agendar(client, lava_rapido, placa, horario, **opcoes)
+    assert response.status_code == 201
+    return response.get_json()['agendamento']['id']
+
+def livres(client, lava_rapido, servico_id=None):
+    """Horários livres de amanhã para o serviço"""
+    servico_id = servico_id or lava_rapido['ids']['servico_id']
+    response = client.get(f'/api/agendamentos/horarios-disponiveis?data={AMANHA.isoformat()}&servico_id={servico_id}', headers=lava_rapido['cliente'])
+    return response.get_json()['horarios_disponiveis']
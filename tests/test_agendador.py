@@ -0,0 +1,96 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+@pytest.fixture
+def tarefas(monkeypatch):
+    # Substitui as tarefas reais por tarefas de teste
+    from app.utils import agendador as modulo
+
+    execucoes = []
+
+    def ok():
+        execucoes.append('ok')
+        return {'processados': 3}
+
+    def falha():
+        execucoes.append('falha')
+        raise RuntimeError('banco indisponível')
+
+    monkeypatch.setattr(modulo, 'TAREFAS', {
+        'ok': modulo.Tarefa('ok', 60, ok),
+        'falha': modulo.Tarefa('falha', 60, falha)
+    })
+    return execucoes
+
+def linha(app, nome):
+    from app import db
+    from app.models import TarefaAgendada
+
+    with app.app_context():
+        return db.session.get(TarefaAgendada, nome).to_dict()
+
+class TestAgendador:
+    def test_executa_tarefas_vencidas_uma_vez(self, app, tarefas):
+        from app.utils.agendador import agendador
+
+        assert sorted(agendador.executar_pendentes()) == ['falha', 'ok']
+        # Nenhuma vence de novo antes do intervalo
+        assert agendador.executar_pendentes() == []
+        assert tarefas == ['ok', 'falha']
+
+        print("✅ Agendador - Tarefas vencidas executadas uma vez")
+
+    def test_registra_resultado_e_erro(self, app, tarefas):
+        from app.utils.agendador import agendador
+
+        agendador.executar_pendentes()
+
+        ok = linha(app, 'ok')
+        assert ok['ultimo_sucesso'] is not None
+        assert ok['ultimo_resultado'] == {'processados': 3}
+        assert ok['ultima_duracao_ms'] is not None
+        assert ok['lease_ate'] is None
+
+        falha = linha(app, 'falha')
+        assert falha['ultimo_sucesso'] is None
+        assert falha['ultimo_erro'] == 'banco indisponível'
+        assert falha['execucoes'] == 1
+
+        print("✅ Agendador - Duração, sucesso e erro registrados")
+
+    def test_lease_de_outro_worker(self, app, tarefas):
+        from app import db
+        from app.models import TarefaAgendada
+        from app.utils.agendador import agendador
+
+        agora = datetime.now(timezone.utc).replace(tzinfo=None)
+        with app.app_context():
+            db.session.add(TarefaAgendada(nome='ok', proxima_execucao=agora, lider='outro:1', lease_ate=agora + timedelta(minutes=5), execucoes=0))
+            db.session.add(TarefaAgendada(nome='falha', proxima_execucao=agora, lider='outro:1', lease_ate=agora - timedelta(minutes=5), execucoes=0))
+            db.session.commit()
+
+        # Lease válido é respeitado; lease vencido (worker morto) é assumido
+        assert agendador.executar_pendentes() == ['falha']
+        assert linha(app, 'ok')['lider'] == 'outro:1'
+
+        print("✅ Agendador - Só o detentor do lease executa")
+
+    def test_status_admin(self, client, cadastro, tarefas):
+        from app.utils.agendador import agendador
+
+        agendador.executar_pendentes()
+        response = client.get('/api/admin/tarefas', headers=cadastro['admin'])
+        assert response.status_code == 200
+
+        tarefas_status = {t['nome']: t for t in response.get_json()['tarefas']}
+        assert tarefas_status['ok']['intervalo_segundos'] == 60
+        assert tarefas_status['ok']['execucoes'] == 1
+
+        print("✅ Agendador - Status das tarefas para admin")
+
+    def test_tarefas_de_manutencao_registradas(self):
+        from app.utils.agendador import TAREFAS
+
+        assert {'expirar-agendamentos', 'limpar-tokens-revogados'} <= set(TAREFAS)
+
+        print("✅ Agendador - Tarefas de manutenção registradas")
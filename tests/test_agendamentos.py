@@ -1,7 +1,10 @@
 import requests
 import pytest
 import random
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from datetime import datetime, time, timedelta
+from tests.conftest import AMANHA, adicionar_veiculo
 
 class TestAgendamentos:    
     @pytest.fixture
@@ -71,6 +74,55 @@ class TestAgendamentos:
         
         print(f"✅ Horários Disponíveis - {len(result['horarios_disponiveis'])} horários encontrados")
     
+    def test_disponibilidade_periodo(self, base_url, user_token, servico_id):
+        # Testa o calendário de disponibilidade em uma única chamada
+        headers = {"Authorization": f"Bearer {user_token}"}
+
+        inicio = datetime.now() + timedelta(days=1)
+        fim = inicio + timedelta(days=29)
+        params = {
+            "inicio": inicio.strftime('%Y-%m-%d'),
+            "fim": fim.strftime('%Y-%m-%d'),
+            "servico_id": servico_id
+        }
+
+        response = requests.get(
+            f"{base_url}/api/agendamentos/disponibilidade",
+            params=params,
+            headers=headers
+        )
+
+        assert response.status_code == 200
+        dias = response.json()['dias']
+        assert len(dias) == 30
+        assert dias[0]['data'] == params['inicio']
+
+        # Cada dia deve bater com a consulta individual
+        dia = next((d for d in dias if d['aberto']), dias[0])
+        response_dia = requests.get(
+            f"{base_url}/api/agendamentos/horarios-disponiveis",
+            params={"data": dia['data'], "servico_id": servico_id},
+            headers=headers
+        )
+        assert response_dia.json()['horarios_disponiveis'] == dia['horarios_disponiveis']
+        assert dia['total_livres'] == len(dia['horarios_disponiveis'])
+
+        print(f"✅ Disponibilidade Período - {sum(d['total_livres'] for d in dias)} horários em 30 dias")
+
+    def test_disponibilidade_periodo_invalido(self, base_url, user_token, servico_id):
+        # Testa validação do período
+        headers = {"Authorization": f"Bearer {user_token}"}
+
+        params = {"inicio": "2030-01-10", "fim": "2030-01-01", "servico_id": servico_id}
+        response = requests.get(f"{base_url}/api/agendamentos/disponibilidade", params=params, headers=headers)
+        assert response.status_code == 400
+
+        params = {"inicio": "2030-01-01", "fim": "2030-12-31", "servico_id": servico_id}
+        response = requests.get(f"{base_url}/api/agendamentos/disponibilidade", params=params, headers=headers)
+        assert response.status_code == 400
+
+        print("✅ Disponibilidade Período - Períodos inválidos rejeitados")
+
     def test_criar_agendamento(self, base_url, user_token, servico_id, modelo_veiculo_id):
         # Testa criação de agendamento
         headers = {"Authorization": f"Bearer {user_token}"}
@@ -111,6 +163,46 @@ class TestAgendamentos:
         
         print(f"✅ Criar Agendamento - Agendamento {result['agendamento']['id']} criado com sucesso")
     
+    def test_concorrencia_mesmo_horario(self, base_url, user_token, servico_id, modelo_veiculo_id):
+        # Dispara centenas de reservas simultâneas para o mesmo horário
+        headers = {"Authorization": f"Bearer {user_token}"}
+
+        # Data distante e aleatória para não colidir com outras execuções
+        inicio = datetime.now() + timedelta(days=random.randint(60, 700))
+        horarios_disponiveis = []
+        for dias_adicionais in range(7):
+            data_teste = (inicio + timedelta(days=dias_adicionais)).strftime('%Y-%m-%d')
+            params = {"data": data_teste, "servico_id": servico_id}
+            response_horarios = requests.get(f"{base_url}/api/agendamentos/horarios-disponiveis", params=params, headers=headers)
+            horarios_disponiveis = response_horarios.json().get("horarios_disponiveis", [])
+            if horarios_disponiveis:
+                break
+
+        if not horarios_disponiveis:
+            pytest.skip("Nenhum horário disponível para o serviço nesta data")
+
+        agendamento_data = {
+            "data_agendamento": data_teste,
+            "horario_agendamento": horarios_disponiveis[0],
+            "servico_id": servico_id,
+            "placa": f"CON{random.randint(1000, 9999)}",
+            "nome_proprietario": "Proprietário Concorrência",
+            "telefone": "(11) 97777-6666",
+            "modelo_veiculo_id": modelo_veiculo_id
+        }
+
+        def reservar(_):
+            response = requests.post(f"{base_url}/api/agendamentos", json=agendamento_data, headers=headers)
+            return response.status_code
+
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            status_codes = list(executor.map(reservar, range(200)))
+
+        assert status_codes.count(201) == 1
+        assert status_codes.count(409) == len(status_codes) - 1
+
+        print(f"✅ Concorrência - 1 reserva criada e {status_codes.count(409)} recusadas")
+
     def test_listar_agendamentos_usuario(self, base_url, user_token):
         # Testa listagem de agendamentos do usuário
         headers = {"Authorization": f"Bearer {user_token}"}
@@ -156,4 +248,50 @@ class TestAgendamentos:
             for campo in campos_obrigatorios:
                 assert campo in agendamento, f"Campo {campo} não encontrado no agendamento"
         
-        print("✅ Estrutura Agendamentos - Campos obrigatórios presentes")
\ No newline at end of file
+        print("✅ Estrutura Agendamentos - Campos obrigatórios presentes")
+
+@pytest.mark.banco_arquivo
+class TestTravaDoDia:
+    def test_reservas_simultaneas_no_mesmo_horario(self, app, lava_rapido):
+        # Em processo: threads com sessões próprias disputam o único box do dia
+        from app import db
+        from app.models import Agendamento
+        from app.services.catalogo import obter_servico
+        from app.services.disponibilidade import reservar_horario
+
+        with app.app_context():
+            veiculo = adicionar_veiculo(lava_rapido, 'TRV0001')
+            db.session.commit()
+            ids = {'user_id': lava_rapido['ids']['cliente_id'], 'veiculo_id': veiculo.id, 'servico_id': lava_rapido['ids']['servico_id']}
+
+        threads = 8
+        largada = Barrier(threads)
+
+        def reservar(_):
+            with app.app_context():
+                servico = obter_servico(ids['servico_id'])
+                largada.wait()
+                try:
+                    # Mesmo fluxo da rota: trava o dia, confere os boxes e insere antes do commit
+                    box = reservar_horario(AMANHA, time(8, 0), servico)
+                    if box is None:
+                        db.session.rollback()
+                        return 409
+                    db.session.add(Agendamento(
+                        data_agendamento=AMANHA, horario_agendamento=time(8, 0), valor_total=50,
+                        status='confirmado', box=box, **ids
+                    ))
+                    db.session.commit()
+                    return 201
+                finally:
+                    db.session.remove()
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            status_codes = list(executor.map(reservar, range(threads)))
+
+        assert status_codes.count(201) == 1
+        assert status_codes.count(409) == threads - 1
+        with app.app_context():
+            assert Agendamento.query.count() == 1
+
+        print(f"✅ Concorrência - Trava do dia em processo: 1 reserva e {threads - 1} recusadas")
@@ -0,0 +1,75 @@
+import pytest
+from datetime import time
+from tests.conftest import AMANHA, agendar, livres, adicionar_veiculo, novo_agendamento
+
+# Dois boxes das 08:00 às 11:00 todos os dias e serviço de 60 minutos
+pytestmark = pytest.mark.expediente(hora_fechamento=time(11, 0), quantidade_boxes=2)
+
+class TestVariosBoxes:
+    def test_agendamentos_simultaneos_ate_a_capacidade(self, client, lava_rapido):
+        primeiro = agendar(client, lava_rapido, 'BOX0001', '08:00')
+        segundo = agendar(client, lava_rapido, 'BOX0002', '08:00')
+        assert (primeiro.status_code, segundo.status_code) == (201, 201)
+        assert {primeiro.get_json()['agendamento']['box'], segundo.get_json()['agendamento']['box']} == {1, 2}
+
+        # Terceiro no mesmo horário não cabe
+        assert agendar(client, lava_rapido, 'BOX0003', '08:30').status_code == 409
+
+        assert livres(client, lava_rapido) == ['09:00', '09:30', '10:00']
+
+        print("✅ Boxes - Agendamentos simultâneos até a quantidade de boxes")
+
+    def test_redistribui_boxes_fragmentados(self, app, client, lava_rapido):
+        from app import db
+        from app.models import Agendamento
+
+        # Box 1 das 08:00 às 09:00 e box 2 das 09:00 às 10:00
+        with app.app_context():
+            veiculo = adicionar_veiculo(lava_rapido, 'BOX0009')
+            for horario, box in [(time(8, 0), 1), (time(9, 0), 2)]:
+                db.session.add(novo_agendamento(lava_rapido, veiculo.id, AMANHA, 'confirmado', horario, box=box))
+            db.session.commit()
+
+        # 08:30-09:30 cabe (no máximo dois simultâneos), mas nenhum box fica livre o tempo todo
+        response = agendar(client, lava_rapido, 'BOX0001', '08:30')
+        assert response.status_code == 201
+        assert response.get_json()['agendamento']['box'] == 2
+
+        with app.app_context():
+            boxes = {a.horario_agendamento: a.box for a in Agendamento.query.all()}
+        assert boxes == {time(8, 0): 1, time(8, 30): 2, time(9, 0): 1}
+
+        print("✅ Boxes - Boxes redistribuídos quando estão fragmentados")
+
+    def test_admin_configura_boxes(self, app, client, lava_rapido):
+        response = client.put('/api/admin/horarios-funcionamento', headers=lava_rapido['admin'], json=[
+            {'dia_semana': dia, 'aberto': True, 'hora_abertura': '08:00', 'hora_fechamento': '11:00', 'quantidade_boxes': 3}
+            for dia in range(7)
+        ])
+        assert response.status_code == 200
+        assert {h['quantidade_boxes'] for h in response.get_json()['horarios']} == {3}
+
+        for placa in ('BOX0001', 'BOX0002', 'BOX0003'):
+            assert agendar(client, lava_rapido, placa, '08:00').status_code == 201
+
+        response = client.put('/api/admin/horarios-funcionamento', headers=lava_rapido['admin'], json=[
+            {'dia_semana': 1, 'aberto': True, 'hora_abertura': '08:00', 'hora_fechamento': '11:00', 'quantidade_boxes': 0}
+        ])
+        assert response.status_code == 400
+
+        print("✅ Boxes - Quantidade de boxes configurada pelo admin")
+
+    def test_utilizacao_considera_boxes(self, app, client, lava_rapido):
+        from app.services import relatorios
+
+        relatorios._cache.limpar()
+        agendar(client, lava_rapido, 'BOX0001', '08:00')
+
+        url = f'/api/admin/dashboard/relatorio?inicio={AMANHA.isoformat()}&fim={AMANHA.isoformat()}'
+        totais = client.get(url, headers=lava_rapido['admin']).get_json()['totais']
+
+        # 3 horas x 2 boxes
+        assert totais['minutos_disponiveis'] == 360
+        assert totais['utilizacao_percentual'] == round(60 * 100 / 360, 2)
+
+        print("✅ Boxes - Utilização sobre a capacidade de todos os boxes")
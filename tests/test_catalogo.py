@@ -0,0 +1,67 @@
+import pytest
+from datetime import date, timedelta
+
+class TestCacheCatalogo:
+    @pytest.mark.parametrize('url', ['/api/servicos', '/api/modelos-veiculo'])
+    def test_leitura_em_cache_so_consulta_versao(self, client, lava_rapido, contador_queries, url):
+        primeira = client.get(url)
+        with contador_queries:
+            segunda = client.get(url)
+        assert segunda.get_json() == primeira.get_json()
+        assert contador_queries.total == 1
+
+        print(f"✅ Catálogo - {url} servido do cache")
+
+    def test_escrita_invalida_servicos(self, client, lava_rapido):
+        client.get('/api/servicos')
+        response = client.put(f'/api/servicos/{lava_rapido["ids"]["servico_id"]}', json={'preco': 75}, headers=lava_rapido['admin'])
+        assert response.status_code == 200
+
+        servicos = client.get('/api/servicos').get_json()['servicos']
+        assert servicos[0]['preco'] == 75.0
+
+        client.delete(f'/api/servicos/{lava_rapido["ids"]["servico_id"]}', headers=lava_rapido['admin'])
+        assert client.get('/api/servicos').get_json()['servicos'] == []
+
+        print("✅ Catálogo - Escrita em serviços invalida o cache")
+
+    def test_versao_de_outro_worker(self, app, client, lava_rapido):
+        # Outro worker altera o dado e incrementa a versão sem passar por este cache
+        from app import db
+        from app.models import Servico, VersaoCatalogo
+
+        client.get('/api/servicos')
+        with app.app_context():
+            db.session.get(Servico, lava_rapido['ids']['servico_id']).nome = 'Renomeado'
+            db.session.merge(VersaoCatalogo(nome='servicos', versao=99))
+            db.session.commit()
+
+        assert client.get('/api/servicos').get_json()['servicos'][0]['nome'] == 'Renomeado'
+
+        print("✅ Catálogo - Versão propagada entre workers")
+
+    def test_horarios_invalidam_disponibilidade(self, client, lava_rapido):
+        amanha = date.today() + timedelta(days=1)
+        url = f'/api/agendamentos/horarios-disponiveis?data={amanha.isoformat()}&servico_id={lava_rapido["ids"]["servico_id"]}'
+
+        assert client.get(url, headers=lava_rapido['admin']).get_json()['horarios_disponiveis']
+
+        dia = (amanha.weekday() + 1) % 7
+        response = client.put('/api/admin/horarios-funcionamento', json=[{'dia_semana': dia, 'aberto': False}], headers=lava_rapido['admin'])
+        assert response.status_code == 200
+
+        assert client.get(url, headers=lava_rapido['admin']).get_json()['horarios_disponiveis'] == []
+
+        print("✅ Catálogo - Horários atualizados refletem na disponibilidade")
+
+    def test_disponibilidade_sem_consultar_catalogos(self, client, lava_rapido, contador_queries):
+        amanha = date.today() + timedelta(days=1)
+        url = f'/api/agendamentos/horarios-disponiveis?data={amanha.isoformat()}&servico_id={lava_rapido["ids"]["servico_id"]}'
+        client.get(url, headers=lava_rapido['admin'])
+
+        # Sondagem de versões + agendamentos do dia
+        with contador_queries:
+            client.get(url, headers=lava_rapido['admin'])
+        assert contador_queries.total == 2
+
+        print("✅ Catálogo - Disponibilidade com catálogos em cache")
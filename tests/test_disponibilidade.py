@@ -0,0 +1,95 @@
+from datetime import date
+from app.services.disponibilidade import (
+    OcupacaoDoDia, dia_semana, intervalos_lotados, particionar_boxes, alocar_box,
+    mascara, montar_mapa, vaos_livres, horarios_nos_vaos
+)
+
+# Serviço de 60 minutos sem grade nem limpeza próprias
+SERVICO = {'duracao_minutos': 60}
+
+def ocupacao(abertura, fechamento, ocupados, boxes=1, intervalo=30, limpeza=0):
+    """Dia com os intervalos (inicio, fim) ocupados distribuídos nos boxes do mapa de bits"""
+    mapas = montar_mapa([(inicio, fim, None, chave) for chave, (inicio, fim) in enumerate(ocupados)])
+    return OcupacaoDoDia(date(2026, 3, 2), (abertura, fechamento, boxes, intervalo, limpeza), mapas)
+
+class TestMotorDisponibilidade:
+    def test_dia_sem_agendamentos(self):
+        # 08:00 às 10:00, serviço de 60 minutos
+        livres = ocupacao(480, 600, []).livres(SERVICO)
+        assert livres == [480, 510, 540]
+        print("✅ Dia Livre - Todos os horários que cabem no expediente")
+
+    def test_horarios_com_conflito(self):
+        # Agendamento das 09:00 às 10:30 bloqueia quem terminaria depois das 09:00
+        livres = ocupacao(480, 720, [(540, 630)]).livres(SERVICO)
+        assert livres == [480, 630, 660]
+        print("✅ Conflitos - Horários sobrepostos removidos")
+
+    def test_dia_semana_padrao_tabela(self):
+        # Tabela usa domingo=0, segunda=1 ... sábado=6
+        assert dia_semana(date(2025, 1, 5)) == 0  # Domingo
+        assert dia_semana(date(2025, 1, 6)) == 1  # Segunda
+        assert dia_semana(date(2025, 1, 11)) == 6  # Sábado
+        print("✅ Dia da Semana - Conversão para o padrão da tabela")
+
+    def test_lotados_com_varios_boxes(self):
+        # Dois boxes: só fica lotado onde há dois agendamentos ao mesmo tempo
+        ocupados = [(480, 600), (540, 660), (600, 720), (700, 760)]
+        assert intervalos_lotados(ocupados, 2) == [[540, 660], [700, 720]]
+        assert intervalos_lotados(ocupados, 3) == []
+        print("✅ Boxes - Trechos lotados pela contagem de simultâneos")
+
+    def test_horarios_livres_com_varios_boxes(self):
+        # 08:00-09:00 e 08:30-09:30 ocupam os dois boxes entre 08:30 e 09:00
+        ocupados = [(480, 540), (510, 570)]
+        assert ocupacao(480, 660, ocupados, boxes=2).livres(SERVICO) == [540, 570, 600]
+        assert ocupacao(480, 660, ocupados, boxes=3).livres(SERVICO) == [480, 510, 540, 570, 600]
+        print("✅ Boxes - Horários livres consideram a capacidade do dia")
+
+    def test_particionar_boxes(self):
+        ocupados = [(480, 540, None, 'a'), (510, 570, None, 'b'), (540, 600, None, 'c'), (600, 660, None, 'd')]
+        boxes = {chave: box for _, _, box, chave in particionar_boxes(ocupados)}
+        assert boxes == {'a': 1, 'b': 2, 'c': 1, 'd': 1}
+        print("✅ Boxes - Particionamento guloso usa o mínimo de boxes")
+
+    def test_alocar_box_redistribui_quando_fragmentado(self):
+        # Box 1 ocupado das 08:00 às 09:00 e box 2 das 09:00 às 10:00: 08:30-09:30
+        # cabe (no máximo 2 simultâneos), mas só trocando um deles de box
+        ocupados = [(480, 540, 1, 10), (540, 600, 2, 11)]
+        box = alocar_box(ocupados, 510, 570, 2, chave='novo')
+
+        boxes = {chave: box for _, _, box, chave in ocupados}
+        assert box == boxes['novo'] == 2
+        assert boxes[10] == boxes[11] == 1
+
+        assert alocar_box(ocupados, 500, 560, 2, chave='lotado') is None
+        print("✅ Boxes - Redistribuição quando nenhum box fica livre o tempo todo")
+
+    def test_vaos_livres_do_mapa(self):
+        # Ocupado das 08:00 às 09:00 e das 10:00 às 10:30
+        lotado = mascara(480, 540) | mascara(600, 630)
+        assert vaos_livres(lotado) == [(0, 480), (540, 600), (630, None)]
+        assert vaos_livres(0) == [(0, None)]
+        print("✅ Grade - Vãos livres extraídos do mapa de bits")
+
+    def test_horarios_nos_vaos(self):
+        vaos = [(0, 480), (540, 600), (630, None)]
+        # Grade de 15 minutos das 08:00 às 11:00, serviço de 30 minutos
+        assert horarios_nos_vaos(vaos, 480, 660, 30, 15) == [540, 555, 570, 630]
+        # 15 minutos de limpeza precisam caber no vão; depois do último vão não há limite
+        assert horarios_nos_vaos(vaos, 480, 660, 30, 15, limpeza=15) == [540, 555, 630]
+        # A grade segue a abertura mesmo quando o vão começa fora dela
+        assert horarios_nos_vaos([(487, None)], 480, 540, 30, 15) == [495, 510]
+        assert horarios_nos_vaos(vaos, 480, 660, 30, 15, a_partir_de=556) == [570, 630]
+        print("✅ Grade - Horários gerados direto dos vãos livres")
+
+    def test_limpeza_entre_agendamentos(self):
+        # Limpeza do dia depois do novo serviço; no último vão não há limite
+        assert ocupacao(480, 660, [(480, 540)], limpeza=15).livres(SERVICO) == [540, 570, 600]
+        # Vão das 09:00 às 10:00: sem a limpeza do dia o serviço cabe; a do próprio serviço vale sobre ela
+        dia = ocupacao(480, 720, [(480, 540), (600, 660)], limpeza=15)
+        assert dia.livres(SERVICO) == [660]
+        assert dia.livres({**SERVICO, 'limpeza_minutos': 0}) == [540, 660]
+        # Com limpeza, o serviço das 08:00 termina às 09:15
+        assert ocupacao(480, 660, [(480, 555)]).livres(SERVICO) == [570, 600]
+        print("✅ Grade - Limpeza entre agendamentos")
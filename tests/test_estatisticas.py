@@ -0,0 +1,153 @@
+import pytest
+from datetime import date, timedelta
+from tests.conftest import adicionar_veiculo, novo_agendamento
+
+@pytest.fixture
+def base(app, cadastro):
+    # Veículo do cliente do cadastro, para criar agendamentos pelo ORM
+    from app import db
+
+    with app.app_context():
+        veiculo_id = adicionar_veiculo(cadastro, 'EST1234').id
+        db.session.commit()
+    return {**cadastro, 'veiculo_id': veiculo_id}
+
+def criar(base, dia, status, valor=50):
+    return novo_agendamento(base, base['veiculo_id'], dia, status, valor_total=valor)
+
+def rollup():
+    from app.models import EstatisticaDiaria
+
+    return {
+        (e.data, e.status): (e.quantidade, float(e.receita))
+        for e in EstatisticaDiaria.query.all() if e.quantidade
+    }
+
+def confere_com_recalculo():
+    # O rollup incremental deve ser igual ao recalculado do zero
+    from app.services.estatisticas import recalcular_estatisticas
+
+    incremental = rollup()
+    recalcular_estatisticas()
+    assert incremental == rollup()
+    return incremental
+
+class TestEstatisticasDiarias:
+    def test_criacao_e_mudanca_de_status(self, app, base):
+        from app import db
+
+        hoje = date.today()
+        with app.app_context():
+            agendamentos = [criar(base, hoje, 'confirmado') for _ in range(3)] + [criar(base, hoje, 'pendente', 80)]
+            db.session.add_all(agendamentos)
+            db.session.commit()
+
+            agendamentos[0].status = 'concluido'
+            agendamentos[1].status = 'cancelado'
+            agendamentos[3].data_agendamento = hoje + timedelta(days=1)
+            db.session.commit()
+
+            assert confere_com_recalculo() == {
+                (hoje, 'confirmado'): (1, 50.0),
+                (hoje, 'concluido'): (1, 50.0),
+                (hoje, 'cancelado'): (1, 50.0),
+                (hoje + timedelta(days=1), 'pendente'): (1, 80.0)
+            }
+
+        print("✅ Estatísticas - Mantidas na criação e mudança de status")
+
+    def test_objeto_expirado_apos_commit(self, app, base):
+        # Status alterado sem ter sido lido de novo depois do commit
+        from app import db
+        from app.models import Agendamento
+
+        with app.app_context():
+            db.session.add(criar(base, date.today(), 'confirmado'))
+            db.session.commit()
+
+            db.session.expire_all()
+            agendamento = Agendamento.query.first()
+            db.session.expire(agendamento)
+            agendamento.status = 'concluido'
+            db.session.commit()
+
+            assert confere_com_recalculo() == {(date.today(), 'concluido'): (1, 50.0)}
+
+        print("✅ Estatísticas - Valor anterior carregado antes da alteração")
+
+    def test_exclusao(self, app, base):
+        from app import db
+
+        with app.app_context():
+            agendamento = criar(base, date.today(), 'confirmado')
+            db.session.add(agendamento)
+            db.session.commit()
+
+            db.session.delete(agendamento)
+            db.session.commit()
+
+            assert confere_com_recalculo() == {}
+
+        print("✅ Estatísticas - Exclusão descontada")
+
+    def test_expiracao_em_lote(self, app, base):
+        from app import db
+        from app.services.manutencao import expirar_agendamentos
+
+        ontem = date.today() - timedelta(days=1)
+        with app.app_context():
+            db.session.add_all([criar(base, ontem, 'confirmado') for _ in range(4)] + [criar(base, ontem, 'pendente')])
+            db.session.commit()
+
+            expirar_agendamentos(tamanho_lote=2)
+
+            assert confere_com_recalculo() == {(ontem, 'expirado'): (5, 250.0)}
+
+        print("✅ Estatísticas - Expiração em lote transfere os totais")
+
+    def test_comando_recalcular(self, app, base):
+        from app import db
+        from app.models import EstatisticaDiaria
+
+        with app.app_context():
+            db.session.add(criar(base, date.today(), 'confirmado'))
+            db.session.commit()
+            EstatisticaDiaria.query.delete()
+            db.session.commit()
+
+        resultado = app.test_cli_runner().invoke(args=['recalcular-estatisticas'])
+        assert resultado.exit_code == 0
+        assert '1 linhas' in resultado.output
+
+        with app.app_context():
+            assert rollup() == {(date.today(), 'confirmado'): (1, 50.0)}
+
+        print("✅ Estatísticas - Comando flask recalcular-estatisticas")
+
+    def test_dashboard_le_o_rollup(self, app, client, base, contador_queries):
+        from app import db
+
+        hoje = date.today()
+        with app.app_context():
+            db.session.add_all(
+                [criar(base, hoje, 'confirmado') for _ in range(5)] +
+                [criar(base, hoje, 'concluido', 70) for _ in range(2)] +
+                [criar(base, hoje + timedelta(days=1), 'confirmado')]
+            )
+            db.session.commit()
+
+        # Linhas do rollup + total de clientes
+        with contador_queries:
+            response = client.get('/api/admin/dashboard/estatisticas', headers=base['admin'])
+        assert response.status_code == 200
+        assert contador_queries.total == 2
+
+        dados = response.get_json()
+        assert dados['agendamentos_hoje'] == 7
+        assert dados['agendamentos_confirmados'] == 6
+        assert dados['concluidos_hoje'] == 2
+        assert dados['receita_hoje'] == 140.0
+        # cliente e outro, do cadastro
+        assert dados['total_clientes'] == 2
+
+        print("✅ Estatísticas - Dashboard lê o rollup")
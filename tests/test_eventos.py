@@ -0,0 +1,177 @@
+import pytest
+import json
+from datetime import datetime, time, timedelta
+from tests.conftest import AMANHA, criar_agendamento
+
+# Dois boxes das 08:00 às 12:00 todos os dias
+pytestmark = pytest.mark.expediente(quantidade_boxes=2)
+
+@pytest.fixture(autouse=True)
+def ping_curto(app):
+    # Heartbeat curto para os testes não esperarem 15 segundos
+    app.config['EVENTOS_PING'] = 0.05
+
+def proximo_evento(partes):
+    # Pula o retry e os pings até o próximo evento
+    for _ in range(50):
+        parte = next(partes)
+        parte = parte.decode() if isinstance(parte, bytes) else parte
+        if parte.startswith('id:'):
+            campos = dict(linha.split(': ', 1) for linha in parte.strip().split('\n'))
+            return campos['event'], json.loads(campos['data'])
+    pytest.fail('Nenhum evento recebido')
+
+class TestEventosAgendamentos:
+    def test_registro_de_alteracoes(self, app, client, lava_rapido):
+        from app import db
+        from app.models import Agendamento, AgendamentoEvento
+
+        primeiro = criar_agendamento(client, lava_rapido, 'EVT0001', '08:00')
+        segundo = criar_agendamento(client, lava_rapido, 'EVT0002', '09:00')
+        client.delete(f'/api/agendamentos/{primeiro}', headers=lava_rapido['cliente'])
+        client.put(f'/api/agendamentos/{segundo}/status', headers=lava_rapido['admin'], json={'status': 'pendente'})
+        client.put(f'/api/admin/dashboard/agendamentos/{segundo}/concluir', headers=lava_rapido['admin'])
+
+        with app.app_context():
+            db.session.get(Agendamento, primeiro).horario_agendamento = time(10, 0)
+            db.session.commit()
+            eventos = [(e.tipo, e.agendamento_id, e.status) for e in AgendamentoEvento.query.order_by(AgendamentoEvento.id)]
+
+        assert eventos == [
+            ('criado', primeiro, 'confirmado'),
+            ('criado', segundo, 'confirmado'),
+            ('cancelado', primeiro, 'cancelado'),
+            ('status_alterado', segundo, 'pendente'),
+            ('status_alterado', segundo, 'concluido'),
+            ('reagendado', primeiro, 'cancelado'),
+        ]
+
+        print("✅ Eventos - Alterações de agendamentos registradas")
+
+    def test_numerados_no_commit(self, app, client, lava_rapido):
+        from app import db
+        from app.models import Agendamento, AgendamentoEvento
+        from app.services.eventos import ultimo_evento_id
+
+        primeiro = criar_agendamento(client, lava_rapido, 'EVT0001', '08:00')
+        segundo = criar_agendamento(client, lava_rapido, 'EVT0002', '09:00')
+
+        with app.app_context():
+            inicio = ultimo_evento_id()
+            novos = AgendamentoEvento.query.filter(AgendamentoEvento.id > inicio).order_by(AgendamentoEvento.id)
+
+            # Depois do flush o evento ainda não tem id: a sequência só é usada no commit
+            db.session.get(Agendamento, primeiro).status = 'pendente'
+            db.session.flush()
+            assert novos.count() == 0 and ultimo_evento_id() == inicio
+
+            db.session.get(Agendamento, segundo).status = 'pendente'
+            db.session.commit()
+            assert [(e.id, e.agendamento_id) for e in novos] == [(inicio + 1, primeiro), (inicio + 2, segundo)]
+            assert ultimo_evento_id() == inicio + 2
+
+        print("✅ Eventos - Ids tirados da sequência no commit")
+
+    def test_stream_do_cliente(self, app, client, lava_rapido):
+        from app.utils.eventos import corretor
+
+        # Token na query string, como faz o EventSource do navegador
+        response = client.get(f'/api/agendamentos/eventos?jwt={lava_rapido["tokens"]["cliente"]}')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        partes = iter(response.response)
+
+        criar_agendamento(client, lava_rapido, 'EVT0009', '08:00', conta='outro')
+        agendamento_id = criar_agendamento(client, lava_rapido, 'EVT0001', '08:00')
+        assert corretor.verificar() == 2
+
+        # Só o agendamento do próprio cliente
+        tipo, dados = proximo_evento(partes)
+        assert tipo == 'criado'
+        assert dados['agendamento_id'] == agendamento_id
+        assert dados['data_agendamento'] == AMANHA.isoformat()
+        assert 'user_id' not in dados
+
+        client.delete(f'/api/agendamentos/{agendamento_id}', headers=lava_rapido['cliente'])
+        corretor.verificar()
+        assert proximo_evento(partes)[0] == 'cancelado'
+
+        response.close()
+        assert not corretor.assinaturas
+
+        print("✅ Eventos - Stream SSE do cliente")
+
+    def test_admin_e_retomada(self, app, client, lava_rapido):
+        from app.utils.eventos import corretor
+
+        primeiro = criar_agendamento(client, lava_rapido, 'EVT0001', '08:00')
+        segundo = criar_agendamento(client, lava_rapido, 'EVT0002', '08:00', conta='outro')
+
+        # Admin vê todos os clientes; Last-Event-ID reenvia o que foi perdido
+        response = client.get('/api/agendamentos/eventos', headers={**lava_rapido['admin'], 'Last-Event-ID': '0'})
+        partes = iter(response.response)
+        assert [proximo_evento(partes)[1]['agendamento_id'] for _ in range(2)] == [primeiro, segundo]
+
+        # O que já veio do histórico não é repetido pelo corretor
+        terceiro = criar_agendamento(client, lava_rapido, 'EVT0003', '09:00', conta='outro')
+        corretor.verificar()
+        assert proximo_evento(partes)[1]['agendamento_id'] == terceiro
+        response.close()
+
+        print("✅ Eventos - Admin recebe todos e retoma pelo Last-Event-ID")
+
+    def test_last_event_id_removido_pela_retencao(self, app, client, lava_rapido):
+        from app.services.eventos import limpar_eventos
+        from app.utils.eventos import corretor
+
+        criar_agendamento(client, lava_rapido, 'EVT0001', '08:00')
+        criar_agendamento(client, lava_rapido, 'EVT0002', '09:00')
+        with app.app_context():
+            limpar_eventos(agora=datetime.utcnow() + timedelta(days=2))
+
+        # O evento 2, seguinte ao Last-Event-ID, foi removido: o app é avisado para recarregar
+        response = client.get('/api/agendamentos/eventos', headers={**lava_rapido['cliente'], 'Last-Event-ID': '1'})
+        partes = iter(response.response)
+        assert proximo_evento(partes) == ('recarregar', {'id': 2, 'tipo': 'recarregar'})
+
+        # E continua recebendo os eventos novos a partir da sequência atual
+        terceiro = criar_agendamento(client, lava_rapido, 'EVT0003', '10:00')
+        corretor.verificar()
+        assert proximo_evento(partes)[1]['agendamento_id'] == terceiro
+        response.close()
+
+        print("✅ Eventos - Last-Event-ID removido pela retenção pede recarga")
+
+    def test_erro_no_historico_cancela_assinatura(self, client, lava_rapido, monkeypatch):
+        from app.routes import agendamentos
+        from app.utils.eventos import corretor
+
+        def falhar(*args, **kwargs):
+            raise RuntimeError('banco indisponível')
+
+        monkeypatch.setattr(agendamentos, 'eventos_desde', falhar)
+        response = client.get('/api/agendamentos/eventos', headers=lava_rapido['cliente'])
+        assert response.status_code == 500
+        assert not corretor.assinaturas
+
+        print("✅ Eventos - Assinatura cancelada quando o histórico falha")
+
+    def test_requisicoes_invalidas(self, client, lava_rapido):
+        assert client.get('/api/agendamentos/eventos').status_code == 401
+        response = client.get('/api/agendamentos/eventos', headers={**lava_rapido['cliente'], 'Last-Event-ID': 'abc'})
+        assert response.status_code == 400
+
+        print("✅ Eventos - Requisições inválidas rejeitadas")
+
+    def test_limpeza_do_registro(self, app, client, lava_rapido):
+        from app.models import AgendamentoEvento
+        from app.services.eventos import limpar_eventos
+
+        criar_agendamento(client, lava_rapido, 'EVT0001', '08:00')
+
+        with app.app_context():
+            assert limpar_eventos()['removidos'] == 0
+            assert limpar_eventos(agora=datetime.utcnow() + timedelta(days=2))['removidos'] == 1
+            assert AgendamentoEvento.query.count() == 0
+
+        print("✅ Eventos - Registro antigo removido pela tarefa periódica")
@@ -0,0 +1,80 @@
+import pytest
+import csv
+import io
+import json
+from datetime import date, time, timedelta
+from tests.conftest import adicionar_veiculo, novo_agendamento
+
+INICIO = date(2026, 3, 2)
+
+pytestmark = pytest.mark.cadastro(servico={'nome': 'Lavagem Completa', 'preco': 80, 'duracao_minutos': 90})
+
+@pytest.fixture
+def dados(app, cadastro):
+    from app import db
+
+    with app.app_context():
+        veiculo = adicionar_veiculo(cadastro, 'EXP0001', nome_proprietario='Dono', telefone='11988887777')
+
+        # Cinco dias seguidos, alternando concluído/cancelado
+        for i in range(5):
+            db.session.add(novo_agendamento(
+                cadastro, veiculo.id, INICIO + timedelta(days=i), 'concluido' if i % 2 == 0 else 'cancelado',
+                time(9, 30), valor_total=80
+            ))
+        db.session.commit()
+
+    return cadastro['admin']
+
+class TestExportacao:
+    def test_csv(self, client, dados):
+        response = client.get('/api/admin/dashboard/exportacao', headers=dados)
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+
+        linhas = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert len(linhas) == 5
+        assert linhas[0]['data_agendamento'] == '2026-03-02'
+        assert linhas[0]['horario_agendamento'] == '09:30:00'
+        assert linhas[0]['valor_total'] == '80.00'
+        assert linhas[0]['servico_nome'] == 'Lavagem Completa'
+        assert linhas[0]['modelo_veiculo_nome'] == 'Sedan'
+        assert linhas[0]['cliente_nome'] == 'Cliente'
+        assert linhas[0]['cliente_email'] == 'cliente@teste.com'
+
+        print("✅ Exportação - CSV com cliente, veículo e serviço")
+
+    def test_ndjson_com_filtros(self, client, dados):
+        response = client.get(
+            '/api/admin/dashboard/exportacao?formato=ndjson&inicio=2026-03-03&fim=2026-03-05&status=concluido',
+            headers=dados
+        )
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+
+        registros = [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()]
+        assert [r['data_agendamento'] for r in registros] == ['2026-03-04']
+        assert registros[0]['status'] == 'concluido'
+
+        print("✅ Exportação - NDJSON filtrado por período e status")
+
+    def test_enviado_em_pedacos(self, client, dados, monkeypatch):
+        from app.services import exportacao
+
+        monkeypatch.setattr(exportacao, 'LINHAS_POR_LOTE', 2)
+        response = client.get('/api/admin/dashboard/exportacao?formato=ndjson', headers=dados, buffered=False)
+        pedacos = [pedaco for pedaco in response.response if pedaco]
+        response.close()
+
+        # 5 linhas em lotes de 2
+        assert len(pedacos) == 3
+
+        print("✅ Exportação - Linhas enviadas em pedaços")
+
+    @pytest.mark.parametrize('parametros', ['?formato=xml', '?status=pago', '?inicio=02/03/2026'])
+    def test_parametros_invalidos(self, client, dados, parametros):
+        response = client.get(f'/api/admin/dashboard/exportacao{parametros}', headers=dados)
+        assert response.status_code == 400
+
+        print(f"✅ Exportação - Parâmetros inválidos rejeitados ({parametros})")
@@ -0,0 +1,83 @@
+import pytest
+from datetime import time
+from tests.conftest import agendar, livres
+
+# Um box das 08:00 às 10:00, grade de 30 minutos e 10 de limpeza todos os dias
+pytestmark = [
+    pytest.mark.cadastro(servico={'duracao_minutos': 30}),
+    pytest.mark.expediente(hora_fechamento=time(10, 0), limpeza_minutos=10)
+]
+
+@pytest.fixture
+def servicos(app, lava_rapido):
+    # Além da lavagem, um serviço rápido com grade própria de 15 minutos e sem limpeza
+    from app import db
+    from app.models import Servico
+
+    with app.app_context():
+        rapido = Servico(nome='Aspiração', preco=20, duracao_minutos=15, intervalo_minutos=15, limpeza_minutos=0)
+        db.session.add(rapido)
+        db.session.commit()
+        return {'lavagem': lava_rapido['ids']['servico_id'], 'rapido': rapido.id}
+
+class TestGradeHorarios:
+    def test_grade_por_servico(self, client, lava_rapido, servicos):
+        assert livres(client, lava_rapido, servicos['lavagem']) == ['08:00', '08:30', '09:00', '09:30']
+        assert livres(client, lava_rapido, servicos['rapido']) == ['08:00', '08:15', '08:30', '08:45', '09:00', '09:15', '09:30', '09:45']
+
+        print("✅ Grade - Granularidade do dia e do serviço")
+
+    def test_limpeza_do_dia(self, client, lava_rapido, servicos):
+        assert agendar(client, lava_rapido, 'GRD0001', '08:00', servico_id=servicos['lavagem']).status_code == 201
+
+        # 08:00-08:30 mais 10 minutos de limpeza: o box só volta às 08:40
+        assert livres(client, lava_rapido, servicos['lavagem']) == ['09:00', '09:30']
+        assert livres(client, lava_rapido, servicos['rapido']) == ['08:45', '09:00', '09:15', '09:30', '09:45']
+        assert agendar(client, lava_rapido, 'GRD0002', '08:30', servico_id=servicos['rapido']).status_code == 409
+
+        # O serviço rápido não tem limpeza: encosta no próximo agendamento
+        assert agendar(client, lava_rapido, 'GRD0003', '09:30', servico_id=servicos['lavagem']).status_code == 201
+        assert agendar(client, lava_rapido, 'GRD0004', '09:15', servico_id=servicos['rapido']).status_code == 201
+
+        # A limpeza pode passar do fechamento; o serviço não
+        assert livres(client, lava_rapido, servicos['lavagem']) == []
+
+        print("✅ Grade - Limpeza entre agendamentos")
+
+    def test_alterar_limpeza_refaz_mapas(self, app, client, lava_rapido, servicos):
+        assert agendar(client, lava_rapido, 'GRD0001', '08:00', servico_id=servicos['lavagem']).status_code == 201
+
+        response = client.put(f'/api/servicos/{servicos["lavagem"]}', headers=lava_rapido['admin'], json={'limpeza_minutos': 30})
+        assert response.status_code == 200
+        assert response.get_json()['servico']['limpeza_minutos'] == 30
+        assert livres(client, lava_rapido, servicos['rapido']) == ['09:00', '09:15', '09:30', '09:45']
+
+        # null volta para a limpeza do dia, que também pode mudar
+        client.put(f'/api/servicos/{servicos["lavagem"]}', headers=lava_rapido['admin'], json={'limpeza_minutos': None})
+        response = client.put('/api/admin/horarios-funcionamento', headers=lava_rapido['admin'], json=[
+            {'dia_semana': dia, 'aberto': True, 'hora_abertura': '08:00', 'hora_fechamento': '10:00', 'limpeza_minutos': 0, 'intervalo_minutos': 15}
+            for dia in range(7)
+        ])
+        assert response.status_code == 200
+        assert {(h['intervalo_minutos'], h['limpeza_minutos']) for h in response.get_json()['horarios']} == {(15, 0)}
+        assert livres(client, lava_rapido, servicos['lavagem']) == ['08:30', '08:45', '09:00', '09:15', '09:30']
+
+        print("✅ Grade - Alterar limpeza refaz os mapas de ocupação")
+
+    @pytest.mark.parametrize('regras', [
+        {'intervalo_minutos': 7},
+        {'intervalo_minutos': 0},
+        {'intervalo_minutos': '15'},
+        {'limpeza_minutos': -5},
+        {'limpeza_minutos': 600},
+    ])
+    def test_regras_invalidas(self, client, lava_rapido, servicos, regras):
+        response = client.put(f'/api/servicos/{servicos["lavagem"]}', headers=lava_rapido['admin'], json=regras)
+        assert response.status_code == 400
+
+        response = client.put('/api/admin/horarios-funcionamento', headers=lava_rapido['admin'], json=[
+            {'dia_semana': 1, 'aberto': True, 'hora_abertura': '08:00', 'hora_fechamento': '10:00', **regras}
+        ])
+        assert response.status_code == 400
+
+        print(f"✅ Grade - Regras inválidas rejeitadas ({regras})")
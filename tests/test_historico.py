@@ -0,0 +1,98 @@
+import pytest
+from datetime import date, time, timedelta
+from tests.conftest import adicionar_veiculo, novo_agendamento
+
+HOJE = date.today()
+
+@pytest.fixture
+def cliente(app, cadastro):
+    # Histórico do cliente: passados, futuros e um agendamento de outro cliente
+    from app import db
+
+    with app.app_context():
+        veiculo = adicionar_veiculo(cadastro, 'HIS0001')
+        for dias, status, dono in [
+            (-20, 'concluido', 'cliente'),
+            (-10, 'cancelado', 'cliente'),
+            (-5, 'expirado', 'cliente'),
+            (0, 'confirmado', 'cliente'),
+            (3, 'confirmado', 'cliente'),
+            (7, 'cancelado', 'cliente'),
+            (3, 'confirmado', 'outro'),
+        ]:
+            db.session.add(novo_agendamento(
+                cadastro, veiculo.id, HOJE + timedelta(days=dias), status, time(9, 0), user_id=cadastro['ids'][f'{dono}_id']
+            ))
+        db.session.commit()
+
+    return cadastro['cliente']
+
+def listar(client, headers, **params):
+    response = client.get('/api/agendamentos', query_string=params, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+def dias(resultado):
+    return [(date.fromisoformat(a['data_agendamento']) - HOJE).days for a in resultado['agendamentos']]
+
+class TestHistoricoCliente:
+    def test_sem_filtros(self, client, cliente):
+        resultado = listar(client, cliente)
+        assert dias(resultado) == [7, 3, 0, -5, -10, -20]
+
+        assert resultado['resumo'] == {
+            'total': 6,
+            'proximos': 3,
+            'passados': 3,
+            'por_status': {'pendente': 0, 'confirmado': 2, 'concluido': 1, 'cancelado': 2, 'expirado': 1}
+        }
+
+        print("✅ Histórico - Lista completa com resumo por status")
+
+    def test_proximos_em_ordem_crescente(self, client, cliente):
+        resultado = listar(client, cliente, periodo='proximos', status='pendente,confirmado')
+        assert dias(resultado) == [0, 3]
+
+        # O resumo ignora o filtro de status (contadores das abas)
+        assert resultado['resumo']['total'] == 3
+        assert resultado['resumo']['por_status']['cancelado'] == 1
+
+        print("✅ Histórico - Próximos agendamentos ativos")
+
+    def test_passados_e_janela_de_datas(self, client, cliente):
+        assert dias(listar(client, cliente, periodo='passados')) == [-5, -10, -20]
+
+        inicio = (HOJE - timedelta(days=10)).isoformat()
+        fim = (HOJE + timedelta(days=3)).isoformat()
+        resultado = listar(client, cliente, inicio=inicio, fim=fim, status='cancelado')
+        assert dias(resultado) == [-10]
+        assert resultado['resumo']['total'] == 4
+
+        print("✅ Histórico - Passados e janela de datas")
+
+    def test_resumo_so_na_primeira_pagina(self, client, cliente, contador_queries):
+        with contador_queries:
+            primeira = listar(client, cliente, limit=4)
+        queries_primeira = contador_queries.total
+
+        with contador_queries:
+            segunda = listar(client, cliente, limit=4, cursor=primeira['next_cursor'])
+
+        assert 'resumo' in primeira and 'resumo' not in segunda
+        assert len(segunda['agendamentos']) == 2
+        # Página + um GROUP BY para o resumo
+        assert queries_primeira == contador_queries.total + 1
+
+        print("✅ Histórico - Resumo calculado com uma única consulta")
+
+    @pytest.mark.parametrize('parametros', [
+        {'status': 'pago'},
+        {'periodo': 'futuros'},
+        {'inicio': '02/03/2026'},
+        {'inicio': '2026-03-03', 'fim': '2026-03-02'},
+    ])
+    def test_parametros_invalidos(self, client, cliente, parametros):
+        response = client.get('/api/agendamentos', query_string=parametros, headers=cliente)
+        assert response.status_code == 400
+
+        print(f"✅ Histórico - Parâmetros inválidos rejeitados ({parametros})")
@@ -0,0 +1,113 @@
+import pytest
+from tests.conftest import adicionar_veiculo
+
+@pytest.fixture
+def dados(app, lava_rapido):
+    # Um veículo do cliente para a listagem de /api/veiculos
+    from app import db
+
+    with app.app_context():
+        adicionar_veiculo(lava_rapido, 'ABC1D23', nome_proprietario='Cliente HTTP')
+        db.session.commit()
+    return lava_rapido
+
+class TestGetCondicional:
+    @pytest.mark.parametrize('url, tipo, cache_control', [
+        ('/api/servicos', None, 'public, max-age=60'),
+        ('/api/modelos-veiculo', None, 'public, max-age=3600'),
+        ('/api/admin/horarios-funcionamento', 'admin', 'private, no-cache'),
+        ('/api/veiculos', 'cliente', 'private, no-cache'),
+    ])
+    def test_etag_repetida_retorna_304(self, client, dados, url, tipo, cache_control):
+        headers = dict(dados[tipo]) if tipo else {}
+
+        primeira = client.get(url, headers=headers)
+        assert primeira.status_code == 200
+        assert primeira.headers['ETag']
+        assert primeira.headers['Cache-Control'] == cache_control
+
+        headers['If-None-Match'] = primeira.headers['ETag']
+        segunda = client.get(url, headers=headers)
+        assert segunda.status_code == 304
+        assert segunda.data == b''
+        assert segunda.headers['ETag'] == primeira.headers['ETag']
+
+        print(f"✅ GET Condicional - {url} responde 304")
+
+    def test_etag_muda_com_escrita_no_catalogo(self, client, dados):
+        etag = client.get('/api/servicos').headers['ETag']
+        client.post('/api/servicos', json={'nome': 'Nova', 'descricao': 'Nova', 'preco': 10, 'duracao_minutos': 30}, headers=dados['admin'])
+
+        response = client.get('/api/servicos', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert len(response.get_json()['servicos']) == 2
+
+        print("✅ GET Condicional - ETag de serviços muda após escrita")
+
+    def test_etag_veiculos_muda_com_novo_veiculo(self, client, dados):
+        headers = dict(dados['cliente'])
+        etag = client.get('/api/veiculos', headers=headers).headers['ETag']
+
+        response = client.post('/api/veiculos', json={
+            'placa': 'XYZ9A87', 'nome_proprietario': 'Cliente HTTP', 'telefone': '11999999999', 'modelo_veiculo_id': dados['ids']['modelo_veiculo_id']
+        }, headers=headers)
+        assert response.status_code == 201
+
+        headers['If-None-Match'] = etag
+        response = client.get('/api/veiculos', headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()['veiculos']) == 2
+
+        print("✅ GET Condicional - ETag de veículos muda após cadastro")
+
+    def test_remocao_de_veiculo_invalida_a_lista(self, client, dados):
+        headers = dict(dados['cliente'])
+        response = client.post('/api/veiculos', json={
+            'placa': 'XYZ9A88', 'nome_proprietario': 'Cliente HTTP', 'telefone': '11999999999', 'modelo_veiculo_id': dados['ids']['modelo_veiculo_id']
+        }, headers=headers)
+        veiculo_id = response.get_json()['veiculo']['id']
+
+        primeira = client.get('/api/veiculos', headers=headers)
+        assert 'Last-Modified' not in primeira.headers
+        assert client.delete(f'/api/veiculos/{veiculo_id}', headers=headers).status_code == 200
+
+        # A data da última alteração não muda com a remoção: só o ETag é validador
+        response = client.get('/api/veiculos', headers={**headers, 'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+        assert response.status_code == 200
+        response = client.get('/api/veiculos', headers={**headers, 'If-None-Match': primeira.headers['ETag']})
+        assert response.status_code == 200
+        assert len(response.get_json()['veiculos']) == 1
+
+        print("✅ GET Condicional - Remoção de veículo invalida a lista")
+
+    def test_304_sem_carregar_veiculos(self, client, dados, contador_queries):
+        headers = dict(dados['cliente'])
+        headers['If-None-Match'] = client.get('/api/veiculos', headers=headers).headers['ETag']
+
+        # Só o resumo dos veículos e a versão dos catálogos
+        with contador_queries:
+            response = client.get('/api/veiculos', headers=headers)
+        assert response.status_code == 304
+        assert contador_queries.total == 2
+
+        print("✅ GET Condicional - 304 sem carregar as linhas")
+
+    def test_if_modified_since(self, app, client, dados):
+        from app import db
+        from app.models import VersaoCatalogo
+        from datetime import datetime
+
+        with app.app_context():
+            db.session.add(VersaoCatalogo(nome='modelos', versao=1, atualizado_em=datetime(2026, 1, 10, 12, 0, 0)))
+            db.session.commit()
+
+        primeira = client.get('/api/modelos-veiculo')
+        assert primeira.headers['Last-Modified'] == 'Sat, 10 Jan 2026 12:00:00 GMT'
+
+        response = client.get('/api/modelos-veiculo', headers={'If-Modified-Since': primeira.headers['Last-Modified']})
+        assert response.status_code == 304
+
+        response = client.get('/api/modelos-veiculo', headers={'If-Modified-Since': 'Fri, 09 Jan 2026 12:00:00 GMT'})
+        assert response.status_code == 200
+
+        print("✅ GET Condicional - If-Modified-Since pela data da versão")
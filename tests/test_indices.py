@@ -0,0 +1,78 @@
+from datetime import date
+
+def plano_execucao(query):
+    # Retorna o plano da query em texto (EXPLAIN QUERY PLAN no SQLite, EXPLAIN no MySQL)
+    from app import db
+
+    conexao = db.session.connection()
+    compilado = query.statement.compile(dialect=conexao.dialect, compile_kwargs={'render_postcompile': True})
+    parametros = tuple(compilado.params[nome] for nome in compilado.positiontup)
+
+    if conexao.dialect.name == 'sqlite':
+        linhas = conexao.exec_driver_sql(f'EXPLAIN QUERY PLAN {compilado}', parametros).fetchall()
+        return ' '.join(linha[-1] for linha in linhas)
+
+    # No MySQL o índice precisa aparecer como candidato (possible_keys) ou escolhido (key)
+    linhas = conexao.exec_driver_sql(f'EXPLAIN {compilado}', parametros).mappings().all()
+    return ' '.join(f"{linha['possible_keys']} {linha['key']}" for linha in linhas)
+
+class TestIndices:
+    def test_disponibilidade_usa_data_status(self, app):
+        from app import db
+        from app.models import Agendamento, Servico
+
+        with app.app_context():
+            query = db.session.query(
+                Agendamento.horario_agendamento, Servico.duracao_minutos
+            ).join(Servico, Servico.id == Agendamento.servico_id).filter(
+                Agendamento.data_agendamento == date.today(),
+                Agendamento.status.in_(['pendente', 'confirmado'])
+            )
+            assert 'ix_agendamentos_data_status' in plano_execucao(query)
+
+        print("✅ Índices - Disponibilidade usa (data_agendamento, status)")
+
+    def test_dashboard_usa_data_status(self, app):
+        from app.models import Agendamento
+
+        with app.app_context():
+            query = Agendamento.query.filter(
+                Agendamento.data_agendamento == date.today(),
+                Agendamento.status == 'concluido'
+            )
+            assert 'ix_agendamentos_data_status' in plano_execucao(query)
+
+        print("✅ Índices - Dashboard usa (data_agendamento, status)")
+
+    def test_historico_usuario(self, app):
+        from app.models import Agendamento
+
+        with app.app_context():
+            query = Agendamento.query.filter(Agendamento.user_id == 1).order_by(
+                Agendamento.data_agendamento.desc(),
+                Agendamento.horario_agendamento.desc()
+            )
+            assert 'ix_agendamentos_usuario_data_horario' in plano_execucao(query)
+
+        print("✅ Índices - Histórico usa (user_id, data_agendamento, horario_agendamento)")
+
+    def test_agendamentos_futuros_veiculo(self, app):
+        from app.models import Agendamento
+
+        with app.app_context():
+            query = Agendamento.query.filter(
+                Agendamento.veiculo_id == 1,
+                Agendamento.data_agendamento >= date.today()
+            )
+            assert 'ix_agendamentos_veiculo_data' in plano_execucao(query)
+
+        print("✅ Índices - Veículo usa (veiculo_id, data_agendamento)")
+
+    def test_veiculos_do_usuario(self, app):
+        from app.models import Veiculo
+
+        with app.app_context():
+            query = Veiculo.query.filter(Veiculo.usuario_id == 1)
+            assert 'ix_veiculos_usuario_id' in plano_execucao(query)
+
+        print("✅ Índices - Veículos usa usuario_id")
@@ -0,0 +1,101 @@
+import pytest
+from datetime import date, time
+
+@pytest.fixture
+def tokens(cadastro):
+    # Tokens do cliente e do administrador do cadastro
+    return cadastro['tokens']
+
+def criar_agendamentos(app, inicio, quantidade):
+    # Cada agendamento com serviço, modelo, veículo e cliente próprios
+    from app import db
+    from app.models import User, Servico, ModeloVeiculo, Veiculo, Agendamento
+
+    with app.app_context():
+        cliente = User.query.filter_by(email='cliente@teste.com').first()
+        for i in range(inicio, inicio + quantidade):
+            servico = Servico(nome=f'Serviço {i}', preco=50, duracao_minutos=30)
+            modelo = ModeloVeiculo(nome=f'Modelo {i}')
+            dono = User(nome=f'Dono {i}', email=f'dono{i}@teste.com', senha_hash='x')
+            db.session.add_all([servico, modelo, dono])
+            db.session.flush()
+
+            veiculo = Veiculo(
+                usuario_id=dono.id, nome_proprietario=f'Dono {i}', placa=f'ABC{i:04d}',
+                modelo_veiculo_id=modelo.id, telefone='(11) 98888-7777'
+            )
+            db.session.add(veiculo)
+            db.session.flush()
+
+            db.session.add(Agendamento(
+                veiculo_id=veiculo.id, servico_id=servico.id, user_id=cliente.id,
+                data_agendamento=date.today(), horario_agendamento=time(8 + i % 10, 0),
+                valor_total=50, status='confirmado'
+            ))
+        db.session.commit()
+
+class TestListagemSemNMaisUm:
+    def contar(self, client, contador_queries, url, token):
+        with contador_queries:
+            response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200
+        return contador_queries.total, len(response.get_json()['agendamentos'])
+
+    @pytest.mark.parametrize('url, tipo', [
+        ('/api/agendamentos', 'cliente'),
+        ('/api/admin/dashboard/agendamentos', 'admin'),
+        ('/api/admin/dashboard/agendamentos-hoje', 'admin'),
+        ('/api/admin/agendamentos/buscar?placa=ABC', 'admin'),
+    ])
+    def test_queries_nao_crescem_com_resultados(self, app, client, contador_queries, tokens, url, tipo):
+        # O número de queries deve ser o mesmo com 2 ou 20 agendamentos
+        criar_agendamentos(app, 0, 2)
+        queries_poucos, total_poucos = self.contar(client, contador_queries, url, tokens[tipo])
+
+        criar_agendamentos(app, 2, 18)
+        queries_muitos, total_muitos = self.contar(client, contador_queries, url, tokens[tipo])
+
+        assert (total_poucos, total_muitos) == (2, 20)
+        assert queries_muitos == queries_poucos
+        assert queries_muitos <= 5
+
+        print(f"✅ Listagem {url} - {queries_muitos} queries para {total_muitos} agendamentos")
+
+class TestPaginacao:
+    def test_percorrer_paginas(self, app, client, tokens):
+        # Percorre todas as páginas e confere ordem e ausência de repetições
+        criar_agendamentos(app, 0, 20)
+        headers = {'Authorization': f'Bearer {tokens["admin"]}'}
+
+        vistos = []
+        cursor = None
+        while True:
+            params = {'limit': 7}
+            if cursor:
+                params['cursor'] = cursor
+            response = client.get('/api/admin/dashboard/agendamentos', query_string=params, headers=headers)
+            assert response.status_code == 200
+            result = response.get_json()
+            assert len(result['agendamentos']) <= 7
+            vistos.extend(result['agendamentos'])
+            cursor = result['next_cursor']
+            if not cursor:
+                break
+
+        chaves = [(a['data_agendamento'], a['horario_agendamento'], a['id']) for a in vistos]
+        assert len(set(chaves)) == 20
+        assert chaves == sorted(chaves, reverse=True)
+
+        print("✅ Paginação - 20 agendamentos em 3 páginas sem repetição")
+
+    def test_parametros_invalidos(self, client, tokens):
+        # Cursor e limite inválidos
+        headers = {'Authorization': f'Bearer {tokens["cliente"]}'}
+
+        response = client.get('/api/agendamentos?cursor=invalido', headers=headers)
+        assert response.status_code == 400
+
+        response = client.get('/api/agendamentos?limit=0', headers=headers)
+        assert response.status_code == 400
+
+        print("✅ Paginação - Parâmetros inválidos rejeitados")
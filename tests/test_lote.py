@@ -0,0 +1,120 @@
+import pytest
+from datetime import time, timedelta
+from tests.conftest import AMANHA, adicionar_veiculo
+
+# Expediente das 08:00 às 11:00 todos os dias e serviço de 60 minutos
+pytestmark = pytest.mark.expediente(hora_fechamento=time(11, 0))
+
+@pytest.fixture
+def frota(app, lava_rapido):
+    # Cliente de frota com um veículo já cadastrado, que deve ser reaproveitado
+    from app import db
+
+    with app.app_context():
+        adicionar_veiculo(lava_rapido, 'FRT0000', nome_proprietario='Locadora')
+        db.session.commit()
+
+    ids = {chave: lava_rapido['ids'][chave] for chave in ('servico_id', 'modelo_veiculo_id')}
+    return lava_rapido['cliente'], ids
+
+def item(ids, placa, **extra):
+    return {'placa': placa, 'nome_proprietario': 'Locadora', 'telefone': '11999999999', **ids, **extra}
+
+class TestAgendamentoEmLote:
+    def test_encaixa_veiculos_nos_horarios_livres(self, app, client, frota):
+        from app.models import Agendamento, Veiculo
+
+        headers, ids = frota
+        response = client.post('/api/agendamentos/lote', headers=headers, json={
+            'data_agendamento': AMANHA.isoformat(),
+            'itens': [
+                item(ids, 'FRT0000'),
+                item(ids, 'FRT-0001', horario_agendamento='08:00'),
+                item(ids, 'FRT0002'),
+            ]
+        })
+        assert response.status_code == 201
+        resultado = response.get_json()
+        assert resultado['criados'] == 3
+
+        # O horário pedido é respeitado e os demais ocupam os próximos livres
+        horarios = [r['agendamento']['horario_agendamento'] for r in resultado['resultados']]
+        assert horarios == ['09:00', '08:00', '10:00']
+        assert [r['indice'] for r in resultado['resultados']] == [0, 1, 2]
+
+        with app.app_context():
+            assert Agendamento.query.count() == 3
+            assert Veiculo.query.count() == 3
+
+        print("✅ Lote - Veículos encaixados nos horários livres")
+
+    def test_resultado_por_item(self, app, client, frota):
+        from app.models import Agendamento
+
+        headers, ids = frota
+        response = client.post('/api/agendamentos/lote', headers=headers, json={
+            'data_agendamento': AMANHA.isoformat(),
+            'itens': [item(ids, f'FRT000{i}') for i in range(4)] + [
+                item(ids, 'INVALIDA'),
+                item(ids, 'FRT0009', servico_id=9999),
+            ]
+        })
+        assert response.status_code == 207
+        resultado = response.get_json()
+        assert (resultado['criados'], resultado['falhas']) == (3, 3)
+
+        erros = {r['indice']: r['erro'] for r in resultado['resultados'] if not r['sucesso']}
+        assert erros[3] == 'Horário indisponível'
+        assert erros[4] == 'Placa deve ter 7 caracteres'
+        assert erros[5] == 'Serviço não encontrado'
+
+        with app.app_context():
+            assert Agendamento.query.count() == 3
+
+        print("✅ Lote - Falhas informadas item a item")
+
+    def test_varios_dias_e_ocupacao_existente(self, app, client, frota):
+        from app import db
+        from app.models import Agendamento, Veiculo
+
+        headers, ids = frota
+        depois = AMANHA + timedelta(days=1)
+        with app.app_context():
+            veiculo = Veiculo.query.filter_by(placa='FRT0000').one()
+            db.session.add(Agendamento(
+                veiculo_id=veiculo.id, servico_id=ids['servico_id'], user_id=veiculo.usuario_id,
+                data_agendamento=AMANHA, horario_agendamento=time(8, 0), valor_total=50, status='confirmado'
+            ))
+            db.session.commit()
+
+        response = client.post('/api/agendamentos/lote', headers=headers, json={'itens': [
+            item(ids, 'FRT0001', data_agendamento=AMANHA.isoformat()),
+            item(ids, 'FRT0002', data_agendamento=depois.isoformat()),
+            item(ids, 'FRT0003', data_agendamento=AMANHA.isoformat(), horario_agendamento='08:30'),
+        ]})
+        resultados = response.get_json()['resultados']
+
+        assert resultados[0]['agendamento']['horario_agendamento'] == '09:00'
+        assert resultados[1]['agendamento']['data_agendamento'] == depois.isoformat()
+        assert resultados[1]['agendamento']['horario_agendamento'] == '08:00'
+        assert resultados[2]['erro'] == 'Horário indisponível'
+
+        print("✅ Lote - Ocupação de cada dia carregada uma vez")
+
+    def test_nenhum_criado(self, client, frota):
+        headers, ids = frota
+        response = client.post('/api/agendamentos/lote', headers=headers, json={
+            'itens': [item(ids, 'FRT0001', data_agendamento='2020-01-01')]
+        })
+        assert response.status_code == 409
+        assert response.get_json()['resultados'][0]['erro'] == 'Não é possível agendar para datas passadas'
+
+        print("✅ Lote - Nenhum item criado")
+
+    @pytest.mark.parametrize('corpo', [{}, {'itens': []}, {'itens': 'FRT0001'}, {'itens': [{}] * 51}])
+    def test_corpo_invalido(self, client, frota, corpo):
+        headers, _ = frota
+        response = client.post('/api/agendamentos/lote', headers=headers, json=corpo)
+        assert response.status_code == 400
+
+        print("✅ Lote - Corpo inválido rejeitado")
@@ -0,0 +1,75 @@
+import pytest
+from datetime import date, timedelta
+from tests.conftest import adicionar_veiculo, novo_agendamento
+
+@pytest.fixture
+def agendamentos(app, cadastro):
+    # Passados (pendente/confirmado/cancelado/concluido) e futuros, todos do mesmo veículo
+    from app import db
+
+    with app.app_context():
+        veiculo = adicionar_veiculo(cadastro, 'ABC1234')
+
+        ontem = date.today() - timedelta(days=1)
+        amanha = date.today() + timedelta(days=1)
+        casos = [(ontem, 'pendente')] * 12 + [(ontem, 'confirmado')] * 13 + [(ontem, 'cancelado')] * 3 + \
+            [(ontem, 'concluido')] * 2 + [(amanha, 'confirmado')] * 5
+        for dia, status in casos:
+            db.session.add(novo_agendamento(cadastro, veiculo.id, dia, status))
+        db.session.commit()
+
+def contar_status(app):
+    from app import db
+    from app.models import Agendamento
+
+    with app.app_context():
+        return dict(db.session.query(Agendamento.status, db.func.count()).group_by(Agendamento.status).all())
+
+class TestExpiracao:
+    def test_expira_em_lotes(self, app, agendamentos):
+        from app.services.manutencao import expirar_agendamentos
+
+        with app.app_context():
+            resultado = expirar_agendamentos(tamanho_lote=10)
+
+        assert resultado['expirados'] == 25
+        assert resultado['lotes'] == 3
+        assert contar_status(app) == {'expirado': 25, 'cancelado': 3, 'concluido': 2, 'confirmado': 5}
+
+        print("✅ Expiração - Lotes por faixa de ID")
+
+    def test_update_sem_carregar_agendamentos(self, app, agendamentos, contador_queries):
+        from app.services.manutencao import expirar_agendamentos
+
+        # Faixa de IDs + por lote: IDs do lote, totais por dia/status, UPDATE,
+        # trava da sequência, INSERT ... SELECT dos eventos, avanço da sequência
+        # e um upsert por status afetado (pendente, confirmado, expirado),
+        # independente da quantidade
+        with app.app_context(), contador_queries:
+            expirar_agendamentos(tamanho_lote=100)
+        assert contador_queries.total == 1 + 6 + 3
+
+        print("✅ Expiração - UPDATE em conjunto")
+
+    def test_sem_pendencias(self, app):
+        from app.services.manutencao import expirar_agendamentos
+
+        with app.app_context():
+            assert expirar_agendamentos()['expirados'] == 0
+
+        print("✅ Expiração - Nada a expirar")
+
+    def test_comando_cli(self, app, agendamentos):
+        resultado = app.test_cli_runner().invoke(args=['expirar-agendamentos', '--lote', '5'])
+        assert resultado.exit_code == 0
+        assert '25 agendamentos expirados em 5 lotes' in resultado.output
+
+        print("✅ Expiração - Comando flask expirar-agendamentos")
+
+    def test_endpoint_admin(self, client, cadastro, agendamentos):
+        response = client.delete('/api/agendamentos/expirados', headers=cadastro['admin'])
+        assert response.status_code == 200
+        assert response.get_json()['expirados_count'] == 25
+        assert 'duracao_ms' in response.get_json()
+
+        print("✅ Expiração - Endpoint dispara o job")
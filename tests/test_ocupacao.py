@@ -0,0 +1,99 @@
+import pytest
+from datetime import time, timedelta
+from tests.conftest import AMANHA, criar_agendamento, livres
+
+# Um box das 08:00 às 11:00 todos os dias e serviço de 60 minutos
+pytestmark = pytest.mark.expediente(hora_fechamento=time(11, 0))
+
+def mapa_do_dia(app):
+    from app.services.disponibilidade import ler_mapas
+
+    with app.app_context():
+        return ler_mapas(AMANHA, AMANHA).get(AMANHA, [])
+
+class TestMapaOcupacao:
+    def test_mantido_nas_gravacoes(self, app, client, lava_rapido):
+        from app.services.disponibilidade import mascara
+
+        agendamento_id = criar_agendamento(client, lava_rapido, 'OCP0001', '08:00')
+        assert mapa_do_dia(app) == [mascara(8 * 60, 9 * 60)]
+        assert livres(client, lava_rapido) == ['09:00', '09:30', '10:00']
+
+        # Cancelar libera o horário
+        assert client.delete(f'/api/agendamentos/{agendamento_id}', headers=lava_rapido['cliente']).status_code == 200
+        assert mapa_do_dia(app) == []
+        assert livres(client, lava_rapido) == ['08:00', '08:30', '09:00', '09:30', '10:00']
+
+        # Voltar a confirmar ocupa de novo; concluir libera
+        url = f'/api/agendamentos/{agendamento_id}/status'
+        client.put(url, headers=lava_rapido['admin'], json={'status': 'confirmado'})
+        assert mapa_do_dia(app) == [mascara(8 * 60, 9 * 60)]
+        client.put(url, headers=lava_rapido['admin'], json={'status': 'concluido'})
+        assert mapa_do_dia(app) == []
+
+        print("✅ Ocupação - Mapa mantido ao criar, cancelar e mudar status")
+
+    def test_mudanca_de_data(self, app, client, lava_rapido):
+        from app import db
+        from app.models import Agendamento
+        from app.services.disponibilidade import ler_mapas, mascara
+
+        agendamento_id = criar_agendamento(client, lava_rapido, 'OCP0001', '09:00')
+        depois = AMANHA + timedelta(days=1)
+
+        with app.app_context():
+            db.session.get(Agendamento, agendamento_id).data_agendamento = depois
+            db.session.commit()
+            mapas = ler_mapas(AMANHA, depois)
+
+        # O dia anterior também é refeito
+        assert mapas == {depois: [mascara(9 * 60, 10 * 60)]}
+
+        print("✅ Ocupação - Mudança de data refaz os dois dias")
+
+    def test_consulta_de_horarios_sem_ler_agendamentos(self, app, client, lava_rapido):
+        from sqlalchemy import event
+        from app import db
+
+        criar_agendamento(client, lava_rapido, 'OCP0001', '08:00')
+        livres(client, lava_rapido)  # aquece o cache de serviços e horários
+
+        comandos = []
+        def registrar(conexao, cursor, sql, *args):
+            comandos.append(sql)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', registrar)
+        try:
+            assert livres(client, lava_rapido) == ['09:00', '09:30', '10:00']
+            periodo = client.get(
+                f'/api/agendamentos/disponibilidade?inicio={AMANHA.isoformat()}&fim={(AMANHA + timedelta(days=6)).isoformat()}'
+                f'&servico_id={lava_rapido["ids"]["servico_id"]}', headers=lava_rapido['cliente']
+            )
+            assert periodo.status_code == 200
+        finally:
+            event.remove(engine, 'before_cursor_execute', registrar)
+
+        assert any('ocupacao_dias' in sql for sql in comandos)
+        assert not any('agendamentos' in sql for sql in comandos)
+
+        print("✅ Ocupação - Horários livres lidos só dos mapas")
+
+    def test_comando_reconstruir(self, app, client, lava_rapido):
+        from app import db
+        from app.models import OcupacaoDia
+        from app.services.disponibilidade import mascara
+
+        criar_agendamento(client, lava_rapido, 'OCP0001', '10:00')
+
+        with app.app_context():
+            db.session.execute(db.update(OcupacaoDia).values(mapa=None))
+            db.session.commit()
+
+        resultado = app.test_cli_runner().invoke(args=['reconstruir-ocupacao'])
+        assert resultado.exit_code == 0
+        assert '1 dias' in resultado.output
+        assert mapa_do_dia(app) == [mascara(10 * 60, 11 * 60)]
+
+        print("✅ Ocupação - Comando flask reconstruir-ocupacao")
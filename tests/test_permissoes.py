@@ -0,0 +1,86 @@
+import pytest
+
+@pytest.fixture
+def contas(cadastro):
+    # Cliente e administrador do cadastro com o mesmo ID (tabelas independentes)
+    assert cadastro['ids']['cliente_id'] == cadastro['ids']['admin_id']
+    return cadastro['tokens']
+
+class TestPermissoes:
+    @pytest.mark.parametrize('metodo, url', [
+        ('get', '/api/admin/dashboard/estatisticas'),
+        ('get', '/api/admin/dashboard/agendamentos'),
+        ('get', '/api/admin/horarios-funcionamento'),
+        ('get', '/api/agendamentos/hoje'),
+        ('post', '/api/servicos'),
+    ])
+    def test_cliente_com_mesmo_id_nao_e_admin(self, client, contas, metodo, url):
+        # O ID do cliente coincide com o do admin, mas o token não tem tipo=admin
+        headers = {'Authorization': f'Bearer {contas["cliente"]}'}
+        response = getattr(client, metodo)(url, headers=headers, json={})
+        assert response.status_code == 403
+
+        print(f"✅ Permissões - {url} bloqueado para cliente")
+
+    def test_admin_autorizado_pela_claim(self, client, contas):
+        headers = {'Authorization': f'Bearer {contas["admin"]}'}
+        response = client.get('/api/admin/dashboard/estatisticas', headers=headers)
+        assert response.status_code == 200
+
+        print("✅ Permissões - Admin autorizado pela claim do token")
+
+class TestUsuarioDaRequisicao:
+    def test_rota_admin_sem_consulta_de_identidade(self, client, contas, contador_queries):
+        # Autorização pela claim: com os horários em cache, só a versão do catálogo vai ao banco
+        headers = {'Authorization': f'Bearer {contas["admin"]}'}
+        client.get('/api/admin/horarios-funcionamento', headers=headers)
+        with contador_queries:
+            response = client.get('/api/admin/horarios-funcionamento', headers=headers)
+        assert response.status_code == 200
+        assert contador_queries.total == 1
+
+        print("✅ Usuário da Requisição - Rota admin sem consulta de identidade")
+
+    def test_token_de_conta_removida(self, app, client, contas):
+        from app import db
+        from app.models import User
+
+        with app.app_context():
+            db.session.delete(User.query.filter_by(email='cliente@teste.com').one())
+            db.session.commit()
+
+        # A assinatura ainda é válida, mas as rotas que usam a conta não a encontram mais
+        headers = {'Authorization': f'Bearer {contas["cliente"]}'}
+        assert client.get('/api/users/me', headers=headers).status_code == 401
+        assert client.put('/api/users/me', headers=headers, json={'nome': 'Cliente Removido'}).status_code == 401
+
+        print("✅ Usuário da Requisição - Token de conta removida recusado")
+
+    def test_perfil_com_uma_consulta(self, client, contas, contador_queries):
+        # usuario_atual() consulta a conta uma única vez
+        headers = {'Authorization': f'Bearer {contas["cliente"]}'}
+        with contador_queries:
+            response = client.get('/api/users/me', headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['user']['email'] == 'cliente@teste.com'
+        assert contador_queries.total == 1
+
+        print("✅ Usuário da Requisição - Perfil carregado com uma consulta")
+
+    def test_atualizar_perfil(self, client, contas):
+        headers = {'Authorization': f'Bearer {contas["cliente"]}'}
+        response = client.put('/api/users/me', headers=headers, json={'nome': 'Cliente Atualizado'})
+        assert response.status_code == 200
+
+        response = client.get('/api/users/me', headers=headers)
+        assert response.get_json()['user']['nome'] == 'Cliente Atualizado'
+
+        print("✅ Usuário da Requisição - Perfil atualizado via usuario_atual")
+
+    def test_perfil_indisponivel_para_admin(self, client, contas):
+        # O admin tem o mesmo ID do cliente, mas não acessa o perfil dele
+        headers = {'Authorization': f'Bearer {contas["admin"]}'}
+        response = client.get('/api/users/me', headers=headers)
+        assert response.status_code == 404
+
+        print("✅ Usuário da Requisição - Perfil de cliente bloqueado para admin")
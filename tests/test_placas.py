@@ -0,0 +1,129 @@
+import pytest
+from datetime import date, time, timedelta
+from tests.conftest import adicionar_veiculo, novo_agendamento
+
+PLACAS = ['ABC1D23', 'ABC1234', 'XABC999', 'QWE1A23', 'ZZZ9B99']
+
+pytestmark = pytest.mark.cadastro(servico={'duracao_minutos': 30})
+
+@pytest.fixture
+def dados(app, cadastro):
+    from app import db
+
+    with app.app_context():
+        for placa in PLACAS:
+            veiculo = adicionar_veiculo(cadastro, placa, nome_proprietario='Dono')
+            db.session.add(novo_agendamento(cadastro, veiculo.id, date.today() + timedelta(days=1), 'confirmado', time(9, 0)))
+        db.session.commit()
+
+    return cadastro['admin']
+
+def trigramas_do(veiculo_id):
+    from app.models import VeiculoTrigrama
+
+    return {t.trigrama for t in VeiculoTrigrama.query.filter_by(veiculo_id=veiculo_id)}
+
+class TestIndicePlacas:
+    def test_mantido_nas_gravacoes(self, app, dados):
+        from app import db
+        from app.models import Veiculo, VeiculoTrigrama, Agendamento
+
+        with app.app_context():
+            veiculo = Veiculo.query.filter_by(placa='ABC1D23').one()
+            assert trigramas_do(veiculo.id) == {'ABC', 'BC1', 'C1D', '1D2', 'D23'}
+
+            veiculo.placa = 'KLM4E56'
+            db.session.commit()
+            assert trigramas_do(veiculo.id) == {'KLM', 'LM4', 'M4E', '4E5', 'E56'}
+
+            veiculo_id = veiculo.id
+            excluido = Veiculo.query.filter_by(placa='ZZZ9B99').one()
+            db.session.delete(Agendamento.query.filter_by(veiculo_id=excluido.id).one())
+            db.session.delete(excluido)
+            db.session.commit()
+            assert VeiculoTrigrama.query.filter(VeiculoTrigrama.trigrama == 'ZZZ').count() == 0
+            assert trigramas_do(veiculo_id)
+
+        print("✅ Placas - Trigramas mantidos ao criar, alterar e excluir")
+
+    def test_cadastro_pela_api(self, app, client, cadastro):
+        from app.models import Veiculo
+
+        response = client.post('/api/veiculos', headers=cadastro['cliente'], json={
+            'placa': 'DEF-5G67', 'nome_proprietario': 'Dono', 'telefone': '11999999999', 'modelo_veiculo_id': cadastro['ids']['modelo_veiculo_id']
+        })
+        assert response.status_code == 201
+
+        with app.app_context():
+            veiculo = Veiculo.query.filter_by(placa='DEF5G67').one()
+            assert 'F5G' in trigramas_do(veiculo.id)
+
+        print("✅ Placas - Veículo cadastrado pela API já indexado")
+
+    def test_comando_indexar(self, app, dados):
+        from app import db
+        from app.models import VeiculoTrigrama
+
+        with app.app_context():
+            VeiculoTrigrama.query.delete()
+            db.session.commit()
+
+        resultado = app.test_cli_runner().invoke(args=['indexar-placas', '--lote', '2'])
+        assert resultado.exit_code == 0
+        assert f'{len(PLACAS)} veículos' in resultado.output
+
+        with app.app_context():
+            assert VeiculoTrigrama.query.count() == 5 * len(PLACAS)
+
+        print("✅ Placas - Comando flask indexar-placas")
+
+class TestBuscaPlacas:
+    def buscar(self, client, headers, url):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        return response.get_json()
+
+    def test_modos(self, client, dados):
+        def placas(modo, termo):
+            resultado = self.buscar(client, dados, f'/api/admin/veiculos/buscar?placa={termo}&modo={modo}')
+            return [v['placa'] for v in resultado['veiculos']]
+
+        assert placas('exato', 'abc-1d23') == ['ABC1D23']
+        assert placas('exato', 'ABC1D2') == []
+        assert placas('prefixo', 'ABC1') == ['ABC1234', 'ABC1D23']
+        assert placas('substring', 'BC1') == ['ABC1234', 'ABC1D23']
+        # Todos os trigramas presentes, mas não em sequência
+        assert placas('substring', 'ABC1A23') == []
+        assert placas('substring', '1A23') == ['QWE1A23']
+
+        print("✅ Placas - Busca exata, por prefixo e por substring")
+
+    def test_relevancia(self, client, dados):
+        resultado = self.buscar(client, dados, '/api/admin/veiculos/buscar?placa=ABC')
+
+        assert [(v['placa'], v['correspondencia']) for v in resultado['veiculos']] == [
+            ('ABC1234', 'prefixo'),
+            ('ABC1D23', 'prefixo'),
+            ('XABC999', 'substring')
+        ]
+
+        resultado = self.buscar(client, dados, '/api/admin/veiculos/buscar?placa=ABC1234&modo=substring')
+        assert resultado['veiculos'][0]['correspondencia'] == 'exata'
+
+        print("✅ Placas - Resultados ordenados por relevância")
+
+    def test_agendamentos_por_placa(self, client, dados):
+        resultado = self.buscar(client, dados, '/api/admin/agendamentos/buscar?placa=ABC')
+        assert sorted(a['veiculo_placa'] for a in resultado['agendamentos']) == ['ABC1234', 'ABC1D23', 'XABC999']
+
+        resultado = self.buscar(client, dados, '/api/admin/agendamentos/buscar?placa=ABC&modo=prefixo')
+        assert sorted(a['veiculo_placa'] for a in resultado['agendamentos']) == ['ABC1234', 'ABC1D23']
+
+        print("✅ Placas - Agendamentos buscados pelo índice de placas")
+
+    @pytest.mark.parametrize('parametros', ['?placa=AB', '?placa=ABC&modo=fonetico', '?placa=ABC&limit=0'])
+    def test_parametros_invalidos(self, client, dados, parametros):
+        response = client.get(f'/api/admin/veiculos/buscar{parametros}', headers=dados)
+        assert response.status_code == 400
+
+        print(f"✅ Placas - Parâmetros inválidos rejeitados ({parametros})")
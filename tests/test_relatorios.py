@@ -0,0 +1,114 @@
+import pytest
+from datetime import date, timedelta
+from tests.conftest import adicionar_veiculo, novo_agendamento
+
+# Segunda e terça de uma semana passada
+SEGUNDA = date(2026, 3, 2)
+TERCA = SEGUNDA + timedelta(days=1)
+
+# Aberto 4 horas por dia, todos os dias; o serviço do cadastro é a lavagem completa
+pytestmark = pytest.mark.cadastro(servico={'nome': 'Completa', 'preco': 80})
+
+@pytest.fixture
+def dados(app, lava_rapido):
+    from app import db
+    from app.models import Servico, ModeloVeiculo
+    from app.services import relatorios
+
+    relatorios._cache.limpar()
+
+    with app.app_context():
+        externa = Servico(nome='Externa', preco=40, duracao_minutos=30)
+        suv = ModeloVeiculo(nome='SUV')
+        db.session.add_all([externa, suv])
+        db.session.flush()
+
+        carro = adicionar_veiculo(lava_rapido, 'REL0001')
+        caminhonete = adicionar_veiculo(lava_rapido, 'REL0002', modelo_veiculo_id=suv.id)
+        completa = lava_rapido['ids']['servico_id']
+
+        for dia, servico_id, preco, veiculo, status in [
+            (SEGUNDA, completa, 80, carro, 'concluido'),
+            (SEGUNDA, completa, 80, caminhonete, 'concluido'),
+            (SEGUNDA, externa.id, 40, carro, 'cancelado'),
+            (TERCA, externa.id, 40, caminhonete, 'concluido'),
+            (TERCA, completa, 80, carro, 'expirado'),
+        ]:
+            db.session.add(novo_agendamento(lava_rapido, veiculo.id, dia, status, servico_id=servico_id, valor_total=preco))
+        db.session.commit()
+
+    return lava_rapido['admin']
+
+def url(inicio=SEGUNDA, fim=TERCA):
+    return f'/api/admin/dashboard/relatorio?inicio={inicio.isoformat()}&fim={fim.isoformat()}'
+
+class TestRelatorio:
+    def test_agregados(self, client, dados):
+        response = client.get(url(), headers=dados)
+        assert response.status_code == 200
+        relatorio = response.get_json()
+
+        totais = relatorio['totais']
+        assert totais['agendamentos'] == 5
+        assert totais['por_status'] == {'concluido': 3, 'cancelado': 1, 'expirado': 1}
+        assert totais['receita'] == 200.0
+        # 60 + 60 + 30 minutos ocupados em 2 dias de 240 minutos
+        assert totais['minutos_ocupados'] == 150
+        assert totais['minutos_disponiveis'] == 480
+        assert totais['utilizacao_percentual'] == 31.25
+
+        servicos = {s['servico_nome']: s for s in relatorio['por_servico']}
+        assert servicos['Completa']['receita'] == 160.0
+        assert servicos['Completa']['concluidos'] == 2
+        assert servicos['Externa']['receita'] == 40.0
+
+        modelos = {m['modelo_nome']: m for m in relatorio['por_modelo']}
+        assert modelos['Sedan'] == {'modelo_veiculo_id': modelos['Sedan']['modelo_veiculo_id'], 'modelo_nome': 'Sedan', 'agendamentos': 3, 'receita': 80.0}
+        assert modelos['SUV']['receita'] == 120.0
+
+        dias = {d['dia_nome']: d for d in relatorio['por_dia_semana']}
+        assert dias['Segunda']['receita'] == 160.0
+        assert dias['Segunda']['utilizacao_percentual'] == 50.0
+        assert dias['Terça']['utilizacao_percentual'] == 12.5
+        assert dias['Domingo']['minutos_disponiveis'] == 0
+
+        print("✅ Relatório - Receita e utilização agregadas")
+
+    def test_cache_por_periodo(self, client, dados, contador_queries):
+        assert client.get(url(), headers=dados).get_json()['cache'] is False
+
+        # Só a assinatura (rollup do período) e a versão dos catálogos
+        with contador_queries:
+            response = client.get(url(), headers=dados)
+        assert response.get_json()['cache'] is True
+        assert contador_queries.total == 2
+
+        print("✅ Relatório - Período repetido servido do cache")
+
+    def test_cache_invalidado_por_alteracao(self, app, client, dados):
+        from app import db
+        from app.models import Agendamento
+
+        client.get(url(), headers=dados)
+        with app.app_context():
+            Agendamento.query.filter_by(status='cancelado').one().status = 'concluido'
+            db.session.commit()
+
+        relatorio = client.get(url(), headers=dados).get_json()
+        assert relatorio['cache'] is False
+        assert relatorio['totais']['receita'] == 240.0
+
+        print("✅ Relatório - Alteração no período refaz o relatório")
+
+    @pytest.mark.parametrize('parametros', [
+        '',
+        '?inicio=2026-03-02',
+        '?inicio=02/03/2026&fim=2026-03-03',
+        '?inicio=2026-03-03&fim=2026-03-02',
+        '?inicio=2020-01-01&fim=2026-01-01',
+    ])
+    def test_parametros_invalidos(self, client, dados, parametros):
+        response = client.get(f'/api/admin/dashboard/relatorio{parametros}', headers=dados)
+        assert response.status_code == 400
+
+        print(f"✅ Relatório - Parâmetros inválidos rejeitados ({parametros})")
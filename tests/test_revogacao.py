@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+def payload(jti, segundos):
+    exp = datetime.now(timezone.utc) + timedelta(seconds=segundos)
+    return {'jti': jti, 'exp': int(exp.timestamp())}
+
+@pytest.fixture
+def token_cliente(app, client):
+    from app import db
+    from app.models import User
+
+    with app.app_context():
+        usuario = User(nome='Cliente Revogacao', email='revogacao@teste.com')
+        usuario.set_password('Senha@123')
+        db.session.add(usuario)
+        db.session.commit()
+
+    response = client.post('/api/auth/login', json={'email': 'revogacao@teste.com', 'senha': 'Senha@123'})
+    return response.get_json()['access_token']
+
+class TestRevogacao:
+    def test_logout_revoga_token(self, client, token_cliente):
+        headers = {'Authorization': f'Bearer {token_cliente}'}
+        assert client.post('/api/auth/logout', headers=headers).status_code == 200
+        assert client.get('/api/users/me', headers=headers).status_code == 401
+
+        print("✅ Revogação - Token rejeitado após logout")
+
+    def test_revogacao_persiste_sem_cache(self, app, client, token_cliente):
+        # Outro worker (cache vazio) enxerga a revogação pelo banco
+        from app.utils.revogacao import revogacao
+
+        headers = {'Authorization': f'Bearer {token_cliente}'}
+        client.post('/api/auth/logout', headers=headers)
+        revogacao.cache.limpar()
+        assert client.get('/api/users/me', headers=headers).status_code == 401
+
+        print("✅ Revogação - Persistida no banco")
+
+    def test_verificacao_servida_pelo_cache(self, client, token_cliente, contador_queries):
+        headers = {'Authorization': f'Bearer {token_cliente}'}
+        client.post('/api/auth/logout', headers=headers)
+        with contador_queries:
+            assert client.get('/api/users/me', headers=headers).status_code == 401
+        assert contador_queries.total == 0
+
+        print("✅ Revogação - Verificação sem consulta ao banco")
+
+    @pytest.mark.parametrize('backend', ['banco', 'chave_valor'])
+    def test_expiracao_das_entradas(self, app, backend):
+        from app.utils.revogacao import ARMAZENAMENTOS
+
+        with app.app_context():
+            armazenamento = ARMAZENAMENTOS[backend]()
+            armazenamento.revogar('expirado', datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=1))
+            armazenamento.revogar('valido', datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1))
+
+            assert not armazenamento.esta_revogado('expirado')
+            assert armazenamento.esta_revogado('valido')
+            armazenamento.limpar_expirados()
+            assert armazenamento.esta_revogado('valido')
+
+        print(f"✅ Revogação - Entradas expiram com o token ({backend})")
+
+class TestCacheTTL:
+    def test_entrada_expira(self, monkeypatch):
+        from app.utils import cache as modulo
+        from app.utils.cache import CacheTTL
+
+        agora = [1000.0]
+        monkeypatch.setattr(modulo.time, 'monotonic', lambda: agora[0])
+
+        cache = CacheTTL()
+        cache.definir('chave', True, 30)
+        assert cache.obter('chave') is True
+        agora[0] += 31
+        assert cache.obter('chave') is None
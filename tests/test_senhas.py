@@ -0,0 +1,80 @@
+import pytest
+import bcrypt
+
+@pytest.fixture
+def cliente(cadastro):
+    # Id do cliente do cadastro (cliente@teste.com, Senha@123)
+    return cadastro['ids']['cliente_id']
+
+def login(client, senha='Senha@123'):
+    return client.post('/api/auth/login', json={'email': 'cliente@teste.com', 'senha': senha})
+
+class TestSenhas:
+    def test_login_com_uma_consulta_de_credenciais(self, client, cliente, contador_queries):
+        # Busca única nas duas tabelas + carga da conta encontrada
+        with contador_queries:
+            response = login(client)
+        assert response.status_code == 200
+        assert response.get_json()['tipo'] == 'cliente'
+        assert contador_queries.total == 2
+
+        print("✅ Senhas - Login com uma consulta de credenciais")
+
+    def test_senha_incorreta(self, client, cliente, contador_queries):
+        with contador_queries:
+            response = login(client, 'Errada@123')
+        assert response.status_code == 401
+        assert contador_queries.total == 1
+
+        print("✅ Senhas - Senha incorreta rejeitada")
+
+    def test_custo_configurado(self, app, cliente):
+        from app import db
+        from app.models import User
+
+        with app.app_context():
+            assert db.session.get(User, cliente).senha_hash.startswith('$2b$04$')
+
+        print("✅ Senhas - Hash gerado com BCRYPT_ROUNDS")
+
+    def test_rehash_quando_custo_muda(self, app, client, cliente):
+        from app import db
+        from app.models import User
+
+        with app.app_context():
+            usuario = db.session.get(User, cliente)
+            usuario.senha_hash = bcrypt.hashpw(b'Senha@123', bcrypt.gensalt(5)).decode('utf-8')
+            db.session.commit()
+
+        assert login(client).status_code == 200
+
+        with app.app_context():
+            assert db.session.get(User, cliente).senha_hash.startswith('$2b$04$')
+
+        print("✅ Senhas - Hash refeito com o novo custo")
+
+    def test_fila_cheia_retorna_503(self, client, cliente, monkeypatch):
+        from app.utils.senhas import senhas
+
+        monkeypatch.setattr(senhas, 'capacidade', 0)
+        response = login(client)
+        assert response.status_code == 503
+        assert senhas.metricas()['rejeitadas'] == 1
+
+        print("✅ Senhas - Fila cheia recusada com 503")
+
+    def test_metricas_admin(self, client, cadastro):
+        response = client.get('/api/admin/metricas', headers=cadastro['cliente'])
+        assert response.status_code == 403
+
+        response = client.get('/api/admin/metricas', headers=cadastro['admin'])
+        assert response.status_code == 200
+
+        # Senhas das três contas do cadastro e o login de cada uma
+        metricas = response.get_json()['senhas']
+        assert metricas['rounds'] == 4
+        assert metricas['hash']['total'] == 3
+        assert metricas['verificacao']['total'] == 3
+        assert metricas['em_andamento'] == 0
+
+        print("✅ Senhas - Métricas de hashing para admin")
@@ -0,0 +1,184 @@
+import pytest
+import os
+from threading import Thread, Event
+from datetime import date, datetime, timedelta
+from tests.conftest import AMANHA, criar_agendamento, adicionar_veiculo, novo_agendamento
+
+# Dois clientes, um admin e dois boxes das 08:00 às 12:00 todos os dias
+pytestmark = pytest.mark.expediente(quantidade_boxes=2)
+
+def alteracoes(client, headers, **params):
+    response = client.get('/api/agendamentos/changes', query_string=params, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+class TestSincronizacao:
+    def test_alteracoes_desde_a_ultima_sincronizacao(self, client, lava_rapido):
+        criar_agendamento(client, lava_rapido, 'SYN0001', '08:00')
+
+        # Sem since: só o ponto de partida, tirado antes da carga completa
+        inicio = alteracoes(client, lava_rapido['cliente'])
+        assert inicio['alteracoes'] == [] and inicio['next_since'] == 1
+
+        agendamento_id = criar_agendamento(client, lava_rapido, 'SYN0002', '09:00')
+        criar_agendamento(client, lava_rapido, 'SYN0003', '09:00', conta='outro')
+        client.delete(f'/api/agendamentos/{agendamento_id}', headers=lava_rapido['cliente'])
+
+        resultado = alteracoes(client, lava_rapido['cliente'], since=inicio['next_since'])
+        assert [(a['tipo'], a['agendamento_id']) for a in resultado['alteracoes']] == [
+            ('criado', agendamento_id), ('cancelado', agendamento_id)
+        ]
+        assert resultado['has_more'] is False
+
+        # Nada novo: a sequência não muda
+        seguinte = alteracoes(client, lava_rapido['cliente'], since=resultado['next_since'])
+        assert seguinte == {'alteracoes': [], 'next_since': resultado['next_since'], 'has_more': False}
+
+        print("✅ Sincronização - Só as alterações do cliente desde a última sequência")
+
+    def test_paginas_do_admin(self, client, lava_rapido):
+        for i, quem in enumerate(['cliente', 'outro', 'cliente']):
+            criar_agendamento(client, lava_rapido, f'SYN000{i}', f'{8 + i:02d}:00', conta=quem)
+
+        primeira = alteracoes(client, lava_rapido['admin'], since=0, limit=2)
+        assert [a['id'] for a in primeira['alteracoes']] == [1, 2]
+        assert primeira['has_more'] is True
+
+        segunda = alteracoes(client, lava_rapido['admin'], since=primeira['next_since'], limit=2)
+        assert [a['id'] for a in segunda['alteracoes']] == [3]
+        assert segunda['has_more'] is False
+
+        print("✅ Sincronização - Admin recebe todas as alterações em páginas")
+
+    def test_expiracao_em_lote_registra_alteracoes(self, app, client, lava_rapido):
+        from app import db
+        from app.services.manutencao import expirar_agendamentos
+
+        with app.app_context():
+            veiculo = adicionar_veiculo(lava_rapido, 'SYN0009')
+            agendamento = novo_agendamento(lava_rapido, veiculo.id, date.today() - timedelta(days=1), 'confirmado')
+            db.session.add(agendamento)
+            db.session.commit()
+            agendamento_id = agendamento.id
+            since = alteracoes(client, lava_rapido['cliente'])['next_since']
+
+            # O UPDATE em conjunto não passa pelo ORM, mas grava os eventos na mesma transação
+            assert expirar_agendamentos()['expirados'] == 1
+
+        # Os eventos seguintes continuam a mesma sequência
+        novo_id = criar_agendamento(client, lava_rapido, 'SYN0010', '10:00')
+
+        resultado = alteracoes(client, lava_rapido['cliente'], since=since)
+        assert [(a['id'], a['tipo'], a['agendamento_id'], a['status']) for a in resultado['alteracoes']] == [
+            (since + 1, 'status_alterado', agendamento_id, 'expirado'),
+            (since + 2, 'criado', novo_id, 'confirmado')
+        ]
+
+        print("✅ Sincronização - Expiração em lote registrada no histórico")
+
+    def test_historico_removido(self, app, client, lava_rapido):
+        from app.services.eventos import limpar_eventos
+
+        criar_agendamento(client, lava_rapido, 'SYN0001', '08:00')
+        with app.app_context():
+            limpar_eventos(agora=datetime.utcnow() + timedelta(days=2))
+        criar_agendamento(client, lava_rapido, 'SYN0002', '09:00')
+
+        response = client.get('/api/agendamentos/changes?since=0', headers=lava_rapido['cliente'])
+        assert response.status_code == 410
+        assert alteracoes(client, lava_rapido['cliente'], since=1)['alteracoes'][0]['id'] == 2
+
+        print("✅ Sincronização - Histórico removido pede recarga completa")
+
+    def test_historico_todo_removido(self, app, client, lava_rapido):
+        from app.services.eventos import limpar_eventos
+
+        criar_agendamento(client, lava_rapido, 'SYN0001', '08:00')
+        since = alteracoes(client, lava_rapido['cliente'])['next_since']
+        criar_agendamento(client, lava_rapido, 'SYN0002', '09:00')
+
+        # Sem nenhum evento na tabela, a marca do maior id removido mostra a lacuna
+        with app.app_context():
+            assert limpar_eventos(agora=datetime.utcnow() + timedelta(days=2))['removidos'] == 2
+        response = client.get(f'/api/agendamentos/changes?since={since}', headers=lava_rapido['cliente'])
+        assert response.status_code == 410
+
+        # Quem já tinha tudo continua sem recarregar
+        atual = alteracoes(client, lava_rapido['cliente'])['next_since']
+        assert alteracoes(client, lava_rapido['cliente'], since=atual)['alteracoes'] == []
+
+        print("✅ Sincronização - Histórico todo removido pede recarga completa")
+
+    @pytest.mark.parametrize('parametros', ['?since=abc', '?since=-1', '?since=0&limit=0', '?since=0&limit=501'])
+    def test_parametros_invalidos(self, client, lava_rapido, parametros):
+        response = client.get(f'/api/agendamentos/changes{parametros}', headers=lava_rapido['cliente'])
+        assert response.status_code == 400
+
+        print(f"✅ Sincronização - Parâmetros inválidos rejeitados ({parametros})")
+
+@pytest.mark.banco_arquivo
+@pytest.mark.skipif(
+    os.getenv('TEST_DATABASE_URI', 'sqlite://').startswith('sqlite'),
+    reason='O SQLite serializa as transações de escrita: a segunda não confirma antes da primeira'
+)
+class TestOrdemDosCommits:
+    def test_transacoes_intercaladas(self, app, client, lava_rapido):
+        from app import db
+        from app.models import Agendamento
+        from app.utils.eventos import corretor
+
+        # Um agendamento em cada dia, para as transações não disputarem as mesmas linhas
+        with app.app_context():
+            veiculo = adicionar_veiculo(lava_rapido, 'SYN0020')
+            agendamentos = [
+                novo_agendamento(lava_rapido, veiculo.id, AMANHA + timedelta(days=dias), 'confirmado', box=1)
+                for dias in (0, 7)
+            ]
+            db.session.add_all(agendamentos)
+            db.session.commit()
+            lento_id, rapido_id = [a.id for a in agendamentos]
+
+        since = alteracoes(client, lava_rapido['admin'])['next_since']
+        assinatura = corretor.assinar(None, since)
+        corretor.verificar()
+
+        gravou = Event()
+        pode_confirmar = Event()
+
+        def transacao_lenta():
+            with app.app_context():
+                try:
+                    db.session.get(Agendamento, lento_id).status = 'pendente'
+                    db.session.flush()
+                    gravou.set()
+                    pode_confirmar.wait(10)
+                    db.session.commit()
+                finally:
+                    db.session.remove()
+
+        thread = Thread(target=transacao_lenta)
+        thread.start()
+        try:
+            assert gravou.wait(10)
+
+            # Começa depois da lenta e confirma antes dela
+            with app.app_context():
+                db.session.get(Agendamento, rapido_id).status = 'pendente'
+                db.session.commit()
+
+            primeira = alteracoes(client, lava_rapido['admin'], since=since)
+            corretor.verificar()
+        finally:
+            pode_confirmar.set()
+            thread.join()
+
+        # Com ids da ordem de inserção, o evento da lenta ficaria antes de next_since e nunca seria lido
+        segunda = alteracoes(client, lava_rapido['admin'], since=primeira['next_since'])
+        corretor.verificar()
+        corretor.cancelar(assinatura)
+
+        assert [a['agendamento_id'] for a in primeira['alteracoes']] == [rapido_id]
+        assert [a['agendamento_id'] for a in segunda['alteracoes']] == [lento_id]
+        assert [assinatura.fila.get_nowait()['agendamento_id'] for _ in range(2)] == [rapido_id, lento_id]
+
+        print("✅ Sincronização - Eventos na ordem dos commits, com transações intercaladas")